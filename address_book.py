@@ -1,10 +1,151 @@
+import gc
+import threading
+from functools import wraps
+from itertools import islice
+from operator import attrgetter
+from sys import intern
+from time import perf_counter, time
+
 from contact import Contact
-from index import HashPrefixIndex
-from storage import PersistenceManager
+from index import INDEX_ENGINES, PHONE_INDEX_ENGINES, NameSearchIndex, NgramIndex
+from storage import OP_ADD, OP_DELETE, ChangeFeed, PersistenceManager, read_records, with_progress, write_records
+from utils import LRUCache, Metrics, PersistentMap, ReadWriteLock, sanitize_many
+from utils.validation import summarize_rejections
+
+def _guarded(op: str, write: bool):
+    """
+    为通讯录方法加锁并按需计时
+    :param op: 统计中的操作名
+    :param write: True 持有写锁（修改，互斥）；False 持有读锁（检索，可并行）
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            lock = self._lock
+            metrics = self.metrics
+            # 统计关闭时只多一次布尔判断
+            start = perf_counter() if metrics.enabled else None
+            if write:
+                lock.acquire_write()
+            else:
+                lock.acquire_read()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if write:
+                    lock.release_write()
+                else:
+                    lock.release_read()
+                if start is not None:
+                    metrics.record(op, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _writes(op: str):
+    """修改链表/索引的方法：持有写锁，与其他读写互斥"""
+    return _guarded(op, write=True)
+
+
+def _reads(op: str):
+    """只读检索/遍历方法：持有读锁，多个读者可并行"""
+    return _guarded(op, write=False)
+
+
+def _recorded(label: str):
+    """
+    版本化模式下记录历史：最外层修改结束后若联系人有变化，把修改前的版本压入历史，供 UNDO 撤销
+    嵌套调用（覆盖添加时的删除、批量添加中的删除、回滚）不单独记录；需放在 _writes 之内
+    :param label: 历史中的操作名，首个参数为字符串时（姓名/手机号）附在后面
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            before = self._pmap
+            if before is None or self._lock.write_depth > 1:
+                return method(self, *args, **kwargs)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if self._pmap is not before:
+                    self._push_version(f"{label} {args[0]}" if args and isinstance(args[0], str) else label, before)
+        return wrapper
+    return decorator
+
+
+_seq = attrgetter("seq")
+
+# 索引属性名 → 索引键取自联系人的哪个字段（顺序即惰性模式下后台预建的顺序）
+_INDEX_KEYS = {
+    "name_index": attrgetter("name"),
+    "phone_index": attrgetter("phone"),
+    "name_search": attrgetter("name"),
+    "phone_grams": attrgetter("phone"),
+    "remark_grams": attrgetter("remark"),
+}
+
+
+class SearchPage:
+    """分页检索结果：只包含当前页数据，以及廉价计算得到的匹配总数"""
+    def __init__(self, items: list, total: int, offset: int, limit: int):
+        self.items = items
+        self.total = total
+        self.offset = offset
+        self.limit = limit
+
+    @property
+    def page(self) -> int:
+        """当前页码（从1开始）"""
+        return self.offset // self.limit + 1 if self.limit else 1
+
+    @property
+    def next_cursor(self):
+        """下一页的键集游标（本页最后一个联系人），已到末页时为 None"""
+        if self.limit and len(self.items) == self.limit:
+            return self.items[-1]
+        return None
+
+    @property
+    def total_pages(self) -> int:
+        """总页数（向上取整）"""
+        return (self.total + self.limit - 1) // self.limit if self.limit else 1
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
 
 class AddressBook:
     """通讯录核心管理类：双向链表+散列表索引+原子持久化"""
-    def __init__(self):
+    def __init__(self, persistence: PersistenceManager = None, index_engine: str = "hash",
+                 phone_index_engine: str = None, metrics: bool = False, cache_size: int = 0,
+                 substring_index: bool = False, versioned: bool = False, max_versions: int = 100,
+                 lazy_indexes: bool = False, background_load: bool = False, warm_indexes: bool = False,
+                 feed: ChangeFeed = None):
+        """
+        :param persistence: 持久化管理器，默认使用全量保存的 PersistenceManager；
+                            传入 JournaledPersistenceManager 则每次修改仅追加日志
+        :param index_engine: 前缀索引引擎，"hash"（全前缀散列表）或 "sorted"（有序数组二分）
+        :param phone_index_engine: 手机号索引引擎，默认同 index_engine；
+                                   额外可选 "numpy"（int64 列存储 + searchsorted，需要 numpy）
+        :param metrics: 是否开启操作计数与耗时直方图（见 stats()），关闭时几乎无开销
+        :param cache_size: 前缀检索结果 LRU 缓存的条目上限，0 表示不启用
+        :param substring_index: 是否为手机号/备注建立 n-gram 倒排索引；不建立时子串检索退化为遍历链表
+        :param versioned: 版本化模式：每次修改保留修改前的版本（结构共享的持久化映射），支持 undo/rollback
+        :param max_versions: 版本化模式下最多保留的历史版本数，超出时丢弃最早的版本
+        :param lazy_indexes: 惰性索引：加载时只建链表与手机号映射，各索引在首次用到它的检索时才由链表批量建立
+        :param background_load: 在后台线程加载数据文件，构造函数立即返回；加载期间的所有操作等待加载完成
+        :param warm_indexes: 配合 lazy_indexes：加载完成后由后台线程依次预建索引，期间的修改可穿插执行
+        :param feed: 变更流：每次新增/删除（含覆盖添加时的隐式删除、撤销/回滚）按序号记入其中，供下游增量同步
+        """
+        phone_index_engine = phone_index_engine or index_engine
+        if index_engine not in INDEX_ENGINES:
+            raise ValueError(f"未知的索引引擎：{index_engine}，可选 {', '.join(INDEX_ENGINES)}")
+        if phone_index_engine not in PHONE_INDEX_ENGINES:
+            raise ValueError(f"未知的手机号索引引擎：{phone_index_engine}，可选 {', '.join(PHONE_INDEX_ENGINES)}")
+
         # 哨兵头节点
         self.head = Contact("", "")
         self.head.prev = self.head
@@ -12,37 +153,344 @@ class AddressBook:
         
         # 手机号映射
         self.phone_map = {}
+
+        # 插入序号：单调递增，与链表顺序一致
+        self._next_seq = 0
         
-        # 散列表索引
-        self.name_index = HashPrefixIndex()
-        self.phone_index = HashPrefixIndex()
+        # 前缀索引
+        self.name_index = INDEX_ENGINES[index_engine]()
+        self.phone_index = PHONE_INDEX_ENGINES[phone_index_engine]()
+
+        # 姓名拼音/首字母与模糊检索索引，与 name_index 同步维护
+        self.name_search = NameSearchIndex()
+
+        # 手机号（3-gram）与备注（2-gram）子串检索索引，可选
+        self.phone_grams = NgramIndex("phone", 3) if substring_index else None
+        self.remark_grams = NgramIndex("remark", 2) if substring_index else None
+
+        # 随增删同步维护的索引 [(索引, 取键函数)]；惰性模式下初始为空，索引建立后加入
+        names = [name for name in _INDEX_KEYS if getattr(self, name) is not None]
+        self._deferred = set(names) if lazy_indexes else set()
+        self._live = [(getattr(self, name), _INDEX_KEYS[name]) for name in names if name not in self._deferred]
+        self._build_lock = threading.Lock()
         
+        # 读写锁：检索并行、修改串行（写锁可重入，覆盖添加时会嵌套删除）
+        self._lock = ReadWriteLock()
+
+        # 操作耗时统计
+        self.metrics = Metrics(enabled=metrics)
+
+        # 检索结果缓存：键为 (索引名, 前缀)，值为有序的完整结果列表
+        self.cache = LRUCache(cache_size) if cache_size > 0 else None
+
         # 持久化
-        self.persistence = PersistenceManager()
+        self.persistence = persistence if persistence is not None else PersistenceManager()
         
+        # 版本化：手机号 → 联系人的持久化映射（与 phone_map 同步），历史版本只保存其根节点
+        # 加载完成后才建立，加载本身不作为可撤销的修改
+        self._pmap = None
+        self._versions = []
+        self._version = 0
+        self.max_versions = max_versions
+
+        # 变更流：加载完成后才开始记录（emit 绑定到 _publish），加载本身不是变更
+        self.feed = feed
+        self._publish = None
+
         # 初始化
-        self._load_from_file()
+        self._loaded = threading.Event()
+        warm_indexes = warm_indexes and lazy_indexes
+        if background_load:
+            # 加载线程先取得写锁再让构造函数返回，之后的任何操作都排在加载之后
+            locked = threading.Event()
+            threading.Thread(target=self._background_load, args=(locked, versioned, warm_indexes),
+                             name="address-book-loader", daemon=True).start()
+            locked.wait()
+        else:
+            self._initial_load(versioned)
+            if warm_indexes:
+                threading.Thread(target=self._warm_indexes, name="address-book-indexer", daemon=True).start()
+
+    def _initial_load(self, versioned: bool):
+        """启动时加载数据文件；版本化模式下随后建立持久化映射"""
+        try:
+            self._load_from_file()
+            if versioned:
+                # 与 bulk_load 相同，批量创建大量节点时暂停循环垃圾回收
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    self._pmap = PersistentMap.from_mapping(self.phone_map)
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+        finally:
+            if self.feed is not None:
+                self._publish = self.feed.emit
+            self._loaded.set()
+
+    def _background_load(self, locked: threading.Event, versioned: bool, warm_indexes: bool):
+        """后台加载线程：持有写锁完成加载，随后按需预建索引"""
+        self._lock.acquire_write()
+        locked.set()
+        start = perf_counter()
+        try:
+            self._initial_load(versioned)
+            print(f"✅ 后台加载完成：{len(self.phone_map)} 条联系人，耗时 {perf_counter() - start:.2f} 秒")
+        except Exception as e:
+            print(f"❌ 后台加载失败：{e}")
+        finally:
+            self._lock.release_write()
+        if warm_indexes:
+            self._warm_indexes()
+
+    def wait_loaded(self, timeout: float = None) -> bool:
+        """
+        等待启动加载完成（background_load=True 时使用；同步加载时立即返回）
+        :return: 在超时前加载完成返回 True
+        """
+        return self._loaded.wait(timeout)
+
+    def _warm_indexes(self):
+        """依次建立尚未建立的索引；每个索引单独持有一次读锁，两个索引之间修改可以穿插执行"""
+        for name in _INDEX_KEYS:
+            if name in self._deferred:
+                with self._lock.read():
+                    self._require(name)
+
+    def _require(self, name: str):
+        """
+        取出索引，惰性模式下首次用到时由链表批量建立
+        调用方持有读锁（写者被排除在外，建立期间链表不变）；多个读者同时触发时只建立一次
+        :param name: 索引属性名，见 _INDEX_KEYS
+        """
+        if name in self._deferred:
+            with self._build_lock:
+                if name in self._deferred:
+                    self._build_index(name)
+        return getattr(self, name)
+
+    def _build_index(self, name: str):
+        start = perf_counter()
+        index, key = getattr(self, name), _INDEX_KEYS[name]
+        contacts = list(self._iter_contacts())
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            index.bulk_insert(zip(map(key, contacts), contacts))
+        finally:
+            if gc_enabled:
+                gc.enable()
+        # 先加入维护列表再移出待建集合：其他读者看到索引可用时，它已完整
+        self._live.append((index, key))
+        self._deferred.discard(name)
+        if self.metrics.enabled:
+            self.metrics.record(f"build_{name}", perf_counter() - start)
 
     def _load_from_file(self):
         """从文件加载联系人数据到内存"""
+        start = perf_counter()
         contacts_data = self.persistence.load()
-        for data in contacts_data:
-            # 加载时不重复持久化
-            self.add_contact(
-                name=data["name"],
-                phone=data["phone"],
-                remark=data["remark"],
-                persist=False
-            )
+        if self.metrics.enabled:
+            self.metrics.record("load", perf_counter() - start)
+        # 加载时不重复持久化；姓名为空、手机号非法的记录跳过并提示，不再静默载入
+        rejections = []
+        try:
+            self.bulk_load(sanitize_many(contacts_data, rejections), persist=False)
+        finally:
+            # 二进制快照以 mmap 打开，解码完毕（或解码/建索引出错）即释放映射与文件句柄
+            if hasattr(contacts_data, "close"):
+                contacts_data.close()
+        if rejections:
+            print(f"📌 加载数据：{summarize_rejections(rejections)}")
+
+    @_writes("bulk_load")
+    @_recorded("批量添加")
+    def bulk_load(self, records, persist: bool = False) -> int:
+        """
+        批量添加联系人，语义与逐条 add_contact 相同（手机号重复则后者覆盖并移到末尾）
+        一次遍历完成去重，再整体链接链表、批量构建两个索引
+        :param records: 可迭代对象，元素为 {"name", "phone", "remark"} 字典
+        :param persist: 完成后是否全量保存一次
+        :return: 实际写入的联系人数
+        """
+        # 批量创建大量容器对象时暂停循环垃圾回收，避免反复触发全代扫描
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            count = self._bulk_load(records)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if persist:
+            self.save()
+        return count
+
+    def _bulk_load(self, records) -> int:
+        """bulk_load 的主体：去重、链接链表、批量建索引"""
+        # 1. 一次遍历去重：后出现的记录覆盖先出现的，并移到末尾
+        latest = {}
+        for data in records:
+            phone = data["phone"]
+            latest.pop(phone, None)
+            latest[phone] = data
+        if not latest:
+            return 0
+        # 批量变更涉及的前缀过多，直接清空缓存
+        if self.cache is not None:
+            self.cache.clear()
+
+        # 2. 已存在的手机号按覆盖语义先删除
+        phone_map = self.phone_map
+        for phone in latest:
+            if phone in phone_map:
+                self.delete_contact(phone, persist=False)
+
+        # 3. 创建联系人并整体链接到链表尾部
+        seq = self._next_seq
+        tail = self.head.prev
+        new_contacts = []
+        for phone, data in latest.items():
+            contact = Contact(intern(data["name"]), phone, intern(data.get("remark", "")))
+            seq += 1
+            contact.seq = seq
+            contact.prev = tail
+            tail.next = contact
+            tail = contact
+            phone_map[phone] = contact
+            new_contacts.append(contact)
+        tail.next = self.head
+        self.head.prev = tail
+        self._next_seq = seq
+        if self._pmap is not None:
+            # 新增量占比大时整体重建比逐条路径复制快，代价是该版本不再与上一版本共享结构
+            if len(new_contacts) * 4 > len(phone_map):
+                self._pmap = PersistentMap.from_mapping(phone_map)
+            else:
+                for contact in new_contacts:
+                    self._pmap = self._pmap.set(contact.phone, contact)
+        if self._publish is not None:
+            for contact in new_contacts:
+                self._publish(OP_ADD, contact)
+
+        # 4. 批量构建已建立的索引（惰性索引首次检索时再由链表整体建立）
+        for index, key in self._live:
+            index.bulk_insert(zip(map(key, new_contacts), new_contacts))
+        return len(new_contacts)
 
+    def save(self) -> bool:
+        """全量保存当前全部联系人（SAVE/EXIT 等手动保存入口）"""
+        start = perf_counter()
+        try:
+            if self.feed is not None:
+                self.feed.flush()
+            return self.persistence.save_snapshot(self.get_all_contacts)
+        finally:
+            if self.metrics.enabled:
+                self.metrics.record("save", perf_counter() - start)
+
+    def close(self) -> None:
+        """关闭持久化管理器（等待后台压缩/合并写入完成）与变更日志，退出前调用"""
+        self.persistence.close()
+        if self.feed is not None:
+            self.feed.close()
+
+    def _persist(self, record, arg) -> bool:
+        """
+        单次修改的持久化（record_add / record_delete），开启统计时计入 persist
+        变更日志先于数据文件落盘：崩溃后数据文件中的修改在变更流里都有记录，恢复的序号不会被重复分配
+        """
+        if not self.metrics.enabled:
+            if self.feed is not None:
+                self.feed.flush()
+            return record(arg, self.get_all_contacts)
+        start = perf_counter()
+        try:
+            if self.feed is not None:
+                self.feed.flush()
+            return record(arg, self.get_all_contacts)
+        finally:
+            self.metrics.record("persist", perf_counter() - start)
+
+    def stats(self) -> dict:
+        """
+        运行统计快照
+        :return: {"contacts": 联系人数, "metrics_enabled": 是否开启计时,
+                  "operations": {操作名: 计数/耗时/直方图}, "name_index": {...}, "phone_index": {...},
+                  "name_search": {...}, "phone_grams"/"remark_grams": {...} 或 None（未启用或尚未建立）,
+                  "deferred_indexes": [惰性模式下尚未建立的索引名], "cache": {...} 或 None,
+                  "feed": {...} 或 None, "versions": {...} 或 None}
+        """
+        self._lock.acquire_read()
+        try:
+            indexes = {}
+            for name in _INDEX_KEYS:
+                index = getattr(self, name)
+                indexes[name] = index.stats() if index is not None and name not in self._deferred else None
+            return {
+                "contacts": len(self.phone_map),
+                "metrics_enabled": self.metrics.enabled,
+                "operations": self.metrics.snapshot(),
+                **indexes,
+                "deferred_indexes": [name for name in _INDEX_KEYS if name in self._deferred],
+                "cache": self.cache.stats() if self.cache is not None else None,
+                "feed": self.feed.stats() if self.feed is not None else None,
+                "versions": {"retained": len(self._versions), "latest": self._version,
+                             "max_versions": self.max_versions} if self._pmap is not None else None,
+            }
+        finally:
+            self._lock.release_read()
+
+    def import_file(self, path: str, progress=None) -> str:
+        """
+        从外部文件流式批量导入联系人并持久化
+        :param path: .dat / .csv / .jsonl / .vcf 文件，可带 .gz 后缀
+        :param progress: 进度回调，每读取 PROGRESS_EVERY 行以及结束时以已读行数调用
+        :return: 结果提示；姓名为空、手机号非法的行被跳过，附带原因汇总
+        """
+        rejections = []
+        records = sanitize_many(with_progress(read_records(path), progress), rejections)
+        count = self.bulk_load(records, persist=True)
+        message = f"✅ 导入成功：从 {path} 写入 {count} 条联系人"
+        if rejections:
+            message += f"\n📌 {summarize_rejections(rejections)}"
+        return message
+
+    @_reads("export")
+    def export_file(self, path: str, fmt: str = None, name_prefix: str = None,
+                    phone_prefix: str = None, progress=None) -> int:
+        """
+        流式导出联系人：沿链表（或前缀索引）逐条写出，不生成中间列表，内存占用与联系人数无关
+        :param path: 目标文件，格式按扩展名识别，.gz 结尾时 gzip 压缩
+        :param fmt: 显式指定格式（dat/csv/jsonl/vcf）
+        :param name_prefix: 只导出姓名以此开头的联系人
+        :param phone_prefix: 只导出电话以此开头的联系人（与 name_prefix 同时给出时取交集）
+        :param progress: 进度回调，每写出 PROGRESS_EVERY 行以及结束时以已写行数调用
+        :return: 写出的联系人数
+        """
+        if name_prefix:
+            contacts = self._require("name_index").iter_prefix(name_prefix)
+            if phone_prefix:
+                contacts = (c for c in contacts if c.phone.startswith(phone_prefix))
+        elif phone_prefix:
+            contacts = self._require("phone_index").iter_prefix(phone_prefix)
+        else:
+            contacts = self._iter_contacts()
+        rows = ((c.name, c.phone, c.remark) for c in contacts)
+        return write_records(path, with_progress(rows, progress), fmt)
+
+    @_writes("add")
+    @_recorded("添加")
     def add_contact(self, name: str, phone: str, remark: str = "", persist: bool = True) -> str:
         """添加联系人：手机号唯一，重复则覆盖"""
         # 1. 手机号已存在 → 删除旧联系人
         if phone in self.phone_map:
             self.delete_contact(phone, persist=False)
         
-        # 2. 创建新联系人，插入双向链表尾部
-        new_contact = Contact(name, phone, remark)
+        # 2. 创建新联系人，插入双向链表尾部（姓名/备注驻留，重复字符串只保留一份）
+        new_contact = Contact(intern(name), phone, intern(remark))
+        self._next_seq += 1
+        new_contact.seq = self._next_seq
         tail = self.head.prev
         tail.next = new_contact
         new_contact.prev = tail
@@ -51,15 +499,20 @@ class AddressBook:
         
         # 3. 更新映射和散列表索引
         self.phone_map[phone] = new_contact
-        self.name_index.insert(name, new_contact)
-        self.phone_index.insert(phone, new_contact)
+        self._index(new_contact)
+        if self._pmap is not None:
+            self._pmap = self._pmap.set(phone, new_contact)
+        if self._publish is not None:
+            self._publish(OP_ADD, new_contact)
         
         # 4. 持久化
         if persist:
-            self.persistence.save(self.get_all_contacts())
+            self._persist(self.persistence.record_add, new_contact)
         
         return f"✅ 添加成功：{new_contact}"
 
+    @_writes("delete")
+    @_recorded("删除")
     def delete_contact(self, phone: str, persist: bool = True) -> str:
         """根据手机号删除联系人"""
         # 1. 手机号不存在 → 失败
@@ -72,32 +525,300 @@ class AddressBook:
         contact.next.prev = contact.prev
         
         # 3. 从散列表索引和映射移除
-        self.name_index.delete(contact.name, contact)
-        self.phone_index.delete(contact.phone, contact)
+        for index, key in self._live:
+            index.delete(key(contact), contact)
         del self.phone_map[phone]
+        self._invalidate(contact)
+        if self._pmap is not None:
+            self._pmap = self._pmap.delete(phone)
+        if self._publish is not None:
+            self._publish(OP_DELETE, contact)
         
         # 4. 持久化
         if persist:
-            self.persistence.save(self.get_all_contacts())
+            self._persist(self.persistence.record_delete, phone)
         
         return f"✅ 删除成功：{contact}"
 
-    def find_by_name_prefix(self, prefix: str) -> list:
-        """按姓名前缀检索，返回全部匹配结果（取消原有限制）"""
-        return self.name_index.search(prefix)
+    def _index(self, contact: Contact):
+        """把联系人加入全部索引（插入序号可以早于已有记录，索引按 seq 有序插入）"""
+        for index, key in self._live:
+            index.insert(key(contact), contact)
+        self._invalidate(contact)
+
+    # ---------- 变更流（feed） ----------
+    def changes_since(self, seq: int, limit: int = None) -> list:
+        """
+        取序号大于 seq 的变更，供下游增量同步（不占用通讯录的读写锁）
+        :param seq: 消费者已处理的最大序号，从头读取传 0
+        :param limit: 最多返回条数
+        :return: ChangeEvent 列表；所需变更已超出保留范围时抛出 ValueError，需全量同步
+        """
+        if self.feed is None:
+            raise ValueError("未开启变更流（创建 AddressBook 时传入 feed=ChangeFeed(...)，或以 --feed 启动）")
+        return self.feed.since(seq, limit)
+
+    # ---------- 版本化（versioned=True） ----------
+    def _require_versioned(self):
+        if self._pmap is None:
+            raise ValueError("未开启版本化模式（创建 AddressBook 时传入 versioned=True，或以 --versioned 启动）")
+
+    def _push_version(self, label: str, pmap: PersistentMap) -> int:
+        """记录一个历史版本（只保存根节点，O(1)），返回版本号"""
+        self._version += 1
+        self._versions.append((self._version, label, pmap, time()))
+        if len(self._versions) > self.max_versions:
+            del self._versions[0]
+        return self._version
+
+    @_writes("snapshot")
+    def snapshot(self, label: str = "") -> int:
+        """
+        为当前状态打一个命名快照（O(1)，与当前状态共享全部结构）
+        :return: 版本号，可用于 rollback
+        """
+        self._require_versioned()
+        return self._push_version(label or "快照", self._pmap)
+
+    @_reads("versions")
+    def list_versions(self) -> list:
+        """保留的历史版本（从旧到新）：[{"version", "label", "contacts", "created"}]"""
+        self._require_versioned()
+        return [{"version": version, "label": label, "contacts": len(pmap), "created": created}
+                for version, label, pmap, created in self._versions]
+
+    @_writes("undo")
+    def undo(self, persist: bool = True) -> str:
+        """撤销最近一次修改（或回到最近的快照），只应用两个版本之间的差异，不重新读取文件"""
+        self._require_versioned()
+        if not self._versions:
+            return "❌ 撤销失败：没有可撤销的历史版本"
+        version, label, pmap, _ = self._versions.pop()
+        changed = self._restore(pmap)
+        if persist and changed:
+            self.save()
+        return f"✅ 撤销成功：{label}（回到版本 {version}，变动 {changed} 个手机号）"
+
+    @_writes("rollback")
+    def rollback(self, version: int, persist: bool = True) -> str:
+        """
+        回滚到指定历史版本；回滚前的状态也记入历史，可再 undo 回来
+        :param version: list_versions() 中的版本号
+        """
+        self._require_versioned()
+        target = next((pmap for v, _, pmap, _ in self._versions if v == version), None)
+        if target is None:
+            return f"❌ 回滚失败：版本 {version} 不存在或已超出保留范围"
+        current = self._pmap
+        changed = self._restore(target)
+        if changed:
+            self._push_version(f"回滚到版本 {version}", current)
+            if persist:
+                self.save()
+        return f"✅ 回滚成功：已回到版本 {version}（变动 {changed} 个手机号）"
+
+    def _restore(self, target: PersistentMap) -> int:
+        """
+        把当前状态切换到 target：两棵 HAMT 求差异（共享子树直接跳过），只删除/恢复有变化的联系人
+        恢复的是当时的联系人对象本身，保留原插入序号与链表位置
+        :return: 变动的手机号数
+        """
+        changes = list(self._pmap.diff(target))
+        restored = []
+        for phone, current, previous in changes:
+            if current is not None:
+                self.delete_contact(phone, persist=False)
+            if previous is not None:
+                restored.append(previous)
+        restored.sort(key=_seq)
+        phone_map = self.phone_map
+        for contact in restored:
+            # 删除时不清空链表指针：沿 prev 找到仍在链表中的最近前驱，
+            # 其后到原位置之间只可能有先前恢复的联系人，按 seq 向后跳过即可
+            node = contact.prev
+            while node is not self.head and phone_map.get(node.phone) is not node:
+                node = node.prev
+            while node.next is not self.head and node.next.seq < contact.seq:
+                node = node.next
+            following = node.next
+            contact.prev = node
+            contact.next = following
+            node.next = contact
+            following.prev = contact
+            phone_map[contact.phone] = contact
+            self._index(contact)
+            if self._publish is not None:
+                self._publish(OP_ADD, contact)
+        self._pmap = target
+        return len(changes)
+
+    def _invalidate(self, contact: Contact):
+        """精确失效缓存：只有作为该联系人姓名/电话前缀的检索结果会变化"""
+        if self.cache is None:
+            return
+        name, phone = contact.name, contact.phone
+        self.cache.invalidate(
+            [("name", name[:i]) for i in range(1, len(name) + 1)]
+            + [("phone", phone[:i]) for i in range(1, len(phone) + 1)]
+        )
+
+    @_reads("find_name")
+    def find_by_name_prefix(self, prefix: str, limit: int = None, offset: int = 0, after: Contact = None):
+        """
+        按姓名前缀检索，结果顺序稳定（由索引引擎决定，hash 为添加顺序）
+        :param limit: 为 None 时返回全部匹配结果（列表）；否则只取一页，返回 SearchPage
+        :param offset: 分页起始位置
+        :param after: 键集分页游标（上一页的 next_cursor），只返回排在其后的结果
+        """
+        cursor = (after.name, after.seq) if after is not None else None
+        return self._search("name", self._require("name_index"), prefix, limit, offset, cursor)
+
+    @_reads("find_name_exact")
+    def find_by_name(self, name: str, limit: int = None, offset: int = 0):
+        """
+        精确姓名检索：O(1) 定位同名联系人，不会像前缀检索那样带出以该姓名开头的其他姓名，结果按添加顺序
+        :param limit: 为 None 时返回全部匹配结果（列表）；否则只取一页，返回 SearchPage
+        :param offset: 分页起始位置
+        """
+        offset = max(offset, 0)
+        bucket = self._require("name_search").lookup(name)
+        if limit is None:
+            return bucket[offset:]
+        return SearchPage(bucket[offset:offset + limit], len(bucket), offset, limit)
+
+    @_reads("get_many")
+    def get_many(self, phones) -> list:
+        """
+        批量按完整手机号查找，一次加锁完成
+        :param phones: 手机号可迭代对象
+        :return: 与 phones 一一对应的联系人，不存在的为 None
+        """
+        return list(map(self.phone_map.get, phones))
+
+    @_reads("find_phone")
+    def find_by_phone_prefix(self, prefix: str, limit: int = None, offset: int = 0, after: Contact = None):
+        """
+        按电话前缀检索，结果顺序稳定（由索引引擎决定，hash 为添加顺序）
+        :param limit: 为 None 时返回全部匹配结果（列表）；否则只取一页，返回 SearchPage
+        :param offset: 分页起始位置
+        :param after: 键集分页游标（上一页的 next_cursor），只返回排在其后的结果
+        """
+        cursor = (after.phone, after.seq) if after is not None else None
+        return self._search("phone", self._require("phone_index"), prefix, limit, offset, cursor)
+
+    @_reads("find_pinyin")
+    def find_by_pinyin(self, query: str, limit: int = None, offset: int = 0):
+        """
+        按姓名全拼或首字母前缀检索，如 "zs"、"zhangs" 均可找到"张三"，结果按添加顺序
+        :param limit: 为 None 时返回全部匹配结果（列表）；否则只取一页，返回 SearchPage
+        :param offset: 分页起始位置
+        """
+        return self._search_names(self._require("name_search").pinyin_names(query), limit, offset)
+
+    @_reads("find_fuzzy")
+    def find_by_name_fuzzy(self, name: str, max_distance: int = 1, limit: int = None, offset: int = 0):
+        """
+        姓名模糊检索：容忍 max_distance 个错字/漏字/多字，编辑距离小的排在前面
+        :param limit: 为 None 时返回全部匹配结果（列表）；否则只取一页，返回 SearchPage
+        :param offset: 分页起始位置
+        """
+        return self._search_names(self._require("name_search").fuzzy_names(name, max_distance), limit, offset)
 
-    def find_by_phone_prefix(self, prefix: str) -> list:
-        """按电话前缀检索，返回全部匹配结果（取消原有限制）"""
-        return self.phone_index.search(prefix)
+    def _search_names(self, groups: list, limit: int, offset: int):
+        """按姓名分组取联系人：未指定 limit 时返回全量列表"""
+        offset = max(offset, 0)
+        items = self.name_search.collect(groups, limit, offset)
+        if limit is None:
+            return items
+        return SearchPage(items, self.name_search.count(groups), offset, limit)
+
+    @_reads("find_phone_substring")
+    def find_by_phone_substring(self, fragment: str, limit: int = None, offset: int = 0):
+        """
+        按手机号任意位置的片段检索（如后四位），结果按添加顺序
+        :param limit: 为 None 时返回全部匹配结果（列表）；否则只取一页，返回 SearchPage
+        :param offset: 分页起始位置
+        """
+        return self._search_substring(self._require("phone_grams"), "phone", fragment, limit, offset)
+
+    @_reads("find_remark")
+    def find_by_remark(self, keyword: str, limit: int = None, offset: int = 0):
+        """
+        按备注关键词检索（备注中任意位置包含 keyword），结果按添加顺序
+        :param limit: 为 None 时返回全部匹配结果（列表）；否则只取一页，返回 SearchPage
+        :param offset: 分页起始位置
+        """
+        return self._search_substring(self._require("remark_grams"), "remark", keyword, limit, offset)
+
+    def _search_substring(self, index, field: str, fragment: str, limit: int, offset: int):
+        """子串检索：有 n-gram 索引时求倒排表交集，否则遍历链表逐条比较"""
+        offset = max(offset, 0)
+        stop = offset + limit if limit is not None else None
+        if index is not None:
+            seqs = index.match(fragment)
+            items, total = index.resolve(seqs[offset:stop]), len(seqs)
+        else:
+            results = [c for c in self._iter_contacts() if fragment in getattr(c, field)]
+            items, total = results[offset:stop], len(results)
+        if limit is None:
+            return items
+        return SearchPage(items, total, offset, limit)
+
+    @_reads("find_phone_batch")
+    def find_by_phone_prefixes(self, prefixes: list, limit: int = None) -> list:
+        """
+        批量按电话前缀检索（列存储引擎下一次向量化调用完成）
+        :param prefixes: 前缀列表
+        :param limit: 每个前缀最多返回条数
+        :return: 与 prefixes 一一对应的联系人列表
+        """
+        return self._require("phone_index").search_many(prefixes, limit)
+
+    def _search(self, kind: str, index, prefix: str, limit: int, offset: int, cursor: tuple):
+        """索引检索：未指定 limit 时保持原有的全量列表返回值"""
+        offset = max(offset, 0)
+        # 偏移分页直接在缓存的有序结果上切片；键集游标仍走索引
+        if self.cache is not None and cursor is None:
+            key = (kind, prefix)
+            results = self.cache.get(key)
+            if results is None:
+                results = index.search(prefix)
+                self.cache.put(key, results)
+            if limit is None:
+                return results[offset:]
+            return SearchPage(results[offset:offset + limit], len(results), offset, limit)
+        if limit is None:
+            return index.search(prefix, offset=offset, after=cursor)
+        return SearchPage(index.search(prefix, limit, offset, cursor), index.count(prefix), offset, limit)
+
+    @_reads("list")
+    def get_all_contacts(self, limit: int = None, offset: int = 0, after: Contact = None):
+        """
+        遍历所有联系人（按添加顺序）
+        :param limit: 为 None 时返回全部联系人列表；否则只取一页，返回 SearchPage
+        :param offset: 分页起始位置
+        :param after: 键集分页游标，从该联系人之后开始遍历
+        """
+        contacts = self._iter_contacts(after)
+        if limit is not None:
+            offset = max(offset, 0)
+            return SearchPage(list(islice(contacts, offset, offset + limit)),
+                              len(self.phone_map), offset, limit)
+        return list(contacts)
 
-    def get_all_contacts(self) -> list:
-        """遍历所有联系人，返回列表"""
-        contacts_list = []
+    def _iter_contacts(self, after: Contact = None):
+        """沿双向链表惰性遍历联系人，after 不为空时从其后继开始"""
         current_node = self.head.next
-        while current_node != self.head:
-            contacts_list.append(current_node)
+        if after is not None:
+            if self.phone_map.get(after.phone) is after:
+                current_node = after.next
+            else:
+                # 游标联系人已被删除：按序号跳过所有不晚于它的节点
+                while current_node is not self.head and current_node.seq <= after.seq:
+                    current_node = current_node.next
+        while current_node is not self.head:
+            yield current_node
             current_node = current_node.next
-        return contacts_list
     
     # 分页
     def get_paginated_contacts(self, contacts: list, page: int, page_size: int = 10) -> tuple:
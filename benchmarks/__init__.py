@@ -0,0 +1,5 @@
+"""
+性能基准模块：在仓库根目录以 python -m benchmarks.<脚本名> 运行
+- suite：综合基准套件，输出可跨版本对比的 JSON 报告（配合 compare 使用）
+- bench_*：针对单项优化的专项基准
+"""
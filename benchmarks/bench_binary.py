@@ -0,0 +1,56 @@
+"""
+benchmarks/bench_binary.py - 文本 .dat 与二进制快照的冷启动对比
+用法：python -m benchmarks.bench_binary [--sizes 100000 1000000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts, write_dat
+from storage import PersistenceManager, BinaryPersistenceManager, BinarySnapshot
+from storage.binary import dat_to_binary
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="二进制快照冷启动基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'规模':>9} | {'格式':>4} | {'文件 MB':>8} | {'解析 s':>8} | {'冷启动 s':>9}")
+    print("-" * 54)
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            dat = os.path.join(workdir, f"{size}.dat")
+            binary = os.path.join(workdir, f"{size}.bin")
+            write_dat(dat, make_contacts(size, seed=size))
+            dat_to_binary(dat, binary)
+
+            def parse_bin():
+                with BinarySnapshot(binary) as snapshot:
+                    for _ in snapshot.iter_tuples():
+                        pass
+
+            cases = [
+                ("dat", dat, lambda: PersistenceManager(dat).load(),
+                 lambda: AddressBook(PersistenceManager(dat, dat + ".tmp"))),
+                ("bin", binary, parse_bin,
+                 lambda: AddressBook(BinaryPersistenceManager(binary, binary + ".tmp"))),
+            ]
+            for fmt, path, parse, cold_start in cases:
+                mb = os.path.getsize(path) / 1e6
+                print(f"{size:>9} | {fmt:>4} | {mb:>8.1f} | {timed(parse):>8.3f} | {timed(cold_start):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+benchmarks/bench_cache.py - 前缀检索结果 LRU 缓存在 Zipf 分布查询下的收益
+查询前缀按 Zipf 分布抽取（少数热门前缀占大部分查询），按 --write-ratio 穿插添加操作触发精确失效
+用法：python -m benchmarks.bench_cache [--size 100000] [--queries 50000] [--cache-sizes 0 256 4096]
+      [--index hash|sorted] [--limit 10]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts
+from index import INDEX_ENGINES
+from storage import PersistenceManager
+
+
+def zipf_trace(universe: list, count: int, skew: float, rng: random.Random) -> list:
+    """按 Zipf 分布（第 k 名权重 1/k^skew）从 universe 中抽取 count 个元素"""
+    cum_weights = list(itertools.accumulate(1 / rank ** skew for rank in range(1, len(universe) + 1)))
+    return rng.choices(universe, cum_weights=cum_weights, k=count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="检索结果缓存基准（Zipf 查询分布）")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50000)
+    parser.add_argument("--prefixes", type=int, default=20000, help="候选前缀数量")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf 指数")
+    parser.add_argument("--write-ratio", type=float, default=0.01, help="穿插添加操作的比例")
+    parser.add_argument("--limit", type=int, default=10, help="每次检索的页大小，0 表示取全部结果")
+    parser.add_argument("--index", choices=sorted(INDEX_ENGINES), default="hash")
+    parser.add_argument("--cache-sizes", type=int, nargs="+", default=[0, 256, 4096])
+    args = parser.parse_args()
+
+    rows = make_contacts(args.size + args.queries, seed=args.size)
+    base, extra = rows[:args.size], rows[args.size:]
+    records = [{"name": n, "phone": p, "remark": r} for n, p, r in base]
+
+    # 候选前缀：姓名 2 字前缀与 4~7 位电话前缀，打乱后按排名赋予 Zipf 权重
+    rng = random.Random(0)
+    universe = set()
+    while len(universe) < args.prefixes:
+        name, phone, _ = rng.choice(base)
+        universe.add(("name", name[:2]) if rng.random() < 0.5 else ("phone", phone[:rng.randint(4, 7)]))
+    universe = sorted(universe)
+    rng.shuffle(universe)
+    trace = zipf_trace(universe, args.queries, args.skew, rng)
+    writes = [rng.random() < args.write_ratio for _ in trace]
+
+    print(f"{'缓存条目':>8} | {'QPS':>10} | {'平均 us':>8} | {'命中率':>7} | {'失效':>7}")
+    print("-" * 52)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "empty.dat")
+        for cache_size in args.cache_sizes:
+            with contextlib.redirect_stdout(io.StringIO()):
+                book = AddressBook(PersistenceManager(path, path + ".tmp"), index_engine=args.index,
+                                   cache_size=cache_size)
+            book.bulk_load(records)
+            # bulk_load 期间暂停了 GC，先把新建对象一次性晋升到老年代，避免计入检索耗时
+            gc.collect()
+            find = {"name": book.find_by_name_prefix, "phone": book.find_by_phone_prefix}
+            new_rows = iter(extra)
+            limit = args.limit or None
+
+            start = time.perf_counter()
+            for (kind, prefix), write in zip(trace, writes):
+                if write:
+                    name, phone, remark = next(new_rows)
+                    book.add_contact(name, phone, remark, persist=False)
+                find[kind](prefix, limit=limit)
+            elapsed = time.perf_counter() - start
+
+            cache = book.stats()["cache"] or {"hit_ratio": 0.0, "invalidations": 0}
+            print(f"{cache_size:>8} | {len(trace) / elapsed:>10.0f} | {elapsed / len(trace) * 1e6:>8.1f} | "
+                  f"{cache['hit_ratio']:>7.2%} | {cache['invalidations']:>7}")
+            del book
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+benchmarks/bench_column.py - 手机号列存储（numpy）与其他索引引擎的检索吞吐
+单条检索：逐个调用 find_by_phone_prefix(limit=10)
+批量检索：find_by_phone_prefixes(批量前缀, limit=10) 一次调用
+用法：python -m benchmarks.bench_column [--sizes 100000 1000000] [--queries 20000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts
+from index import PHONE_INDEX_ENGINES
+from storage import PersistenceManager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="手机号索引引擎检索吞吐基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--engines", nargs="+", default=sorted(PHONE_INDEX_ENGINES))
+    args = parser.parse_args()
+
+    print(f"{'引擎':>8} | {'规模':>9} | {'构建 s':>7} | {'单条 QPS':>10} | {'批量 QPS':>10}")
+    print("-" * 58)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "empty.dat")
+        for size in args.sizes:
+            rows = make_contacts(size, seed=size)
+            records = [{"name": n, "phone": p, "remark": r} for n, p, r in rows]
+            rng = random.Random(0)
+            prefixes = [rng.choice(rows)[1][:rng.randint(3, 8)] for _ in range(args.queries)]
+            for engine in args.engines:
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        book = AddressBook(PersistenceManager(path, path + ".tmp"), phone_index_engine=engine)
+                except ImportError as e:
+                    print(f"{engine:>8} | 跳过：{e}")
+                    continue
+                start = time.perf_counter()
+                book.bulk_load(records)
+                build = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for prefix in prefixes:
+                    book.find_by_phone_prefix(prefix, limit=10)
+                single = len(prefixes) / (time.perf_counter() - start)
+
+                start = time.perf_counter()
+                book.find_by_phone_prefixes(prefixes, limit=10)
+                batch = len(prefixes) / (time.perf_counter() - start)
+                print(f"{engine:>8} | {size:>9} | {build:>7.2f} | {single:>10.0f} | {batch:>10.0f}")
+                del book
+
+
+if __name__ == "__main__":
+    main()
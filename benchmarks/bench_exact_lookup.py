@@ -0,0 +1,87 @@
+"""
+benchmarks/bench_exact_lookup.py - 精确姓名检索与批量手机号查找
+1. 精确姓名：find_by_name（姓名 → 联系人一对多映射）对比 find_by_name_prefix 后按姓名过滤（原有做法）
+   查询取随机联系人的完整姓名，前缀检索会带出所有以该姓名开头的姓名
+2. 批量手机号：get_many 一次调用对比逐个 find_by_phone_prefix（完整号码作前缀）
+用法：python -m benchmarks.bench_exact_lookup [--sizes 100000 1000000] [--queries 2000] [--batch 5000]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts
+from storage import PersistenceManager
+
+
+def _timed(fn, repeat: int = 1) -> float:
+    """执行 fn repeat 次，返回平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="精确姓名检索与批量手机号查找基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=5000, help="get_many 每批手机号数")
+    parser.add_argument("--index", choices=("hash", "sorted"), default="hash")
+    args = parser.parse_args()
+
+    print(f"{'规模':>9} | {'操作':<22} | {'新路径':>10} | {'原路径':>10} | {'加速':>6}")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "empty.dat")
+        for size in args.sizes:
+            rows = make_contacts(size, seed=size)
+            with contextlib.redirect_stdout(io.StringIO()):
+                book = AddressBook(PersistenceManager(path, path + ".tmp"), index_engine=args.index)
+            book.bulk_load({"name": n, "phone": p, "remark": r} for n, p, r in rows)
+            gc.collect()
+
+            rng = random.Random(0)
+            names = [rng.choice(rows)[0] for _ in range(args.queries)]
+            # 一半存在、一半不存在的手机号
+            phones = [rng.choice(rows)[1] if i % 2 else f"1{rng.randrange(10 ** 10):010d}"
+                      for i in range(args.batch)]
+
+            def exact_by_prefix():
+                for name in names:
+                    [c for c in book.find_by_name_prefix(name) if c.name == name]
+
+            def exact_by_map():
+                for name in names:
+                    book.find_by_name(name)
+
+            # 结果一致性校验
+            for name in names[:100]:
+                expected = [c for c in book.find_by_name_prefix(name) if c.name == name]
+                if sorted(c.seq for c in book.find_by_name(name)) != sorted(c.seq for c in expected):
+                    print(f"❌ 精确姓名 {name} 结果不一致")
+            prefix_ms = _timed(exact_by_prefix) * 1000 / len(names)
+            map_ms = _timed(exact_by_map) * 1000 / len(names)
+            print(f"{size:>9} | {'精确姓名 us/次':<22} | {map_ms:>10.2f} | {prefix_ms:>10.2f} | "
+                  f"{prefix_ms / map_ms:>5.1f}x")
+
+            def many_by_prefix():
+                return [next(iter(book.find_by_phone_prefix(phone)), None) for phone in phones]
+
+            if [c and c.phone for c in book.get_many(phones)] != [c and c.phone for c in many_by_prefix()]:
+                print("❌ get_many 结果不一致")
+            loop_ms = _timed(many_by_prefix, 3)
+            batch_ms = _timed(lambda: book.get_many(phones), 3)
+            label = f"批量手机号 ms/{args.batch}条"
+            print(f"{size:>9} | {label:<22} | {batch_ms:>10.2f} | {loop_ms:>10.2f} | {loop_ms / batch_ms:>5.1f}x")
+            del book, rows
+            gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+benchmarks/bench_export.py - 流式导出/导入吞吐与内存
+对每种格式（dat/csv/jsonl/vcf，各含 gzip 压缩）：
+1. 导出：AddressBook.export_file 沿链表流式写出，统计 行/秒、MB/秒（按未压缩字节计）与文件大小
+2. 导入：read_records 流式解析整个文件（不含建索引），统计 行/秒、MB/秒
+3. 内存：用 tracemalloc 记录一次导出与一次解析的峰值，应与行数无关（只占一行/一块的缓冲）
+用法：python -m benchmarks.bench_export [--size 1000000] [--formats csv jsonl]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts
+from storage import FORMATS, PersistenceManager, read_records
+
+
+def _traced_peak(fn) -> int:
+    """执行 fn，返回期间 Python 堆分配的峰值（字节）"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _drain(path: str) -> int:
+    count = 0
+    for _ in read_records(path):
+        count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="流式导出/导入基准")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--no-trace", action="store_true", help="跳过 tracemalloc 峰值内存测量（较慢）")
+    args = parser.parse_args()
+
+    rows = make_contacts(args.size, seed=args.size)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "empty.dat")
+        with contextlib.redirect_stdout(io.StringIO()):
+            book = AddressBook(PersistenceManager(path, path + ".tmp"))
+        book.bulk_load({"name": n, "phone": p, "remark": r} for n, p, r in rows)
+        del rows
+        gc.collect()
+
+        print(f"📊 {len(book.phone_map)} 条联系人")
+        print(f"{'格式':>9} | {'文件 MB':>8} | {'导出 行/s':>10} | {'导出 MB/s':>9} | "
+              f"{'导入 行/s':>10} | {'导入 MB/s':>9} | {'导出峰值 KB':>11} | {'导入峰值 KB':>11}")
+        print("-" * 100)
+        for fmt in args.formats:
+            for compressed in (False, True):
+                target = os.path.join(workdir, f"export.{fmt}" + (".gz" if compressed else ""))
+                start = time.perf_counter()
+                count = book.export_file(target, fmt)
+                export_time = time.perf_counter() - start
+                size = os.path.getsize(target)
+                # MB/秒 统一按未压缩的数据量计算，压缩与不压缩可直接比较
+                raw_size = size if not compressed else os.path.getsize(target[:-3])
+
+                start = time.perf_counter()
+                loaded = _drain(target)
+                import_time = time.perf_counter() - start
+                if loaded != count:
+                    print(f"❌ {fmt}：导出 {count} 行，读回 {loaded} 行")
+
+                if args.no_trace:
+                    export_peak = import_peak = 0
+                else:
+                    export_peak = _traced_peak(lambda: book.export_file(target, fmt))
+                    import_peak = _traced_peak(lambda: _drain(target))
+                label = fmt + (".gz" if compressed else "")
+                mb = raw_size / 2 ** 20
+                print(f"{label:>9} | {size / 2 ** 20:>8.1f} | {count / export_time:>10.0f} | "
+                      f"{mb / export_time:>9.1f} | {loaded / import_time:>10.0f} | {mb / import_time:>9.1f} | "
+                      f"{export_peak / 1024:>11.0f} | {import_peak / 1024:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
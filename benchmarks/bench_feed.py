@@ -0,0 +1,149 @@
+"""
+benchmarks/bench_feed.py - 变更流开销与增量同步吞吐
+1. 高频修改吞吐：无变更流 / 仅内存 / 追加日志文件（每 64 条 fsync）/ 日志 + 订阅回调，
+   负载为随机覆盖添加与删除（覆盖添加产生删除 + 新增两条变更）
+2. 拉取：内存缓冲中的 since 与超出缓冲后从日志文件补读，每秒变更数
+3. 并发：写线程全速修改，消费者线程持续 since(游标) 拉取并回放到本地字典，结束后与通讯录逐条比对
+4. 对照：下游整文件重读（PersistenceManager.load）与增量拉取同一批修改的耗时
+用法：python -m benchmarks.bench_feed [--size 1000000] [--ops 200000] [--capacity 100000]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts, write_dat
+from storage import ChangeFeed, OP_ADD, PersistenceManager
+
+
+def mutate(book: AddressBook, rows: list, ops: int, seed: int) -> float:
+    """ops 次随机修改（约 3/4 覆盖添加、1/4 删除），返回耗时"""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(ops):
+        name, phone, remark = rows[rng.randrange(len(rows))]
+        if rng.random() < 0.75:
+            book.add_contact(name, phone, remark, persist=False)
+        else:
+            book.delete_contact(phone, persist=False)
+    return time.perf_counter() - start
+
+
+def replay(mirror: dict, events: list) -> None:
+    for event in events:
+        if event.op == OP_ADD:
+            mirror[event.phone] = (event.name, event.remark)
+        else:
+            mirror.pop(event.phone, None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="变更流基准")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--capacity", type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = make_contacts(args.size, seed=args.size)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "contacts.dat")
+        write_dat(path, rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            book = AddressBook(PersistenceManager(path, path + ".tmp"))
+        gc.collect()
+
+        # 1. 高频修改吞吐：同一实例依次换上不同的变更流（加载本身不产生变更，只加载一次）
+        received = []
+        feeds = {
+            "无变更流": None,
+            "仅内存": ChangeFeed(args.capacity),
+            "日志文件": ChangeFeed(args.capacity, os.path.join(workdir, "a.feed"), quiet=True),
+            "日志文件+订阅回调": ChangeFeed(args.capacity, os.path.join(workdir, "b.feed"), quiet=True),
+        }
+        feeds["日志文件+订阅回调"].subscribe(received.append)
+        print(f"{'模式':<12} | {'修改 次/秒':>12} | {'变更 条/秒':>12} | {'相对无变更流':>10}")
+        print("-" * 60)
+        baseline = None
+        for seed, (label, feed) in enumerate(feeds.items()):
+            book.feed = feed
+            book._publish = feed.emit if feed is not None else None
+            elapsed = mutate(book, rows, args.ops, seed)
+            events = feed.last_seq if feed is not None else 0
+            baseline = baseline or elapsed
+            print(f"{label:<12} | {args.ops / elapsed:>12.0f} | {events / elapsed:>12.0f} | {baseline / elapsed:>9.2f}x")
+            if feed is not None:
+                feed.close()
+        print(f"📌 订阅回调共收到 {len(received)} 条变更")
+
+        # 2. 拉取吞吐：内存缓冲 vs 重新打开日志后从头补读
+        memory_feed = feeds["仅内存"]
+        cursor = memory_feed.oldest_seq - 1
+        pulled = 0
+        start = time.perf_counter()
+        while cursor < memory_feed.last_seq:
+            batch = memory_feed.since(cursor, 1000)
+            pulled += len(batch)
+            cursor = batch[-1].seq
+        memory_rate = pulled / (time.perf_counter() - start)
+        file_feed = ChangeFeed(args.capacity, feeds["日志文件"].filepath, quiet=True)
+        start = time.perf_counter()
+        backlog = file_feed.since(0)
+        file_rate = len(backlog) / (time.perf_counter() - start)
+        print(f"📊 拉取：内存缓冲 {memory_rate:.0f} 条/秒（{pulled} 条，每批 1000），"
+              f"从日志补读 {file_rate:.0f} 条/秒（{len(backlog)} 条）")
+        file_feed.close()
+
+        # 3. 并发：写线程全速修改，消费者持续拉取并回放
+        feed = ChangeFeed(args.capacity)
+        book.feed = feed
+        book._publish = feed.emit
+        mirror = {c.phone: (c.name, c.remark) for c in book.get_all_contacts()}
+        done = threading.Event()
+        lags = []
+
+        def consume():
+            seq = 0
+            while True:
+                finished = done.is_set()
+                events = feed.since(seq)
+                if events:
+                    replay(mirror, events)
+                    seq = events[-1].seq
+                    lags.append(feed.last_seq - seq)
+                elif finished:
+                    return
+                else:
+                    time.sleep(0.001)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        elapsed = mutate(book, rows, args.ops, seed=3)
+        done.set()
+        consumer.join()
+        consistent = mirror == {c.phone: (c.name, c.remark) for c in book.get_all_contacts()}
+        print(f"📊 并发：写入 {args.ops / elapsed:.0f} 次/秒，消费者拉取 {len(lags)} 批，"
+              f"最大落后 {max(lags, default=0)} 条，回放结果{'与通讯录一致' if consistent else '不一致 ❌'}")
+
+        # 4. 对照：整文件重读 vs 增量拉取最近 1000 次修改
+        with contextlib.redirect_stdout(io.StringIO()):
+            book.save()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            PersistenceManager(path, path + ".tmp").load()
+        reread = time.perf_counter() - start
+        since = feed.last_seq
+        mutate(book, rows, 1000, seed=4)
+        start = time.perf_counter()
+        replay(mirror, feed.since(since))
+        incremental = time.perf_counter() - start
+        print(f"📊 同步 1000 次修改：整文件重读 {reread:.2f} 秒，增量拉取回放 {incremental * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+benchmarks/bench_group_commit.py - 脚本化批量修改的吞吐：每次修改全量保存 vs 合并写入
+用法：python -m benchmarks.bench_group_commit [--base 10000] [--ops 100000] [--baseline-ops 500]
+每次全量保存的模式太慢，只执行 --baseline-ops 次修改并按吞吐折算
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts, write_dat
+from storage import PersistenceManager, CoalescingPersistenceManager
+
+
+def run(book: AddressBook, extra: list) -> float:
+    """交替执行 ADD / DEL，返回每秒修改次数"""
+    start = time.perf_counter()
+    for i, (name, phone, remark) in enumerate(extra):
+        if i % 3 == 2:
+            book.delete_contact(extra[i - 1][1])
+        else:
+            book.add_contact(name, phone, remark)
+    book.persistence.close()
+    return len(extra) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="合并写入吞吐基准")
+    parser.add_argument("--base", type=int, default=10000, help="预置联系人数")
+    parser.add_argument("--ops", type=int, default=100000)
+    parser.add_argument("--baseline-ops", type=int, default=500)
+    args = parser.parse_args()
+
+    contacts = make_contacts(args.base + args.ops)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "book.dat")
+        cases = [
+            # 打印输出重定向到内存，不计终端开销
+            ("每次全量保存", lambda: PersistenceManager(path, path + ".tmp"), args.baseline_ops),
+            ("合并写入", lambda: CoalescingPersistenceManager(path, path + ".tmp"), args.ops),
+        ]
+        for label, make_manager, ops in cases:
+            write_dat(path, contacts[:args.base])
+            with contextlib.redirect_stdout(io.StringIO()):
+                book = AddressBook(make_manager())
+                rate = run(book, contacts[args.base:args.base + ops])
+                saved = len(PersistenceManager(path).load())
+            print(f"{label:<8}：{ops:>7} 次修改，{rate:>10.0f} 次/秒，落盘 {saved} 条")
+
+
+if __name__ == "__main__":
+    main()
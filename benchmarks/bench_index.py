@@ -0,0 +1,70 @@
+"""
+benchmarks/bench_index.py - HashPrefixIndex vs SortedPrefixIndex
+对比构建耗时、每个联系人的内存占用（RSS 增量）以及前缀检索延迟
+用法：python -m benchmarks.bench_index [--sizes 10000 100000 1000000] [--queries 2000]
+"""
+import argparse
+import gc
+import multiprocessing
+import random
+import time
+
+from benchmarks.datagen import make_contacts
+from benchmarks.memory import rss_bytes
+from contact import Contact
+from index import INDEX_ENGINES
+
+
+def run_one(engine: str, size: int, queries: int) -> dict:
+    """在独立子进程中构建 name/phone 两个索引并测量"""
+    contacts = [Contact(name, phone, remark) for name, phone, remark in make_contacts(size, seed=size)]
+    for seq, c in enumerate(contacts, 1):
+        c.seq = seq
+    gc.collect()
+    rss_before = rss_bytes()
+
+    start = time.perf_counter()
+    name_index = INDEX_ENGINES[engine]()
+    phone_index = INDEX_ENGINES[engine]()
+    for c in contacts:
+        name_index.insert(c.name, c)
+        phone_index.insert(c.phone, c)
+    # 有序数组引擎在首次检索时合并缓冲区，计入构建时间
+    name_index.search("张")
+    phone_index.search("1")
+    build = time.perf_counter() - start
+
+    gc.collect()
+    memory = rss_bytes() - rss_before
+
+    rng = random.Random(0)
+    samples = rng.sample(contacts, min(queries, size))
+    prefixes = [(phone_index, c.phone[:rng.randint(3, 8)]) for c in samples]
+    prefixes += [(name_index, c.name[:2]) for c in samples]
+    start = time.perf_counter()
+    for index, prefix in prefixes:
+        index.search(prefix)
+    lookup = (time.perf_counter() - start) / len(prefixes)
+
+    return {"build_s": build, "bytes_per_contact": memory / size, "lookup_us": lookup * 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="前缀索引引擎对比基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'引擎':>8} | {'规模':>9} | {'构建 s':>8} | {'字节/联系人':>10} | {'检索 us':>9}")
+    print("-" * 60)
+    ctx = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        for engine in INDEX_ENGINES:
+            with ctx.Pool(1) as pool:
+                r = pool.apply(run_one, (engine, size, args.queries))
+            print(f"{engine:>8} | {size:>9} | {r['build_s']:>8.3f} | "
+                  f"{r['bytes_per_contact']:>10.0f} | {r['lookup_us']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+benchmarks/bench_journal.py - 全量保存 vs 日志式持久化的单次修改延迟
+用法：python -m benchmarks.bench_journal [--sizes 1000 10000 100000] [--ops 200]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts, write_dat
+from storage import PersistenceManager, JournaledPersistenceManager
+
+
+def measure(manager_cls, size: int, ops: int, workdir: str) -> float:
+    """预置 size 条数据后执行 ops 次 ADD/DEL，返回单次修改平均耗时（毫秒）"""
+    data_path = os.path.join(workdir, f"{manager_cls.__name__}_{size}.dat")
+    contacts = make_contacts(size + ops, seed=size)
+    write_dat(data_path, contacts[:size])
+    extra = contacts[size:]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        book = AddressBook(manager_cls(data_path, data_path + ".tmp"))
+        start = time.perf_counter()
+        for i, (name, phone, remark) in enumerate(extra):
+            if i % 2:
+                book.delete_contact(extra[i - 1][1])
+            else:
+                book.add_contact(name, phone, remark)
+        book.persistence.flush()
+        elapsed = time.perf_counter() - start
+        book.persistence.close()
+    return elapsed / len(extra) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="持久化单次修改延迟基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'规模':>10} | {'全量保存 ms/op':>16} | {'日志追加 ms/op':>16}")
+    print("-" * 50)
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            full = measure(PersistenceManager, size, args.ops, workdir)
+            journal = measure(JournaledPersistenceManager, size, args.ops, workdir)
+            print(f"{size:>10} | {full:>16.3f} | {journal:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+benchmarks/bench_memory.py - 联系人内存占用
+1) 单个联系人对象：旧版 __dict__ 实现（字符串各自独立） vs __slots__ + 字符串驻留
+2) 整个 AddressBook（链表 + phone_map + 两个索引）每个联系人的 RSS 增量
+用法：python -m benchmarks.bench_memory [--sizes 100000 1000000]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import multiprocessing
+import os
+import tempfile
+import tracemalloc
+from sys import intern
+
+from benchmarks.datagen import make_contacts
+from benchmarks.memory import rss_bytes
+from contact import Contact
+
+
+class LegacyContact:
+    """优化前的联系人结构：普通类，属性存于 __dict__"""
+    def __init__(self, name, phone, remark=""):
+        self.name = name
+        self.phone = phone
+        self.remark = remark
+        self.prev = None
+        self.next = None
+
+
+def object_bytes(rows: list) -> tuple:
+    """tracemalloc 统计两种结构每个联系人的分配字节（含姓名/备注字符串）"""
+    results = []
+    for build in (
+        # 模拟逐行解析：每行的姓名/备注都是新字符串对象
+        lambda: [LegacyContact(n.encode().decode(), p, r.encode().decode()) for n, p, r in rows],
+        lambda: [Contact(intern(n.encode().decode()), p, intern(r.encode().decode())) for n, p, r in rows],
+    ):
+        gc.collect()
+        tracemalloc.start()
+        objs = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del objs
+        results.append(size / len(rows))
+    return tuple(results)
+
+
+def book_bytes(engine: str, size: int) -> float:
+    """子进程中加载 size 条数据，返回整个通讯录每个联系人的 RSS 增量"""
+    from address_book import AddressBook
+    from storage import PersistenceManager
+
+    records = [{"name": n, "phone": p, "remark": r} for n, p, r in make_contacts(size, seed=size)]
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "empty.dat")
+        with contextlib.redirect_stdout(io.StringIO()):
+            book = AddressBook(PersistenceManager(path, path + ".tmp"), index_engine=engine)
+        gc.collect()
+        before = rss_bytes()
+        book.bulk_load(records)
+        del records
+        gc.collect()
+        return (rss_bytes() - before) / size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="联系人内存占用基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+
+    rows = make_contacts(min(args.sizes[0], 100000))
+    legacy, slotted = object_bytes(rows)
+    print(f"联系人对象（含字符串）：旧版 {legacy:.0f} 字节/个 → __slots__+驻留 {slotted:.0f} 字节/个")
+    print()
+    print(f"{'引擎':>8} | {'规模':>9} | {'整本 字节/联系人':>16}")
+    print("-" * 42)
+    ctx = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        for engine in ("hash", "sorted"):
+            with ctx.Pool(1) as pool:
+                per_contact = pool.apply(book_bytes, (engine, size))
+            print(f"{engine:>8} | {size:>9} | {per_contact:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
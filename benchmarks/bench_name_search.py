@@ -0,0 +1,93 @@
+"""
+benchmarks/bench_name_search.py - 拼音/首字母检索与姓名模糊检索延迟
+拼音查询取随机联系人姓名的首字母或全拼前缀，模糊查询对随机姓名做一次替换/删除/插入
+每条查询取一页（limit=10），统计 p50/p99/最大延迟，目标 p99 < 5 ms
+用法：python -m benchmarks.bench_name_search [--sizes 100000 1000000] [--queries 2000]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts
+from index.pinyin import to_pinyin
+from storage import PersistenceManager
+
+TARGET_MS = 5.0
+
+
+def typo(name: str, alphabet: str, rng: random.Random) -> str:
+    """对姓名做一次随机编辑：替换、删除或插入一个字"""
+    pos = rng.randrange(len(name))
+    kind = rng.choice(("replace", "delete", "insert")) if len(name) > 2 else rng.choice(("replace", "insert"))
+    if kind == "replace":
+        return name[:pos] + rng.choice(alphabet) + name[pos + 1:]
+    if kind == "delete":
+        return name[:pos] + name[pos + 1:]
+    return name[:pos] + rng.choice(alphabet) + name[pos:]
+
+
+def measure(search, queries: list) -> dict:
+    """逐条计时，返回毫秒级分位数与平均命中条数"""
+    latencies = []
+    total = 0
+    for query in queries:
+        start = time.perf_counter()
+        page = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        total += page.total
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+        "mean_total": total / len(queries),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="拼音/模糊姓名检索延迟基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'规模':>9} | {'检索':>6} | {'p50 ms':>7} | {'p99 ms':>7} | {'最大 ms':>7} | {'平均命中':>8} | 目标")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "empty.dat")
+        for size in args.sizes:
+            rows = make_contacts(size, seed=size)
+            with contextlib.redirect_stdout(io.StringIO()):
+                book = AddressBook(PersistenceManager(path, path + ".tmp"))
+            book.bulk_load({"name": n, "phone": p, "remark": r} for n, p, r in rows)
+            gc.collect()
+
+            rng = random.Random(0)
+            names = [rng.choice(rows)[0] for _ in range(args.queries)]
+            alphabet = "".join({char for name in names for char in name})
+            pinyin_queries = []
+            for name in names:
+                full, initials = to_pinyin(name)
+                key = initials if rng.random() < 0.5 else full
+                pinyin_queries.append(key[:rng.randint(1, len(key))])
+            fuzzy_queries = [typo(name, alphabet, rng) for name in names]
+
+            for label, search, queries in (
+                ("拼音", lambda q: book.find_by_pinyin(q, limit=10), pinyin_queries),
+                ("模糊", lambda q: book.find_by_name_fuzzy(q, limit=10), fuzzy_queries),
+            ):
+                result = measure(search, queries)
+                verdict = "✅" if result["p99"] < TARGET_MS else "❌"
+                print(f"{size:>9} | {label:>6} | {result['p50']:>7.3f} | {result['p99']:>7.3f} | "
+                      f"{result['max']:>7.3f} | {result['mean_total']:>8.0f} | {verdict}")
+            del book
+            gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+benchmarks/bench_shards.py - 多进程分片的扩展性
+对比单进程 AddressBook 与 1/2/4/8 个分片：批量建索引耗时、广域检索（备注关键词全量扫描）
+与多线程客户端并发单点添加的吞吐；分片收益取决于机器的 CPU 核数
+用法：python -m benchmarks.bench_shards [--size 200000] [--workers 1 2 4 8] [--queries 200]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts
+from sharding import ShardedAddressBook
+from storage import PersistenceManager
+
+
+def run(book, records: list, keywords: list, new_rows: list, clients: int) -> tuple:
+    """返回 (建索引秒数, 广域检索 QPS, 并发添加 QPS)"""
+    start = time.perf_counter()
+    book.bulk_load(records)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for keyword in keywords:
+        book.find_by_remark(keyword, limit=10)
+    scan_qps = len(keywords) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(lambda row: book.add_contact(*row, persist=False), new_rows))
+    add_qps = len(new_rows) / (time.perf_counter() - start)
+    return build, scan_qps, add_qps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="多进程分片扩展性基准")
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--adds", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=8, help="并发添加的客户端线程数")
+    parser.add_argument("--partition", choices=("hash", "range"), default="hash")
+    args = parser.parse_args()
+
+    rows = make_contacts(args.size + args.adds, seed=args.size)
+    records = [{"name": n, "phone": p, "remark": r} for n, p, r in rows[:args.size]]
+    new_rows = rows[args.size:]
+    rng = random.Random(0)
+    # 备注关键词：无子串索引时每个分片各自扫描链表，可并行
+    keywords = [rng.choice(rows)[2][:2] for _ in range(args.queries)]
+
+    print(f"CPU 核数：{os.cpu_count()}，规模：{args.size}，分片方式：{args.partition}")
+    print(f"{'模式':>8} | {'建索引 s':>8} | {'广域检索 QPS':>12} | {'并发添加 QPS':>12}")
+    print("-" * 52)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "single.dat")
+        with contextlib.redirect_stdout(io.StringIO()):
+            book = AddressBook(PersistenceManager(path, path + ".tmp"))
+        build, scan_qps, add_qps = run(book, records, keywords, new_rows, args.clients)
+        print(f"{'单进程':>8} | {build:>8.2f} | {scan_qps:>12.1f} | {add_qps:>12.0f}")
+        del book
+
+        for workers in args.workers:
+            data_dir = os.path.join(workdir, f"shards{workers}")
+            os.makedirs(data_dir)
+            book = ShardedAddressBook(workers, data_dir=data_dir, partition=args.partition)
+            try:
+                build, scan_qps, add_qps = run(book, records, keywords, new_rows, args.clients)
+            finally:
+                book.close()
+            print(f"{f'{workers} 分片':>8} | {build:>8.2f} | {scan_qps:>12.1f} | {add_qps:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
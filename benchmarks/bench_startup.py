@@ -0,0 +1,119 @@
+"""
+benchmarks/bench_startup.py - 启动耗时
+1. 加载：逐条 add_contact vs bulk_load vs 冷启动（读文件 + 建全部索引）
+2. 惰性启动：以子进程运行 main.py，测从启动进程到出现首个命令提示符的耗时（含解释器启动与模块导入），
+   默认模式对照 --lazy；并在进程内测构造返回、首次 ADD、首次手机号检索（含建立手机号索引）完成的时刻
+用法：python -m benchmarks.bench_startup [--sizes 100000 1000000] [--index hash sorted]
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts, write_dat
+from storage import PersistenceManager
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+PROMPT = "请输入命令 >".encode("utf-8")
+
+
+def empty_book(workdir: str, engine: str) -> AddressBook:
+    """创建不加载任何数据的通讯录（数据文件不存在）"""
+    path = os.path.join(workdir, "empty.dat")
+    return AddressBook(PersistenceManager(path, path + ".tmp"), index_engine=engine)
+
+
+def time_to_prompt(workdir: str, engine: str, lazy: bool) -> float:
+    """在 workdir（含 address_book.dat）中启动 main.py，返回出现首个命令提示符的耗时，随后直接结束进程"""
+    command = [sys.executable, MAIN, "--index", engine] + (["--lazy"] if lazy else [])
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=workdir, env=env, stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        output = b""
+        while PROMPT not in output:
+            chunk = os.read(proc.stdout.fileno(), 65536)
+            if not chunk:
+                raise RuntimeError("main.py 未出现命令提示符即退出")
+            output += chunk
+        return time.perf_counter() - start
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def first_operations(data_path: str, engine: str, lazy: bool) -> tuple:
+    """进程内从构造开始计时：(构造返回, 首次 ADD 完成, 首次手机号前缀检索完成) 的时刻"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        book = AddressBook(PersistenceManager(data_path, data_path + ".tmp"), index_engine=engine,
+                           lazy_indexes=lazy, background_load=lazy)
+        ready = time.perf_counter() - start
+        book.add_contact("基准", "13000000000", persist=False)
+        first_add = time.perf_counter() - start
+        book.find_by_phone_prefix("130", limit=10)
+        first_find = time.perf_counter() - start
+    return ready, first_add, first_find
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="启动加载耗时基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--index", nargs="+", default=["hash", "sorted"])
+    args = parser.parse_args()
+
+    print(f"{'引擎':>8} | {'规模':>9} | {'逐条添加 s':>10} | {'bulk_load s':>11} | {'冷启动 s':>9}")
+    print("-" * 64)
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            data_path = os.path.join(workdir, f"{size}.dat")
+            write_dat(data_path, make_contacts(size, seed=size))
+            with contextlib.redirect_stdout(io.StringIO()):
+                records = PersistenceManager(data_path).load()
+            for engine in args.index:
+                book = empty_book(workdir, engine)
+                start = time.perf_counter()
+                for data in records:
+                    book.add_contact(data["name"], data["phone"], data["remark"], persist=False)
+                book.find_by_phone_prefix("1", limit=1)  # 有序索引在首次检索时合并
+                sequential = time.perf_counter() - start
+                del book
+
+                book = empty_book(workdir, engine)
+                start = time.perf_counter()
+                book.bulk_load(records)
+                bulk = time.perf_counter() - start
+                del book
+
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    AddressBook(PersistenceManager(data_path, data_path + ".tmp"), index_engine=engine)
+                cold = time.perf_counter() - start
+                print(f"{engine:>8} | {size:>9} | {sequential:>10.3f} | {bulk:>11.3f} | {cold:>9.3f}")
+
+        print(f"\n{'引擎':>8} | {'规模':>9} | {'模式':>4} | {'首个提示符 s':>12} | {'构造返回 s':>10} | "
+              f"{'首次ADD s':>9} | {'首次检索 s':>10}")
+        print("-" * 86)
+        for size in args.sizes:
+            # main.py 读取当前目录下的 address_book.dat
+            prompt_dir = os.path.join(workdir, f"prompt{size}")
+            os.mkdir(prompt_dir)
+            os.replace(os.path.join(workdir, f"{size}.dat"), os.path.join(prompt_dir, "address_book.dat"))
+            data_path = os.path.join(prompt_dir, "address_book.dat")
+            for engine in args.index:
+                for lazy in (False, True):
+                    prompt = time_to_prompt(prompt_dir, engine, lazy)
+                    ready, first_add, first_find = first_operations(data_path, engine, lazy)
+                    mode = "惰性" if lazy else "默认"
+                    print(f"{engine:>8} | {size:>9} | {mode:>4} | {prompt:>12.3f} | {ready:>10.3f} | "
+                          f"{first_add:>9.3f} | {first_find:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
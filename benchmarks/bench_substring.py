@@ -0,0 +1,67 @@
+"""
+benchmarks/bench_substring.py - n-gram 倒排索引与遍历链表的子串检索对比
+手机号查询取随机联系人的后四位，备注查询取随机备注中的 2~4 字关键词，每条查询取一页（limit=10）
+用法：python -m benchmarks.bench_substring [--sizes 100000 1000000] [--queries 500]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import tempfile
+import time
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts
+from benchmarks.memory import rss_bytes
+from storage import PersistenceManager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="子串检索基准：n-gram 索引 vs 遍历")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'规模':>9} | {'模式':>6} | {'构建 s':>7} | {'内存 MB':>8} | {'后四位 ms':>9} | {'备注 ms':>8}")
+    print("-" * 66)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "empty.dat")
+        for size in args.sizes:
+            rows = make_contacts(size, seed=size)
+            rng = random.Random(0)
+            phone_queries = [rng.choice(rows)[1][-4:] for _ in range(args.queries)]
+            remark_queries = []
+            for _ in range(args.queries):
+                remark = rng.choice(rows)[2]
+                length = min(len(remark), rng.randint(2, 4))
+                start = rng.randint(0, len(remark) - length)
+                remark_queries.append(remark[start:start + length])
+
+            for label, substring_index in (("索引", True), ("遍历", False)):
+                gc.collect()
+                rss_before = rss_bytes()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    book = AddressBook(PersistenceManager(path, path + ".tmp"), substring_index=substring_index)
+                start = time.perf_counter()
+                book.bulk_load({"name": n, "phone": p, "remark": r} for n, p, r in rows)
+                build = time.perf_counter() - start
+                gc.collect()
+                memory = (rss_bytes() - rss_before) / 2 ** 20
+
+                # 遍历模式每条查询都要走完整个链表，按比例减少查询条数
+                count = args.queries if substring_index else max(10, args.queries // 50)
+                timings = []
+                for search, queries in ((book.find_by_phone_substring, phone_queries),
+                                        (book.find_by_remark, remark_queries)):
+                    start = time.perf_counter()
+                    for query in queries[:count]:
+                        search(query, limit=10)
+                    timings.append((time.perf_counter() - start) / count * 1000)
+                print(f"{size:>9} | {label:>6} | {build:>7.2f} | {memory:>8.0f} | {timings[0]:>9.3f} | {timings[1]:>8.3f}")
+                del book
+
+
+if __name__ == "__main__":
+    main()
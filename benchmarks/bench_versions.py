@@ -0,0 +1,110 @@
+"""
+benchmarks/bench_versions.py - 版本化模式（结构共享的持久化映射）开销与撤销/回滚耗时
+1. 建立：加载后从 phone_map 一次性构建持久化映射的耗时
+2. 单条修改：versioned=False / True 下覆盖添加的吞吐
+3. 每个保留版本的内存：同一批覆盖修改分别在不保留历史（max_versions=0）与全部保留时的 tracemalloc 增量之差
+   对照为完整复制 phone_map（保存时留下的 .tmp 文件相当于一份完整副本）
+4. 快照、撤销一次修改、回滚 N 次修改的耗时，对照从磁盘重新加载
+用法：python -m benchmarks.bench_versions [--size 1000000] [--edits 1000]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts, write_dat
+from storage import PersistenceManager
+
+
+def _edits(book: AddressBook, phones: list, count: int, rng: random.Random) -> float:
+    """对已有手机号做 count 次覆盖添加（联系人总数不变），返回耗时"""
+    start = time.perf_counter()
+    for i in range(count):
+        phone = rng.choice(phones)
+        book.add_contact(book.phone_map[phone].name, phone, f"修改{i}", persist=False)
+    return time.perf_counter() - start
+
+
+def _traced(fn) -> int:
+    """执行 fn，返回期间净增的 Python 堆内存（字节）"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        fn()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="版本化模式基准")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--edits", type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = make_contacts(args.size, seed=args.size)
+    phones = [phone for _, phone, _ in rows]
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "contacts.dat")
+        write_dat(path, rows)
+        del rows
+
+        # 1. 加载：普通模式 vs 版本化模式；普通模式的实例只用于吞吐对照，测完即释放
+        load_times = {}
+        for versioned in (False, True):
+            gc.collect()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                book = AddressBook(PersistenceManager(path, path + ".tmp"), versioned=versioned)
+            load_times[versioned] = time.perf_counter() - start
+            label = "版本化" if versioned else "普通"
+            print(f"📊 加载 {args.size} 条（{label}）：{load_times[versioned]:.2f} 秒")
+            if not versioned:
+                plain_time = _edits(book, phones, args.edits, rng)
+                del book
+
+        # 2. 单条修改吞吐
+        versioned_time = _edits(book, phones, args.edits, rng)
+        print(f"📊 覆盖添加：普通 {args.edits / plain_time:.0f} 次/秒，版本化 {args.edits / versioned_time:.0f} 次/秒")
+
+        # 3. 每个保留版本的内存
+        book.max_versions = 0
+        book._versions.clear()
+        baseline = _traced(lambda: _edits(book, phones, args.edits, rng))
+        book.max_versions = args.edits
+        retained = _traced(lambda: _edits(book, phones, args.edits, rng))
+        per_version = (retained - baseline) / args.edits
+        copies = []
+        full_copy = _traced(lambda: copies.append(dict(book.phone_map)))
+        del copies
+        print(f"📊 每个保留版本额外内存：{per_version / 1024:.2f} KB（完整复制 phone_map 一份："
+              f"{full_copy / 2 ** 20:.1f} MB，数据文件 {os.path.getsize(path) / 2 ** 20:.1f} MB）")
+
+        # 4. 快照 / 撤销 / 回滚
+        start = time.perf_counter()
+        for _ in range(1000):
+            book.snapshot("bench")
+        print(f"📊 快照：{(time.perf_counter() - start) * 1e6 / 1000:.2f} us/次")
+        book._versions.clear()
+        _edits(book, phones, args.edits, rng)
+        start = time.perf_counter()
+        book.undo(persist=False)
+        print(f"📊 撤销一次修改：{(time.perf_counter() - start) * 1000:.3f} ms")
+        target = book._versions[0][0]
+        start = time.perf_counter()
+        message = book.rollback(target, persist=False)
+        print(f"📊 回滚 {args.edits - 1} 次修改：{(time.perf_counter() - start) * 1000:.1f} ms（{message}）")
+        print(f"📊 对照：从磁盘重新加载并建索引 {load_times[False]:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
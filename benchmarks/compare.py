@@ -0,0 +1,41 @@
+"""
+benchmarks/compare.py - 对比两份 benchmarks.suite 报告
+逐项列出数值指标及变化比例（新 / 旧），便于在版本之间做回归检查
+用法：python -m benchmarks.compare old.json new.json
+"""
+import json
+import sys
+
+
+def flatten(node, prefix: str = "") -> dict:
+    """把嵌套的结果字典展开为 {"100000.find_phone.3.median_us": 12.3, ...}"""
+    if isinstance(node, dict):
+        flat = {}
+        for key, value in node.items():
+            flat.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+        return flat
+    return {prefix: node} if isinstance(node, (int, float)) else {}
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("用法：python -m benchmarks.compare <旧报告.json> <新报告.json>")
+        return 1
+    with open(argv[0], encoding="utf-8") as f:
+        old = json.load(f)
+    with open(argv[1], encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"旧：{old['meta'].get('commit')} ({old['meta'].get('timestamp')})  "
+          f"新：{new['meta'].get('commit')} ({new['meta'].get('timestamp')})")
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    for key in sorted(old_flat.keys() & new_flat.keys(), key=lambda k: (int(k.split(".")[0]), k)):
+        before, after = old_flat[key], new_flat[key]
+        ratio = f"{after / before:6.2f}x" if before else "   n/a"
+        print(f"{key:<45} {before:>14.3f} → {after:>14.3f}  {ratio}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
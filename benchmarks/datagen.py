@@ -0,0 +1,51 @@
+"""
+benchmarks/datagen.py - 基准测试数据生成
+功能：复用 import random.py 中的随机生成函数，按固定种子生成可复现的数据集
+"""
+import importlib.util
+import os
+import random
+
+_GENERATOR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "import random.py")
+_generator = None
+
+
+def load_generator():
+    """按文件路径加载 import random.py（文件名含空格，无法直接 import）"""
+    global _generator
+    if _generator is None:
+        spec = importlib.util.spec_from_file_location("random_contact_generator", _GENERATOR_PATH)
+        _generator = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(_generator)
+    return _generator
+
+
+def make_contacts(count: int, seed: int = 42) -> list:
+    """
+    生成 count 条手机号唯一的联系人
+    :param count: 联系人数量
+    :param seed: 随机种子，相同种子生成相同数据
+    :return: [(姓名, 手机号, 备注), ...]
+    """
+    gen = load_generator()
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        contacts = []
+        seen = set()
+        while len(contacts) < count:
+            phone = gen.generate_random_phone()
+            if phone in seen:
+                continue
+            seen.add(phone)
+            contacts.append((gen.generate_random_name(), phone, gen.generate_random_identity()))
+        return contacts
+    finally:
+        random.setstate(state)
+
+
+def write_dat(path: str, contacts: list) -> None:
+    """按 姓名|手机号|备注 格式写出 .dat 数据文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        for name, phone, remark in contacts:
+            f.write(f"{name}|{phone}|{remark}\n")
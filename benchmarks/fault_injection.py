@@ -0,0 +1,152 @@
+"""
+benchmarks/fault_injection.py - 持久化故障注入测试
+1. 进程被强杀：子进程循环保存不同版本的数据，随机时刻 SIGKILL，重新加载必须恰好是某个完整版本
+2. 尾部截断：正式文件缺失、只剩写到一半的临时文件，加载结果必须是原数据的前缀（按块对齐）
+3. 随机位翻转：加载结果必须是原数据的子序列，且最多丢失被破坏的那一块
+4. 写入量：新保存路径（fsync + os.replace）与旧路径（写临时文件 + copy2）每次保存写入的字节数
+用法：python -m benchmarks.fault_injection [--rounds 20] [--size 20000]
+大规模、多轮次的压力版本；回归断言见 tests/test_persistence.py（python -m pytest tests）
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.datagen import make_contacts
+from contact import Contact
+from storage import PersistenceManager
+from storage.formats import DEFAULT_BLOCK_SIZE
+
+
+def _contacts(rows: list) -> list:
+    return [Contact(name, phone, remark) for name, phone, remark in rows]
+
+
+def _load(path: str) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):
+        records = PersistenceManager(path, path + ".tmp").load()
+    return [(d["name"], d["phone"], d["remark"]) for d in records]
+
+
+def _saver(path: str, generations: list) -> None:
+    """子进程：依次循环保存各个版本，直到被杀死"""
+    manager = PersistenceManager(path, path + ".tmp", quiet=True)
+    snapshots = [_contacts(rows) for rows in generations]
+    while True:
+        for contacts in snapshots:
+            manager.save(contacts)
+
+
+def kill_test(workdir: str, rows: list, rounds: int, rng: random.Random) -> int:
+    """强杀保存中的进程，返回失败次数"""
+    path = os.path.join(workdir, "kill.dat")
+    # 各版本长度不同，可由加载到的条数判断是哪一版
+    sizes = sorted({len(rows) // 4, len(rows) // 2, len(rows) * 3 // 4, len(rows)})
+    generations = [rows[:size] for size in sizes]
+    ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    failures = 0
+    for _ in range(rounds):
+        for leftover in (path, path + ".tmp"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        process = ctx.Process(target=_saver, args=(path, generations))
+        process.start()
+        time.sleep(rng.uniform(0.05, 0.5))
+        process.kill()
+        process.join()
+        loaded = _load(path)
+        if loaded and loaded not in generations:
+            failures += 1
+            print(f"❌ 强杀后加载到 {len(loaded)} 条，不是任何一个完整版本")
+    return failures
+
+
+def truncate_test(workdir: str, rows: list, rounds: int, rng: random.Random) -> int:
+    """只剩截断的临时文件时，加载结果必须是按块对齐的前缀，返回失败次数"""
+    path = os.path.join(workdir, "torn.dat")
+    PersistenceManager(path, path + ".tmp", quiet=True).save(_contacts(rows))
+    with open(path, "rb") as f:
+        data = f.read()
+    os.remove(path)
+    failures = 0
+    for _ in range(rounds):
+        cut = rng.randrange(len(data))
+        with open(path + ".tmp", "wb") as f:
+            f.write(data[:cut])
+        loaded = _load(path)
+        if loaded != rows[:len(loaded)] or len(loaded) % DEFAULT_BLOCK_SIZE:
+            failures += 1
+            print(f"❌ 截断于第 {cut} 字节：加载结果不是按块对齐的前缀（{len(loaded)} 条）")
+    os.remove(path + ".tmp")
+    return failures
+
+
+def bitflip_test(workdir: str, rows: list, rounds: int, rng: random.Random) -> int:
+    """随机翻转一个比特，加载结果必须是原数据的子序列且最多丢一块，返回失败次数"""
+    path = os.path.join(workdir, "flip.dat")
+    PersistenceManager(path, path + ".tmp", quiet=True).save(_contacts(rows))
+    with open(path, "rb") as f:
+        data = f.read()
+    failures = 0
+    for _ in range(rounds):
+        corrupted = bytearray(data)
+        pos = rng.randrange(len(corrupted))
+        corrupted[pos] ^= 1 << rng.randrange(8)
+        with open(path, "wb") as f:
+            f.write(corrupted)
+        try:
+            loaded = _load(path)
+        except UnicodeDecodeError:
+            loaded = None
+        remaining = iter(rows)
+        is_subsequence = loaded is not None and all(row in remaining for row in loaded)
+        if not is_subsequence or len(rows) - len(loaded) > DEFAULT_BLOCK_SIZE:
+            failures += 1
+            print(f"❌ 翻转第 {pos} 字节：加载结果{'不是原数据的子序列' if not is_subsequence else '丢失超过一块'}")
+    os.remove(path)
+    return failures
+
+
+def bytes_written(workdir: str, rows: list) -> tuple:
+    """返回 (旧路径字节数, 新路径字节数)：旧路径写临时文件后再整份复制一次"""
+    path = os.path.join(workdir, "bytes.dat")
+    legacy_tmp = os.path.join(workdir, "legacy.dat.tmp")
+    with open(legacy_tmp, "w", encoding="utf-8") as f:
+        for name, phone, remark in rows:
+            f.write(f"{name}|{phone}|{remark}\n")
+    shutil.copy2(legacy_tmp, os.path.join(workdir, "legacy.dat"))
+    legacy = os.path.getsize(legacy_tmp) * 2
+    PersistenceManager(path, path + ".tmp", quiet=True).save(_contacts(rows))
+    return legacy, os.path.getsize(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="持久化故障注入测试")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = make_contacts(args.size, seed=args.size)
+    rng = random.Random(args.seed)
+    failures = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        for label, test in (("进程强杀", kill_test), ("尾部截断", truncate_test), ("位翻转", bitflip_test)):
+            start = time.perf_counter()
+            failed = test(workdir, rows, args.rounds, rng)
+            failures += failed
+            mark = "✅" if not failed else "❌"
+            print(f"{mark} {label}：{args.rounds} 轮，失败 {failed} 轮，耗时 {time.perf_counter() - start:.2f} 秒")
+        legacy, durable = bytes_written(workdir, rows)
+        print(f"📊 每次保存写入：旧路径 {legacy / 2 ** 20:.2f} MB，新路径 {durable / 2 ** 20:.2f} MB"
+              f"（{durable / legacy:.0%}）")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+benchmarks/load_client.py - 通讯录网络服务压测客户端
+多连接 + 流水线发送 FIND_PHONE（或 BATCH_FIND_PHONE）请求，统计 p50/p99 延迟与 QPS
+先启动服务：python main.py --serve
+再运行：python -m benchmarks.load_client [--connections 8] [--requests 20000] [--depth 16] [--batch 0]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+PHONE_HEADS = ["130", "133", "135", "138", "139", "150", "155", "158", "170", "177", "186", "189", "199"]
+
+
+def make_request(rng: random.Random, batch: int) -> dict:
+    """随机手机号前缀检索请求；batch > 0 时一次携带 batch 个前缀"""
+    def prefix():
+        return rng.choice(PHONE_HEADS) + "".join(rng.choices("0123456789", k=rng.randint(0, 4)))
+    if batch:
+        return {"cmd": "BATCH_FIND_PHONE", "prefixes": [prefix() for _ in range(batch)], "limit": 10}
+    return {"cmd": "FIND_PHONE", "prefix": prefix(), "limit": 10}
+
+
+async def run_connection(host: str, port: int, count: int, depth: int, batch: int, seed: int, latencies: list):
+    """单个连接：最多 depth 个请求在途，响应按发送顺序对应"""
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random(seed)
+    inflight = deque()
+    window = asyncio.Semaphore(depth)
+
+    async def send():
+        for i in range(count):
+            await window.acquire()
+            request = make_request(rng, batch)
+            request["id"] = i
+            inflight.append(time.perf_counter())
+            writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def receive():
+        for _ in range(count):
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("服务端提前关闭连接")
+            latencies.append(time.perf_counter() - inflight.popleft())
+            window.release()
+
+    await asyncio.gather(send(), receive())
+    writer.close()
+    await writer.wait_closed()
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+async def main_async(args) -> None:
+    latencies = []
+    per_conn = args.requests // args.connections
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_connection(args.host, args.port, per_conn, args.depth, args.batch, seed, latencies)
+        for seed in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    lookups = len(latencies) * (args.batch or 1)
+    print(f"连接数 {args.connections} | 流水线深度 {args.depth} | 每请求前缀数 {args.batch or 1}")
+    print(f"请求 {len(latencies)} 个，耗时 {elapsed:.2f} 秒，QPS {len(latencies) / elapsed:.0f}，"
+          f"前缀检索 {lookups / elapsed:.0f} 次/秒")
+    print(f"延迟 p50 {percentile(latencies, 0.50) * 1000:.3f} ms | p99 {percentile(latencies, 0.99) * 1000:.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="通讯录网络服务压测客户端")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--depth", type=int, default=16, help="每个连接的最大在途请求数")
+    parser.add_argument("--batch", type=int, default=0, help="大于 0 时使用 BATCH_FIND_PHONE，每请求携带的前缀数")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+benchmarks/memory.py - 进程内存测量
+"""
+import os
+import resource
+import sys
+
+
+def rss_bytes() -> int:
+    """当前进程常驻内存（字节）；无 /proc 的平台退化为峰值 RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,111 @@
+"""
+benchmarks/stress_concurrency.py - 并发读写压力测试
+线程池混合执行前缀检索与 ADD/DEL，结束后校验链表、phone_map 与两个索引的一致性
+用法：python -m benchmarks.stress_concurrency [--threads 8] [--ops 20000] [--write-ratio 0.2]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from address_book import AddressBook
+from benchmarks.datagen import make_contacts
+from index import INDEX_ENGINES, PHONE_INDEX_ENGINES
+from storage import PersistenceManager
+
+
+def worker(book: AddressBook, pool: list, ops: int, write_ratio: float, seed: int) -> tuple:
+    """执行 ops 次随机操作，返回 (读次数, 写次数)"""
+    rng = random.Random(seed)
+    reads = writes = 0
+    for _ in range(ops):
+        name, phone, remark = rng.choice(pool)
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                book.add_contact(name, phone, remark, persist=False)
+            else:
+                book.delete_contact(phone, persist=False)
+            writes += 1
+        else:
+            if rng.random() < 0.5:
+                book.find_by_phone_prefix(phone[:rng.randint(3, 7)], limit=10)
+            else:
+                book.find_by_name_prefix(name[:1], limit=10)
+            reads += 1
+    return reads, writes
+
+
+def check_consistency(book: AddressBook) -> list:
+    """校验通讯录内部结构一致，返回发现的问题列表（为空表示一致）"""
+    problems = []
+    forward = book.get_all_contacts()
+    backward = []
+    node = book.head.prev
+    while node is not book.head:
+        backward.append(node)
+        node = node.prev
+    if forward != backward[::-1]:
+        problems.append("双向链表正反遍历结果不一致")
+    if len(forward) != len(book.phone_map):
+        problems.append(f"链表长度 {len(forward)} 与 phone_map 大小 {len(book.phone_map)} 不一致")
+    if any(book.phone_map.get(c.phone) is not c for c in forward):
+        problems.append("phone_map 与链表节点不一致")
+    if [c.seq for c in forward] != sorted(c.seq for c in forward):
+        problems.append("链表顺序与插入序号不一致")
+
+    for index, field in ((book.name_index, "name"), (book.phone_index, "phone")):
+        prefixes = {getattr(c, field)[:1] for c in forward} | {getattr(c, field)[:3] for c in forward[:200]}
+        for prefix in prefixes:
+            expected = {id(c) for c in forward if getattr(c, field).startswith(prefix)}
+            found = index.search(prefix)
+            if {id(c) for c in found} != expected or len(found) != len(expected):
+                problems.append(f"{field} 索引前缀 {prefix!r} 结果与链表不一致")
+            if index.count(prefix) != len(expected):
+                problems.append(f"{field} 索引前缀 {prefix!r} 计数不一致")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="并发读写压力测试")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=20000, help="每个线程的操作数")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--base", type=int, default=20000)
+    parser.add_argument("--index", choices=sorted(INDEX_ENGINES), default="hash")
+    parser.add_argument("--phone-index", choices=sorted(PHONE_INDEX_ENGINES), default=None)
+    args = parser.parse_args()
+
+    pool = make_contacts(args.base * 2)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "empty.dat")
+        with contextlib.redirect_stdout(io.StringIO()):
+            book = AddressBook(PersistenceManager(path, path + ".tmp"),
+                               index_engine=args.index, phone_index_engine=args.phone_index)
+        book.bulk_load({"name": n, "phone": p, "remark": r} for n, p, r in pool[:args.base])
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            results = list(executor.map(
+                lambda seed: worker(book, pool, args.ops, args.write_ratio, seed), range(args.threads)
+            ))
+        elapsed = time.perf_counter() - start
+
+    reads = sum(r for r, _ in results)
+    writes = sum(w for _, w in results)
+    print(f"{args.threads} 线程：读 {reads} 次，写 {writes} 次，耗时 {elapsed:.2f} 秒，"
+          f"{(reads + writes) / elapsed:.0f} 次/秒")
+    problems = check_consistency(book)
+    if problems:
+        print("❌ 一致性校验失败：")
+        for problem in problems:
+            print(f"  - {problem}")
+        raise SystemExit(1)
+    print("✅ 一致性校验通过：链表、phone_map、姓名索引、手机号索引一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+benchmarks/suite.py - 通讯录综合基准套件
+用固定种子生成 1k~1M 规模的数据集，测量：加载解析、索引构建、内存、按前缀长度的检索延迟、
+带持久化的修改延迟、分页翻页延迟；结果输出为 JSON 报告，可用 benchmarks.compare 对比两个版本
+用法：python -m benchmarks.suite [--sizes 1000 10000 100000 1000000] [--index hash] [--out report.json]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import make_contacts, write_dat
+from benchmarks.memory import rss_bytes
+
+PHONE_PREFIX_LENGTHS = (1, 2, 3, 4, 5, 6, 7, 8)
+NAME_PREFIX_LENGTHS = (1, 2)
+
+
+def _latency_stats(samples: list) -> dict:
+    """延迟样本（秒）→ 微秒统计"""
+    samples = sorted(samples)
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+        "mean_us": statistics.fmean(samples) * 1e6,
+    }
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _query_latency(search, prefixes: list) -> dict:
+    samples = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        search(prefix)
+        samples.append(time.perf_counter() - start)
+    return _latency_stats(samples)
+
+
+def run_size(size: int, seed: int, engine: str, queries: int, mutation_ops: int) -> dict:
+    """在独立子进程中跑完一个数据规模的全部测量"""
+    from address_book import AddressBook
+    from storage import PersistenceManager, JournaledPersistenceManager
+
+    rows = make_contacts(size, seed=seed)
+    extra = make_contacts(size + mutation_ops, seed=seed)[size:]
+    rng = random.Random(seed)
+    result = {}
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+        data_path = os.path.join(workdir, "book.dat")
+        write_dat(data_path, rows)
+        empty_path = os.path.join(workdir, "empty.dat")
+
+        # 1. 加载解析与索引构建
+        records = []
+        result["load_parse_s"] = _timed(lambda: records.extend(PersistenceManager(data_path).load()))
+        book = AddressBook(PersistenceManager(empty_path, empty_path + ".tmp"), index_engine=engine)
+        gc.collect()
+        rss_before = rss_bytes()
+        result["index_build_s"] = _timed(lambda: book.bulk_load(records))
+        del records
+        gc.collect()
+        result["bytes_per_contact"] = (rss_bytes() - rss_before) / size
+        result["cold_start_s"] = _timed(
+            lambda: AddressBook(PersistenceManager(data_path, data_path + ".tmp"), index_engine=engine)
+        )
+
+        # 2. 按前缀长度的检索延迟（取一页 + 总数，与交互式分页一致）
+        samples = [rng.choice(rows) for _ in range(queries)]
+        result["find_phone"] = {
+            str(n): _query_latency(lambda p: book.find_by_phone_prefix(p, limit=10), [s[1][:n] for s in samples])
+            for n in PHONE_PREFIX_LENGTHS
+        }
+        result["find_name"] = {
+            str(n): _query_latency(lambda p: book.find_by_name_prefix(p, limit=10), [s[0][:n] for s in samples])
+            for n in NAME_PREFIX_LENGTHS
+        }
+
+        # 3. 分页：对最宽的前缀连续翻 20 页（偏移量分页 vs 键集分页）
+        def offset_paging():
+            for page in range(20):
+                book.find_by_phone_prefix("1", limit=10, offset=page * 10)
+
+        def keyset_paging():
+            cursor = None
+            for _ in range(20):
+                cursor = book.find_by_phone_prefix("1", limit=10, after=cursor).next_cursor
+
+        result["pagination_ms_per_page"] = {
+            "offset": _timed(offset_paging) / 20 * 1000,
+            "keyset": _timed(keyset_paging) / 20 * 1000,
+        }
+
+        # 4. 带持久化的修改延迟
+        mutation = {}
+        for label, manager_cls, ops in (("full_save", PersistenceManager, min(mutation_ops, 50)),
+                                        ("journal", JournaledPersistenceManager, mutation_ops)):
+            path = os.path.join(workdir, f"{label}.dat")
+            write_dat(path, rows)
+            mbook = AddressBook(manager_cls(path, path + ".tmp"), index_engine=engine)
+            elapsed = _timed(lambda: [mbook.add_contact(n, p, r) for n, p, r in extra[:ops]])
+            mbook.persistence.close()
+            mutation[label] = elapsed / ops * 1000
+            del mbook
+        result["mutation_ms"] = mutation
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="通讯录综合基准套件")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--index", default="hash", help="索引引擎（hash / sorted）")
+    parser.add_argument("--queries", type=int, default=500, help="每种前缀长度的检索次数")
+    parser.add_argument("--mutation-ops", type=int, default=500)
+    parser.add_argument("--out", default="bench_report.json", help="JSON 报告输出路径")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "index": args.index,
+        },
+        "results": {},
+    }
+    ctx = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        print(f"⏱️  规模 {size} ...", flush=True)
+        with ctx.Pool(1) as pool:
+            result = pool.apply(run_size, (size, args.seed, args.index, args.queries, args.mutation_ops))
+        report["results"][str(size)] = result
+        print(f"   加载 {result['load_parse_s']:.3f}s | 建索引 {result['index_build_s']:.3f}s | "
+              f"{result['bytes_per_contact']:.0f} 字节/联系人 | "
+              f"FIND_PHONE(3) 中位 {result['find_phone']['3']['median_us']:.1f}us | "
+              f"修改(日志) {result['mutation_ms']['journal']:.3f}ms")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"📄 报告已写入：{args.out}")
+
+
+if __name__ == "__main__":
+    main()
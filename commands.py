@@ -0,0 +1,274 @@
+"""
+commands.py - 通讯录命令执行器
+功能：把结构化请求（字典）分发到 AddressBook，返回可序列化的结果字典；
+      供网络服务等非交互入口复用，与 main.py 的交互式命令一一对应
+请求示例：{"cmd": "FIND_PHONE", "prefix": "138", "limit": 10, "offset": 0}
+批处理文本行示例：ADD 张三 13800138000 同事 / DEL 13800138000 / FIND_PHONE 138
+"""
+import json
+import time
+
+from utils.validation import validate_phone, sanitize_input
+
+# 网络服务默认监听地址（定义在这里，main.py 解析参数时不必导入 asyncio）
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 检索类命令默认每页条数（与交互式分页一致）
+DEFAULT_LIMIT = 10
+
+# 修改联系人的命令：批处理中计入 writes，结束后统一保存
+_MUTATING = ("ADD", "DEL", "UNDO", "ROLLBACK")
+
+
+def _page_result(page) -> dict:
+    return {"ok": True, "total": page.total, "offset": page.offset,
+            "items": [c.to_dict() for c in page.items]}
+
+
+def _limit(request: dict) -> int:
+    """每页条数，至少为 1（非法值抛出 ValueError，由 execute 转为参数错误）"""
+    limit = int(request.get("limit", DEFAULT_LIMIT))
+    if limit < 1:
+        raise ValueError(f"limit 必须为正整数：{limit}")
+    return limit
+
+
+def _paging(request: dict) -> tuple:
+    """分页参数 (limit, offset)，offset 不能为负"""
+    offset = int(request.get("offset", 0))
+    if offset < 0:
+        raise ValueError(f"offset 不能为负数：{offset}")
+    return _limit(request), offset
+
+
+def _add(book, request: dict, persist: bool) -> dict:
+    name = sanitize_input(request["name"])
+    phone = sanitize_input(request["phone"])
+    remark = sanitize_input(request.get("remark", ""))
+    if not name:
+        return {"ok": False, "error": "姓名不能为空"}
+    if not validate_phone(phone):
+        return {"ok": False, "error": f"手机号格式不合法：{phone}"}
+    message = book.add_contact(name, phone, remark, persist=persist)
+    return {"ok": True, "message": message}
+
+
+def _delete(book, request: dict, persist: bool) -> dict:
+    phone = sanitize_input(request["phone"])
+    message = book.delete_contact(phone, persist=persist)
+    return {"ok": message.startswith("✅"), "message": message}
+
+
+def _find_name(book, request: dict, persist: bool) -> dict:
+    return _page_result(book.find_by_name_prefix(request["prefix"], *_paging(request)))
+
+
+def _find_name_exact(book, request: dict, persist: bool) -> dict:
+    return _page_result(book.find_by_name(request["name"], *_paging(request)))
+
+
+def _get_many(book, request: dict, persist: bool) -> dict:
+    """一次往返按完整手机号查找多个联系人，不存在的为 null"""
+    contacts = book.get_many(list(request["phones"]))
+    return {"ok": True, "results": [c.to_dict() if c is not None else None for c in contacts]}
+
+
+def _find_phone(book, request: dict, persist: bool) -> dict:
+    return _page_result(book.find_by_phone_prefix(request["prefix"], *_paging(request)))
+
+
+def _find_pinyin(book, request: dict, persist: bool) -> dict:
+    return _page_result(book.find_by_pinyin(request["query"], *_paging(request)))
+
+
+def _find_fuzzy(book, request: dict, persist: bool) -> dict:
+    return _page_result(book.find_by_name_fuzzy(request["query"], int(request.get("max_distance", 1)),
+                                                *_paging(request)))
+
+
+def _find_phone_substring(book, request: dict, persist: bool) -> dict:
+    return _page_result(book.find_by_phone_substring(request["query"], *_paging(request)))
+
+
+def _find_remark(book, request: dict, persist: bool) -> dict:
+    return _page_result(book.find_by_remark(request["query"], *_paging(request)))
+
+
+def _list(book, request: dict, persist: bool) -> dict:
+    return _page_result(book.get_all_contacts(*_paging(request)))
+
+
+def _batch_find_phone(book, request: dict, persist: bool) -> dict:
+    """一次往返解析多个手机号前缀"""
+    results = book.find_by_phone_prefixes(list(request["prefixes"]), _limit(request))
+    return {"ok": True, "results": [[c.to_dict() for c in contacts] for contacts in results]}
+
+
+def _batch_find_name(book, request: dict, persist: bool) -> dict:
+    """一次往返解析多个姓名前缀"""
+    limit = _limit(request)
+    results = [book.find_by_name_prefix(prefix, limit).items for prefix in request["prefixes"]]
+    return {"ok": True, "results": [[c.to_dict() for c in contacts] for contacts in results]}
+
+
+def _snapshot(book, request: dict, persist: bool) -> dict:
+    return {"ok": True, "version": book.snapshot(request.get("label", ""))}
+
+
+def _versions(book, request: dict, persist: bool) -> dict:
+    return {"ok": True, "versions": book.list_versions()}
+
+
+def _undo(book, request: dict, persist: bool) -> dict:
+    message = book.undo(persist=persist)
+    return {"ok": message.startswith("✅"), "message": message}
+
+
+def _rollback(book, request: dict, persist: bool) -> dict:
+    message = book.rollback(int(request["version"]), persist=persist)
+    return {"ok": message.startswith("✅"), "message": message}
+
+
+def _changes(book, request: dict, persist: bool) -> dict:
+    """增量同步：序号大于 since 的变更；超出保留范围时 ok 为 false，消费者需全量同步"""
+    limit = _limit(request) if request.get("limit") is not None else None
+    events = book.changes_since(int(request.get("since", 0)), limit)
+    return {"ok": True, "events": [event.to_dict() for event in events], "last_seq": book.feed.last_seq}
+
+
+def _save(book, request: dict, persist: bool) -> dict:
+    return {"ok": bool(book.save())}
+
+
+def _stats(book, request: dict, persist: bool) -> dict:
+    return {"ok": True, "stats": book.stats()}
+
+
+_HANDLERS = {
+    "ADD": _add,
+    "DEL": _delete,
+    "FIND_NAME": _find_name,
+    "FIND_EXACT": _find_name_exact,
+    "FIND_PHONE": _find_phone,
+    "FIND_PINYIN": _find_pinyin,
+    "FIND_FUZZY": _find_fuzzy,
+    "FIND_PHONE_SUB": _find_phone_substring,
+    "FIND_REMARK": _find_remark,
+    "LIST": _list,
+    "BATCH_FIND_NAME": _batch_find_name,
+    "BATCH_FIND_PHONE": _batch_find_phone,
+    "GET_MANY": _get_many,
+    "SNAPSHOT": _snapshot,
+    "VERSIONS": _versions,
+    "UNDO": _undo,
+    "ROLLBACK": _rollback,
+    "CHANGES": _changes,
+    "SAVE": _save,
+    "STATS": _stats,
+}
+
+
+def execute(book, request: dict, persist: bool = True) -> dict:
+    """
+    执行一条结构化请求
+    :param book: AddressBook 实例
+    :param request: 请求字典，cmd 字段为命令名（不区分大小写）
+    :param persist: 修改类命令是否立即持久化
+    :return: 结果字典，ok 表示是否成功，失败时 error 给出原因
+    """
+    cmd = str(request.get("cmd", "")).upper()
+    handler = _HANDLERS.get(cmd)
+    if handler is None:
+        return {"ok": False, "error": f"未知命令：{cmd}"}
+    try:
+        return handler(book, request, persist)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"ok": False, "error": f"参数错误：{cmd} {e}"}
+
+
+def parse_line(line: str) -> dict:
+    """
+    把一行文本命令解析为请求字典（参数内联，格式同交互式命令）
+    ADD <姓名> <电话> [备注] / DEL <电话> / FIND_NAME <前缀> / FIND_EXACT <姓名> / FIND_PHONE <前缀> /
+    GET_MANY <电话> [<电话> ...] / FIND_PINYIN <拼音> / FIND_FUZZY <姓名> [最大编辑距离] / FIND_PHONE_SUB <片段> /
+    FIND_REMARK <关键词> / LIST / SNAPSHOT [名称] / VERSIONS / UNDO / ROLLBACK <版本号> /
+    CHANGES [起始序号] [条数] / SAVE
+    :return: 请求字典；空行或 # 注释行返回 None
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    # maxsplit=3 保留备注中的空格
+    parts = line.split(maxsplit=3)
+    cmd = parts[0].upper()
+    request = {"cmd": cmd}
+    if cmd == "ADD":
+        if len(parts) < 3:
+            raise ValueError("ADD 命令格式为 ADD <姓名> <电话> [备注]")
+        request.update(name=parts[1], phone=parts[2], remark=parts[3] if len(parts) > 3 else "")
+    elif cmd == "DEL":
+        if len(parts) < 2:
+            raise ValueError("DEL 命令格式为 DEL <电话>")
+        request["phone"] = parts[1]
+    elif cmd in ("FIND_NAME", "FIND_PHONE"):
+        if len(parts) < 2:
+            raise ValueError(f"{cmd} 命令格式为 {cmd} <前缀>")
+        request["prefix"] = parts[1]
+    elif cmd == "FIND_EXACT":
+        if len(parts) < 2:
+            raise ValueError("FIND_EXACT 命令格式为 FIND_EXACT <姓名>")
+        request["name"] = parts[1]
+    elif cmd == "GET_MANY":
+        phones = line.split()[1:]
+        if not phones:
+            raise ValueError("GET_MANY 命令格式为 GET_MANY <电话> [<电话> ...]")
+        request["phones"] = phones
+    elif cmd == "SNAPSHOT":
+        rest = line.split(maxsplit=1)
+        request["label"] = rest[1] if len(rest) > 1 else ""
+    elif cmd == "ROLLBACK":
+        if len(parts) < 2:
+            raise ValueError("ROLLBACK 命令格式为 ROLLBACK <版本号>")
+        request["version"] = int(parts[1])
+    elif cmd == "CHANGES":
+        if len(parts) > 1:
+            request["since"] = int(parts[1])
+        if len(parts) > 2:
+            request["limit"] = int(parts[2])
+    elif cmd in ("FIND_PINYIN", "FIND_FUZZY", "FIND_PHONE_SUB", "FIND_REMARK"):
+        if len(parts) < 2:
+            raise ValueError(f"{cmd} 命令格式为 {cmd} <检索词>")
+        request["query"] = parts[1]
+        if cmd == "FIND_FUZZY" and len(parts) > 2:
+            request["max_distance"] = int(parts[2])
+    return request
+
+
+def run_batch(book, lines, out) -> dict:
+    """
+    逐行执行批处理命令：修改不单独持久化，由调用方在结束后统一保存一次
+    每条命令向 out 输出一行 JSON 结果（含行号 line 与命令 cmd）
+    :param lines: 可迭代的文本行
+    :param out: 结果输出流
+    :return: 统计 {"total", "ok", "failed", "writes", "elapsed", "ops_per_sec"}
+    """
+    stats = {"total": 0, "ok": 0, "failed": 0, "writes": 0}
+    start = time.perf_counter()
+    for lineno, line in enumerate(lines, 1):
+        try:
+            request = parse_line(line)
+        except ValueError as e:
+            request, result = {"cmd": line.split(maxsplit=1)[0].upper()}, {"ok": False, "error": f"参数错误：{e}"}
+        else:
+            if request is None:
+                continue
+            result = execute(book, request, persist=False)
+        stats["total"] += 1
+        stats["ok" if result["ok"] else "failed"] += 1
+        if result["ok"] and request["cmd"] in _MUTATING:
+            stats["writes"] += 1
+        out.write(json.dumps({"line": lineno, "cmd": request["cmd"], **result}, ensure_ascii=False) + "\n")
+    stats["elapsed"] = time.perf_counter() - start
+    stats["ops_per_sec"] = stats["total"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
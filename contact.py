@@ -1,9 +1,13 @@
 class Contact:
     """联系人实体类，封装属性和双向链表节点指针"""
+    # 固定属性槽：去掉每个实例的 __dict__，百万级联系人时显著节省内存
+    __slots__ = ("name", "phone", "remark", "seq", "prev", "next")
+
     def __init__(self, name: str, phone: str, remark: str = ""):
         self.name = name
         self.phone = phone
         self.remark = remark
+        self.seq = 0  # 插入序号（由 AddressBook 分配），决定检索结果的稳定顺序
         self.prev = None  # 前驱节点
         self.next = None  # 后继节点
 
@@ -1,4 +1,20 @@
-"""索引模块：仅提供散列表前缀索引"""
+"""索引模块：散列表前缀索引、有序数组前缀索引、手机号列存储索引、姓名拼音/模糊检索索引与子串检索索引"""
 from .hash_index import HashPrefixIndex
+from .sorted_index import SortedPrefixIndex
+from .numpy_index import NumpyPhoneIndex
+from .name_search import NameSearchIndex, edit_distance
+from .ngram_index import NgramIndex
 
-__all__ = ["HashPrefixIndex"]
\ No newline at end of file
+# 可在 AddressBook(index_engine=...) 中选择的索引引擎
+INDEX_ENGINES = {
+    "hash": HashPrefixIndex,
+    "sorted": SortedPrefixIndex,
+}
+
+# 手机号索引额外支持列存储引擎（需要 numpy）
+PHONE_INDEX_ENGINES = dict(INDEX_ENGINES, numpy=NumpyPhoneIndex)
+
+__all__ = [
+    "HashPrefixIndex", "SortedPrefixIndex", "NumpyPhoneIndex", "NameSearchIndex", "NgramIndex",
+    "INDEX_ENGINES", "PHONE_INDEX_ENGINES", "edit_distance",
+]
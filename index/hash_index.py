@@ -1,27 +1,129 @@
+import sys
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+
+# 倒排表按联系人插入序号有序
+_seq = attrgetter("seq")
+
+if sys.version_info >= (3, 10):
+    def seq_bisect_left(bucket: list, seq: int) -> int:
+        """按 seq 有序的联系人列表中，第一个 seq >= 给定值的位置"""
+        return bisect_left(bucket, seq, key=_seq)
+
+    def seq_bisect_right(bucket: list, seq: int) -> int:
+        """按 seq 有序的联系人列表中，第一个 seq > 给定值的位置"""
+        return bisect_right(bucket, seq, key=_seq)
+else:
+    # Python 3.8/3.9 的 bisect 不支持 key 参数，按序号手写二分（不额外维护序号列表，内存不变）
+    def seq_bisect_left(bucket: list, seq: int) -> int:
+        """按 seq 有序的联系人列表中，第一个 seq >= 给定值的位置"""
+        lo, hi = 0, len(bucket)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bucket[mid].seq < seq:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def seq_bisect_right(bucket: list, seq: int) -> int:
+        """按 seq 有序的联系人列表中，第一个 seq > 给定值的位置"""
+        lo, hi = 0, len(bucket)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if seq < bucket[mid].seq:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+
 class HashPrefixIndex:
-    """基于散列表的前缀索引，支持插入、删除、前缀检索"""
+    """基于散列表的前缀索引，支持插入、删除、前缀检索；结果按插入顺序稳定排列"""
     def __init__(self):
-        # 键：前缀字符串；值：联系人集合（去重）
+        # 键：前缀字符串；值：按 contact.seq 升序排列的联系人列表
         self.index = {}
 
     def insert(self, keyword: str, contact: object):
         """插入关键词（姓名/电话）关联的联系人，生成所有前缀"""
         prefixes = [keyword[:i+1] for i in range(len(keyword))] if keyword else []
         for prefix in prefixes:
-            if prefix not in self.index:
-                self.index[prefix] = set()
-            self.index[prefix].add(contact)
+            bucket = self.index.get(prefix)
+            if bucket is None:
+                self.index[prefix] = [contact]
+            elif _seq(bucket[-1]) < contact.seq:
+                # 序号单调递增，常规路径直接追加到尾部
+                bucket.append(contact)
+            else:
+                bucket.insert(seq_bisect_right(bucket, contact.seq), contact)
+
+    def bulk_insert(self, items):
+        """
+        批量插入 (关键词, 联系人)，要求联系人按 seq 升序且晚于索引中已有记录（bulk_load 保证）
+        省去逐条插入时的有序性判断，直接追加到倒排表尾部
+        """
+        index = self.index
+        for keyword, contact in items:
+            for i in range(1, len(keyword) + 1):
+                prefix = keyword[:i]
+                bucket = index.get(prefix)
+                if bucket is None:
+                    index[prefix] = [contact]
+                else:
+                    bucket.append(contact)
 
     def delete(self, keyword: str, contact: object):
         """删除关键词关联的联系人，清理空前缀键"""
         prefixes = [keyword[:i+1] for i in range(len(keyword))] if keyword else []
         for prefix in prefixes:
-            if prefix in self.index and contact in self.index[prefix]:
-                self.index[prefix].remove(contact)
-                # 空集合清理，减少内存占用
-                if not self.index[prefix]:
+            bucket = self.index.get(prefix)
+            if not bucket:
+                continue
+            pos = seq_bisect_left(bucket, contact.seq)
+            if pos < len(bucket) and bucket[pos] is contact:
+                del bucket[pos]
+                # 空列表清理，减少内存占用
+                if not bucket:
                     del self.index[prefix]
 
-    def search(self, prefix: str) -> list:
-        """前缀检索，返回匹配的联系人列表"""
-        return list(self.index.get(prefix, set()))
\ No newline at end of file
+    def search(self, prefix: str, limit: int = None, offset: int = 0, after: tuple = None) -> list:
+        """
+        前缀检索，返回匹配的联系人列表（按插入顺序）
+        :param limit: 最多返回条数，None 表示全部
+        :param offset: 跳过的条数
+        :param after: 键集分页游标 (关键词, 序号)，只返回排在该联系人之后的结果
+        """
+        bucket = self.index.get(prefix, [])
+        start = offset
+        if after is not None:
+            start += seq_bisect_right(bucket, after[1])
+        stop = None if limit is None else start + limit
+        return bucket[start:stop]
+
+    def count(self, prefix: str) -> int:
+        """前缀匹配总数，O(1)"""
+        return len(self.index.get(prefix, ()))
+
+    def search_many(self, prefixes: list, limit: int = None) -> list:
+        """批量前缀检索，返回与 prefixes 一一对应的联系人列表"""
+        return [self.search(prefix, limit) for prefix in prefixes]
+
+    def iter_prefix(self, prefix: str):
+        """惰性遍历前缀匹配结果"""
+        return iter(self.index.get(prefix, ()))
+
+    def stats(self) -> dict:
+        """索引规模与前缀桶大小分布（bucket_size_histogram 的键 "<N" 表示桶大小小于 N）"""
+        sizes = [len(bucket) for bucket in self.index.values()]
+        histogram = {}
+        for size in sizes:
+            label = f"<{1 << size.bit_length()}"
+            histogram[label] = histogram.get(label, 0) + 1
+        return {
+            "engine": "hash",
+            "prefix_keys": len(sizes),
+            "postings": sum(sizes),
+            "max_bucket": max(sizes, default=0),
+            "mean_bucket": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            "bucket_size_histogram": dict(sorted(histogram.items(), key=lambda kv: int(kv[0][1:]))),
+        }
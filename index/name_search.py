@@ -0,0 +1,171 @@
+from heapq import merge
+from itertools import chain, islice
+from operator import attrgetter
+
+from .hash_index import seq_bisect_left, seq_bisect_right
+from .pinyin import normalize_query, to_pinyin
+
+# 同名联系人按插入序号有序
+_seq = attrgetter("seq")
+
+
+def _bigrams(name: str) -> set:
+    """首尾加边界符的二元组，单字姓名也至少产生两个 n-gram"""
+    padded = f"^{name}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    编辑距离（Levenshtein），超过 limit 时提前结束
+    :return: 实际距离；大于 limit 时返回 limit + 1
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class NameSearchIndex:
+    """
+    姓名的拼音/首字母检索与模糊检索索引
+    以"不同姓名"为单位建索引（同名联系人共享一份拼音前缀与 n-gram），内存与不同姓名数成正比：
+    names：姓名 → 按 seq 有序的联系人列表（同时是精确姓名的一对多映射）
+    pinyin：全拼/首字母的每个前缀 → 姓名集合
+    grams：姓名二元组 → 姓名集合，模糊检索先按共享 n-gram 数筛选候选，再计算编辑距离
+    lengths：姓名长度 → 姓名集合，检索词过短、n-gram 无法筛选时按长度取候选
+    """
+    def __init__(self):
+        self.names = {}
+        self.pinyin = {}
+        self.grams = {}
+        self.lengths = {}
+
+    def insert(self, name: str, contact: object):
+        """插入姓名关联的联系人；姓名首次出现时建立拼音与 n-gram 索引"""
+        bucket = self.names.get(name)
+        if bucket is None:
+            self.names[name] = [contact]
+            self._add_name(name)
+        elif _seq(bucket[-1]) < contact.seq:
+            bucket.append(contact)
+        else:
+            bucket.insert(seq_bisect_right(bucket, contact.seq), contact)
+
+    def bulk_insert(self, items):
+        """批量插入 (姓名, 联系人)，要求联系人按 seq 升序且晚于已有记录（bulk_load 保证）"""
+        names = self.names
+        for name, contact in items:
+            bucket = names.get(name)
+            if bucket is None:
+                names[name] = [contact]
+                self._add_name(name)
+            else:
+                bucket.append(contact)
+
+    def delete(self, name: str, contact: object):
+        """删除姓名关联的联系人；该姓名不再有联系人时一并移除拼音与 n-gram 索引"""
+        bucket = self.names.get(name)
+        if bucket is None:
+            return
+        pos = seq_bisect_left(bucket, contact.seq)
+        if pos < len(bucket) and bucket[pos] is contact:
+            del bucket[pos]
+        if not bucket:
+            del self.names[name]
+            self._remove_name(name)
+
+    def _pinyin_keys(self, name: str) -> set:
+        full, initials = to_pinyin(name)
+        return {key[:i] for key in (full, initials) for i in range(1, len(key) + 1)}
+
+    def _add_name(self, name: str):
+        for key in self._pinyin_keys(name):
+            self.pinyin.setdefault(key, set()).add(name)
+        for gram in _bigrams(name):
+            self.grams.setdefault(gram, set()).add(name)
+        self.lengths.setdefault(len(name), set()).add(name)
+
+    def _remove_name(self, name: str):
+        for table, keys in ((self.pinyin, self._pinyin_keys(name)), (self.grams, _bigrams(name)),
+                            (self.lengths, (len(name),))):
+            for key in keys:
+                names = table.get(key)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del table[key]
+
+    def lookup(self, name: str) -> list:
+        """精确姓名查找，返回按添加顺序排列的联系人列表（只读，调用方不得修改）"""
+        return self.names.get(name, [])
+
+    def pinyin_names(self, query: str) -> list:
+        """
+        全拼或首字母前缀匹配的姓名，如 "zs"、"zhangs" 都匹配 "张三"
+        :return: 单个分组 [姓名列表]，供 collect/count 使用
+        """
+        query = normalize_query(query)
+        return [list(self.pinyin.get(query, ()))] if query else [[]]
+
+    def fuzzy_names(self, name: str, max_distance: int = 1) -> list:
+        """
+        编辑距离不超过 max_distance 的姓名（错字、漏字、多字）
+        :return: 按距离分组的姓名列表 [[距离0], [距离1], ...]
+        """
+        query_grams = _bigrams(name)
+        # 每次编辑最多破坏两个二元组，共享数不足的候选可直接排除
+        required = len(query_grams) - 2 * max_distance
+        if required > 0:
+            shared = {}
+            for gram in query_grams:
+                for candidate in self.grams.get(gram, ()):
+                    shared[candidate] = shared.get(candidate, 0) + 1
+            candidates = [candidate for candidate, count in shared.items() if count >= required]
+        else:
+            # 检索词相对 max_distance 过短，与之没有共同二元组的姓名也可能命中（如 "张" 与 "李"）：
+            # 改为取长度相差不超过 max_distance 的全部姓名
+            candidates = chain.from_iterable(
+                self.lengths.get(length, ())
+                for length in range(max(len(name) - max_distance, 0), len(name) + max_distance + 1)
+            )
+        groups = [[] for _ in range(max_distance + 1)]
+        for candidate in candidates:
+            distance = edit_distance(name, candidate, max_distance)
+            if distance <= max_distance:
+                groups[distance].append(candidate)
+        return groups
+
+    def collect(self, groups: list, limit: int = None, offset: int = 0) -> list:
+        """
+        取出分组内全部姓名的联系人：组间按分组顺序，组内按插入顺序归并
+        :param limit: 最多返回条数，None 表示不限
+        :param offset: 跳过的条数
+        """
+        names = self.names
+        merged = chain.from_iterable(
+            merge(*(names[n] for n in group if n in names), key=_seq) for group in groups
+        )
+        stop = offset + limit if limit is not None else None
+        return list(islice(merged, offset, stop))
+
+    def count(self, groups: list) -> int:
+        """分组内全部姓名的联系人总数"""
+        names = self.names
+        return sum(len(names[n]) for group in groups for n in group if n in names)
+
+    def stats(self) -> dict:
+        """索引规模统计"""
+        return {
+            "engine": "name_search",
+            "names": len(self.names),
+            "pinyin_keys": len(self.pinyin),
+            "grams": len(self.grams),
+        }
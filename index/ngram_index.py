@@ -0,0 +1,145 @@
+from bisect import bisect_left, insort
+from operator import attrgetter
+
+# 倒排表较短的一方远小于另一方时，改为在长表上二分跳跃查找
+_GALLOP_RATIO = 8
+
+
+def _intersect(postings: list) -> list:
+    """求多个升序整数倒排表的交集，从最短的表开始逐个收缩"""
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        if not result:
+            break
+        if len(other) > _GALLOP_RATIO * len(result):
+            matched = []
+            lo = 0
+            for seq in result:
+                lo = bisect_left(other, seq, lo)
+                if lo == len(other):
+                    break
+                if other[lo] == seq:
+                    matched.append(seq)
+            result = matched
+        else:
+            members = set(other)
+            result = [seq for seq in result if seq in members]
+    return result
+
+
+class NgramIndex:
+    """
+    n-gram 倒排索引，支持任意位置的子串检索（如手机号后四位、备注关键词）
+    倒排表存联系人插入序号（升序整数），检索时对片段的全部 n-gram 求交集，再逐条核对原文
+    """
+    def __init__(self, field: str, n: int = 3):
+        """
+        :param field: 被索引的联系人字段名（"phone" / "remark"），用于核对候选
+        :param n: gram 长度；手机号只有 10 个数字取 3，中文备注字符集大取 2 即可
+        """
+        self.field = field
+        self.n = n
+        self._value = attrgetter(field)
+        # 键：n-gram；值：包含该 gram 的联系人 seq 升序列表
+        self.postings = {}
+        # seq → 联系人；通常按 seq 升序插入，短片段扫描直接按插入顺序遍历
+        self.docs = {}
+        # 撤销/回滚恢复旧联系人会插入较小的 seq，此时标记为乱序，下次扫描前重排一次
+        self._unordered = False
+
+    def _grams(self, keyword: str):
+        n = self.n
+        # dict.fromkeys 去重且保持顺序
+        return dict.fromkeys(keyword[i:i + n] for i in range(len(keyword) - n + 1))
+
+    def insert(self, keyword: str, contact: object):
+        """插入联系人字段值的全部 n-gram"""
+        seq = contact.seq
+        docs = self.docs
+        if docs and seq < next(reversed(docs)):
+            self._unordered = True
+        docs[seq] = contact
+        for gram in self._grams(keyword):
+            posting = self.postings.get(gram)
+            if posting is None:
+                self.postings[gram] = [seq]
+            elif posting[-1] < seq:
+                posting.append(seq)
+            else:
+                insort(posting, seq)
+
+    def bulk_insert(self, items):
+        """批量插入 (关键词, 联系人)，要求联系人按 seq 升序且晚于已有记录（bulk_load 保证）"""
+        postings = self.postings
+        docs = self.docs
+        for keyword, contact in items:
+            seq = contact.seq
+            docs[seq] = contact
+            for gram in self._grams(keyword):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [seq]
+                else:
+                    posting.append(seq)
+
+    def delete(self, keyword: str, contact: object):
+        """删除联系人，清理空倒排表"""
+        seq = contact.seq
+        if self.docs.pop(seq, None) is None:
+            return
+        for gram in self._grams(keyword):
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            pos = bisect_left(posting, seq)
+            if pos < len(posting) and posting[pos] == seq:
+                del posting[pos]
+            if not posting:
+                del self.postings[gram]
+
+    def match(self, fragment: str) -> list:
+        """
+        子串匹配
+        :param fragment: 任意位置的片段；短于 n 时无法用倒排表，退化为扫描全部联系人
+        :return: 字段中包含 fragment 的联系人 seq 升序列表（即添加顺序）
+        """
+        docs = self.docs
+        value = self._value
+        if len(fragment) < self.n:
+            if self._unordered:
+                docs = self.docs = dict(sorted(docs.items()))
+                self._unordered = False
+            return [seq for seq, contact in docs.items() if fragment in value(contact)]
+        postings = []
+        for gram in self._grams(fragment):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        candidates = _intersect(postings)
+        # 片段恰为一个 gram 时交集即结果，否则 gram 可能出现在不同位置，需要核对原文
+        if len(fragment) == self.n:
+            return candidates
+        return [seq for seq in candidates if fragment in value(docs[seq])]
+
+    def resolve(self, seqs) -> list:
+        """seq 转联系人；分页时只转换当前页"""
+        docs = self.docs
+        return [docs[seq] for seq in seqs]
+
+    def search(self, fragment: str) -> list:
+        """子串检索，返回字段中包含 fragment 的联系人列表（按添加顺序）"""
+        return self.resolve(self.match(fragment))
+
+    def stats(self) -> dict:
+        """倒排表规模统计"""
+        sizes = [len(posting) for posting in self.postings.values()]
+        return {
+            "engine": f"{self.n}-gram",
+            "field": self.field,
+            "documents": len(self.docs),
+            "grams": len(sizes),
+            "postings": sum(sizes),
+            "max_posting": max(sizes, default=0),
+        }
@@ -0,0 +1,265 @@
+import threading
+from heapq import merge
+from itertools import chain, islice
+
+from .hash_index import HashPrefixIndex
+
+# numpy 为可选依赖，仅列存储引擎需要；导入耗时数十毫秒，推迟到首次创建索引时
+np = None
+
+# 手机号定长位数：11 位纯数字的关键词才进入列存储
+PHONE_DIGITS = 11
+
+# 缓冲的插入与删除累计超过该数时才合并进列存储；此前检索从缓冲中补齐/过滤，不触发整列重建
+_MERGE_LIMIT = 1024
+
+
+def _import_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("NumpyPhoneIndex 需要 numpy：pip install numpy") from None
+        np = numpy
+
+
+def _is_phone(keyword: str) -> bool:
+    return len(keyword) == PHONE_DIGITS and keyword.isascii() and keyword.isdigit()
+
+
+class NumpyPhoneIndex:
+    """
+    手机号列存储索引：有序 int64 手机号列 + 并行的序号列、联系人列，接口与 HashPrefixIndex 一致
+    长度为 L 的数字前缀 p 对应整数区间 [p*10^(11-L), (p+1)*10^(11-L))，两次 searchsorted 定位；
+    search_many / count_many 一次调用解析成千上万个前缀。
+    插入与删除先缓冲：新记录另建小的前缀索引供检索归并，删除记为墓碑在检索时过滤；
+    缓冲超过 _MERGE_LIMIT 时（在插入/删除中，即写锁内）一次向量化合并。
+    非 11 位纯数字的关键词交给内置 HashPrefixIndex
+    """
+    def __init__(self):
+        _import_numpy()
+        self.keys = np.empty(0, dtype=np.int64)
+        self.seqs = np.empty(0, dtype=np.int64)
+        self.contacts = np.empty(0, dtype=object)
+        # 尚未合并的新记录：序号 → (手机号整数, 序号, 联系人)，另建前缀索引供检索时归并
+        self._pending = {}
+        self._recent = HashPrefixIndex()
+        # 墓碑：已删除但仍在列存储中的记录，序号 → 手机号整数
+        self._deleted = {}
+        # 不符合定长格式的关键词（脏数据）
+        self._other = HashPrefixIndex()
+        # 合并过程串行化（插入/删除由写锁保证互斥，直接使用本类时也不会并发合并）
+        self._merge_lock = threading.Lock()
+
+    def insert(self, keyword: str, contact: object):
+        """插入手机号关联的联系人"""
+        if _is_phone(keyword):
+            seq = contact.seq
+            if self._deleted.pop(seq, None) is not None:
+                # 同一联系人删除后又被重新插入（版本回滚）：记录仍在列存储中，撤销墓碑即可
+                return
+            self._pending[seq] = (int(keyword), seq, contact)
+            self._recent.insert(keyword, contact)
+            self._merge_if_full()
+        elif keyword:
+            self._other.insert(keyword, contact)
+
+    def bulk_insert(self, items):
+        """批量插入 (手机号, 联系人)，一次向量化合并（不经过缓冲的前缀索引）"""
+        rows = []
+        for keyword, contact in items:
+            if _is_phone(keyword):
+                rows.append((int(keyword), contact.seq, contact))
+            elif keyword:
+                self._other.insert(keyword, contact)
+        self._merge(rows)
+
+    def delete(self, keyword: str, contact: object):
+        """删除手机号关联的联系人：尚在缓冲中的直接移除，已在列存储中的记为墓碑"""
+        if _is_phone(keyword):
+            seq = contact.seq
+            if self._pending.pop(seq, None) is not None:
+                self._recent.delete(keyword, contact)
+            else:
+                self._deleted[seq] = int(keyword)
+                self._merge_if_full()
+        else:
+            self._other.delete(keyword, contact)
+
+    def _merge_if_full(self):
+        if len(self._pending) + len(self._deleted) > _MERGE_LIMIT:
+            self._merge()
+
+    def _merge(self, rows=()):
+        """
+        把缓冲的插入/删除（及 bulk_insert 的新记录）合并进有序列：
+        过滤墓碑后，新记录排序并按 searchsorted 位置 np.insert，整列复制一次，不再整体排序
+        先替换三列，再清空缓冲
+        """
+        with self._merge_lock:
+            rows = list(self._pending.values()) + list(rows) if self._pending else list(rows)
+            if not rows and not self._deleted:
+                return
+            keys, seqs, contacts = self.keys, self.seqs, self.contacts
+            deleted = self._deleted
+            if deleted:
+                keep = ~np.isin(seqs, np.fromiter(deleted, dtype=np.int64, count=len(deleted)))
+                keys, seqs, contacts = keys[keep], seqs[keep], contacts[keep]
+            if rows:
+                new_keys = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+                new_seqs = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+                new_contacts = np.empty(len(rows), dtype=object)
+                new_contacts[:] = [r[2] for r in rows]
+                order = np.lexsort((new_seqs, new_keys))
+                new_keys, new_seqs, new_contacts = new_keys[order], new_seqs[order], new_contacts[order]
+                # 同一手机号的新记录序号更大，排在已有记录之后
+                positions = np.searchsorted(keys, new_keys, "right")
+                keys = np.insert(keys, positions, new_keys)
+                seqs = np.insert(seqs, positions, new_seqs)
+                contacts = np.insert(contacts, positions, new_contacts)
+            self.keys, self.seqs, self.contacts = keys, seqs, contacts
+            self._pending = {}
+            self._recent = HashPrefixIndex()
+            self._deleted = {}
+
+    def _buffered(self, prefix: str, bounds: tuple, after_key: int = None) -> tuple:
+        """
+        缓冲中与前缀相关的部分
+        :return: (区间内的墓碑数, 缓冲中匹配的新记录 [(手机号整数, 序号, 联系人)] 按 (手机号, 序号) 排序)
+        """
+        lo_key = bounds[0] if after_key is None else max(bounds[0], after_key + 1)
+        hi_key = bounds[1]
+        tombstones = sum(1 for key in self._deleted.values() if lo_key <= key < hi_key)
+        pending = self._pending
+        recent = sorted(pending[c.seq] for c in self._recent.iter_prefix(prefix))
+        if after_key is not None:
+            recent = [row for row in recent if row[0] > after_key]
+        return tombstones, recent
+
+    @staticmethod
+    def _bounds(prefix: str):
+        """数字前缀 → 手机号整数区间 [lo, hi)；非数字或超长前缀返回 None"""
+        if not prefix or len(prefix) > PHONE_DIGITS or not (prefix.isascii() and prefix.isdigit()):
+            return None
+        scale = 10 ** (PHONE_DIGITS - len(prefix))
+        return int(prefix) * scale, (int(prefix) + 1) * scale
+
+    def _range(self, prefix: str) -> tuple:
+        bounds = self._bounds(prefix)
+        if bounds is None:
+            return 0, 0
+        return (int(np.searchsorted(self.keys, bounds[0], "left")),
+                int(np.searchsorted(self.keys, bounds[1], "left")))
+
+    def search(self, prefix: str, limit: int = None, offset: int = 0, after: tuple = None) -> list:
+        """
+        前缀检索，返回匹配的联系人列表（按手机号排序，脏数据排在最后）
+        :param limit: 最多返回条数，None 表示全部
+        :param offset: 跳过的条数
+        :param after: 键集分页游标 (关键词, 序号)
+        """
+        lo, hi = self._range(prefix)
+        other_after = after_key = None
+        if after is not None:
+            if _is_phone(after[0]):
+                after_key = int(after[0])
+                lo = max(lo, int(np.searchsorted(self.keys, after_key, "right")))
+            else:
+                # 游标已进入脏数据段：列存储部分全部跳过
+                lo, other_after = hi, after
+        bounds = self._bounds(prefix)
+        if bounds is None or other_after is not None or not (self._pending or self._deleted):
+            start = lo + offset
+            stop = hi if limit is None else min(hi, start + limit)
+            results = self.contacts[start:stop].tolist() if start < stop else []
+            phone_total = hi - lo
+        else:
+            results, phone_total = self._search_buffered(prefix, bounds, after_key, lo, hi, limit, offset)
+        # 列存储部分不足一页时，从脏数据段补齐
+        if limit is None or len(results) < limit:
+            other_offset = max(0, offset - phone_total)
+            other_limit = None if limit is None else limit - len(results)
+            results += self._other.search(prefix, other_limit, other_offset, other_after)
+        return results
+
+    def _search_buffered(self, prefix: str, bounds: tuple, after_key, lo: int, hi: int, limit, offset: int):
+        """
+        有缓冲时的检索：列存储区间去掉墓碑后与缓冲中的新记录按 (手机号, 序号) 归并
+        只取出 offset + limit + 墓碑数 行列存储，代价与页大小和缓冲大小相关，与总规模无关
+        :return: (本页联系人, 手机号部分的匹配总数)
+        """
+        tombstones, recent = self._buffered(prefix, bounds, after_key)
+        deleted = self._deleted
+        stop = hi if limit is None else min(hi, lo + offset + limit + len(deleted))
+        column = [row for row in zip(self.keys[lo:stop].tolist(), self.seqs[lo:stop].tolist(),
+                                     self.contacts[lo:stop].tolist()) if row[1] not in deleted]
+        end = None if limit is None else offset + limit
+        results = [row[2] for row in islice(merge(column, recent), offset, end)]
+        return results, hi - lo - tombstones + len(recent)
+
+    def count(self, prefix: str) -> int:
+        """前缀匹配总数：两次二分（有缓冲时再扣除区间内的墓碑、加上缓冲中的匹配）"""
+        lo, hi = self._range(prefix)
+        total = hi - lo + self._other.count(prefix)
+        bounds = self._bounds(prefix)
+        if bounds is not None and (self._pending or self._deleted):
+            tombstones, recent = self._buffered(prefix, bounds)
+            total += len(recent) - tombstones
+        return total
+
+    def iter_prefix(self, prefix: str):
+        """惰性遍历前缀匹配结果"""
+        lo, hi = self._range(prefix)
+        contacts = self.contacts
+        column = (contacts[i] for i in range(lo, hi))
+        bounds = self._bounds(prefix)
+        if bounds is not None and (self._pending or self._deleted):
+            deleted = self._deleted
+            seqs = self.seqs
+            column = ((int(self.keys[i]), int(seqs[i]), contacts[i]) for i in range(lo, hi)
+                      if int(seqs[i]) not in deleted)
+            column = (row[2] for row in merge(column, self._buffered(prefix, bounds)[1]))
+        return chain(column, self._other.iter_prefix(prefix))
+
+    def _many_bounds(self, prefixes: list):
+        """向量化计算一批纯数字前缀的 searchsorted 区间"""
+        lens = np.fromiter((len(p) for p in prefixes), dtype=np.int64, count=len(prefixes))
+        values = np.fromiter((int(p) for p in prefixes), dtype=np.int64, count=len(prefixes))
+        scale = 10 ** (PHONE_DIGITS - lens)
+        lo = np.searchsorted(self.keys, values * scale, "left")
+        hi = np.searchsorted(self.keys, (values + 1) * scale, "left")
+        return lo, hi
+
+    def count_many(self, prefixes: list) -> list:
+        """批量前缀计数"""
+        if not all(self._bounds(p) for p in prefixes) or self._other.index or self._pending or self._deleted:
+            return [self.count(p) for p in prefixes]
+        lo, hi = self._many_bounds(prefixes)
+        return (hi - lo).tolist()
+
+    def search_many(self, prefixes: list, limit: int = None) -> list:
+        """
+        批量前缀检索：一次向量化 searchsorted 解析全部前缀
+        :param limit: 每个前缀最多返回条数
+        :return: 与 prefixes 一一对应的联系人列表
+        """
+        if not all(self._bounds(p) for p in prefixes) or self._other.index or self._pending or self._deleted:
+            return [self.search(p, limit) for p in prefixes]
+        lo, hi = self._many_bounds(prefixes)
+        if limit is not None:
+            hi = np.minimum(hi, lo + limit)
+        contacts = self.contacts
+        return [contacts[a:b].tolist() for a, b in zip(lo.tolist(), hi.tolist())]
+
+
+    def stats(self) -> dict:
+        """索引规模：列存储记录数、待合并插入/删除数、脏数据关键词统计"""
+        return {
+            "engine": "numpy",
+            "entries": len(self.keys),
+            "column_bytes": self.keys.nbytes + self.seqs.nbytes + self.contacts.nbytes,
+            "pending_inserts": len(self._pending),
+            "pending_deletes": len(self._deleted),
+            "other": self._other.stats(),
+        }
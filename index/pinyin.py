@@ -0,0 +1,128 @@
+"""
+汉字转拼音：优先使用 pypinyin（可选依赖），未安装时退回内置的常用姓氏/名字用字表
+表外的汉字原样保留，字母数字转为小写
+"""
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # pypinyin 为可选依赖，未安装时使用内置拼音表
+    lazy_pinyin = None
+
+# 内置拼音表：覆盖百家姓与常见名字用字（含 import random.py 中的全部用字）
+_PINYIN = {
+    "一": "yi", "丁": "ding", "七": "qi", "万": "wan", "三": "san", "丘": "qiu", "丛": "cong", "东": "dong",
+    "严": "yan", "中": "zhong", "丰": "feng", "丹": "dan", "丽": "li", "义": "yi", "乌": "wu", "乐": "le",
+    "乔": "qiao", "乜": "mie", "九": "jiu", "习": "xi", "二": "er", "云": "yun", "五": "wu", "井": "jing",
+    "亚": "ya", "亦": "yi", "亮": "liang", "仁": "ren", "仇": "chou", "仉": "zhang", "从": "cong",
+    "仰": "yang", "仲": "zhong", "任": "ren", "伊": "yi", "伍": "wu", "伏": "fu", "伟": "wei", "位": "wei",
+    "何": "he", "余": "yu", "佟": "tong", "佳": "jia", "侯": "hou", "俊": "jun", "保": "bao", "俞": "yu",
+    "信": "xin", "倩": "qian", "倪": "ni", "健": "jian", "傅": "fu", "储": "chu", "僧": "seng",
+    "元": "yuan", "充": "chong", "光": "guang", "党": "dang", "全": "quan", "八": "ba", "公": "gong",
+    "六": "liu", "兰": "lan", "关": "guan", "兴": "xing", "兵": "bing", "养": "yang", "冀": "ji",
+    "冉": "ran", "军": "jun", "农": "nong", "冬": "dong", "冯": "feng", "冰": "bing", "冷": "leng",
+    "冼": "xian", "凌": "ling", "凤": "feng", "刁": "diao", "刘": "liu", "刚": "gang", "利": "li",
+    "别": "bie", "剑": "jian", "劳": "lao", "勇": "yong", "勾": "gou", "包": "bao", "北": "bei",
+    "匡": "kuang", "十": "shi", "千": "qian", "华": "hua", "卓": "zhuo", "单": "dan", "南": "nan",
+    "博": "bo", "卜": "bo", "卞": "bian", "卫": "wei", "危": "wei", "却": "que", "厍": "she", "原": "yuan",
+    "双": "shuang", "古": "gu", "台": "tai", "史": "shi", "叶": "ye", "司": "si", "吉": "ji", "后": "hou",
+    "向": "xiang", "吕": "lv", "吴": "wu", "周": "zhou", "和": "he", "咎": "jiu", "咸": "xian", "哲": "zhe",
+    "唐": "tang", "商": "shang", "喜": "xi", "喻": "yu", "嘉": "jia", "四": "si", "国": "guo", "堵": "du",
+    "夏": "xia", "夔": "kui", "大": "da", "天": "tian", "奕": "yi", "奚": "xi", "如": "ru", "妍": "yan",
+    "妮": "ni", "姜": "jiang", "姬": "ji", "威": "wei", "娄": "lou", "娇": "jiao", "娜": "na", "娟": "juan",
+    "娴": "xian", "婉": "wan", "婕": "jie", "婷": "ting", "媛": "yuan", "嫣": "yan", "子": "zi",
+    "孔": "kong", "孙": "sun", "孝": "xiao", "孟": "meng", "季": "ji", "宁": "ning", "宇": "yu", "安": "an",
+    "宋": "song", "宏": "hong", "宓": "mi", "宗": "zong", "官": "guan", "宝": "bao", "实": "shi",
+    "宣": "xuan", "宦": "huan", "宫": "gong", "宰": "zai", "家": "jia", "宸": "chen", "容": "rong",
+    "寇": "kou", "富": "fu", "寿": "shou", "封": "feng", "小": "xiao", "少": "shao", "尚": "shang",
+    "尤": "you", "尹": "yin", "居": "ju", "屈": "qu", "屠": "tu", "山": "shan", "岑": "cen", "岳": "yue",
+    "峰": "feng", "崔": "cui", "嵇": "ji", "嵺": "liao", "巢": "chao", "左": "zuo", "巩": "gong",
+    "巫": "wu", "巴": "ba", "师": "shi", "席": "xi", "常": "chang", "干": "gan", "平": "ping",
+    "广": "guang", "庄": "zhuang", "庆": "qing", "应": "ying", "庞": "pang", "康": "kang", "庾": "yu",
+    "廉": "lian", "廖": "liao", "建": "jian", "弓": "gong", "弘": "hong", "张": "zhang", "强": "qiang",
+    "彤": "tong", "彬": "bin", "彭": "peng", "徐": "xu", "德": "de", "心": "xin", "志": "zhi",
+    "忠": "zhong", "思": "si", "怡": "yi", "惠": "hui", "想": "xiang", "意": "yi", "慎": "shen", "慕": "mu",
+    "慧": "hui", "戈": "ge", "成": "cheng", "戚": "qi", "房": "fang", "扈": "hu", "才": "cai", "扬": "yang",
+    "扶": "fu", "振": "zhen", "揭": "jie", "支": "zhi", "敏": "min", "敖": "ao", "文": "wen", "斌": "bin",
+    "新": "xin", "方": "fang", "於": "yu", "施": "shi", "无": "wu", "日": "ri", "旭": "xu", "时": "shi",
+    "昌": "chang", "明": "ming", "易": "yi", "星": "xing", "春": "chun", "晁": "chao", "晋": "jin",
+    "晏": "yan", "晓": "xiao", "晖": "hui", "晨": "chen", "景": "jing", "晴": "qing", "晶": "jing",
+    "智": "zhi", "暨": "ji", "曦": "xi", "曲": "qu", "曹": "cao", "曾": "ceng", "月": "yue", "朝": "chao",
+    "木": "mu", "朱": "zhu", "权": "quan", "李": "li", "杏": "xing", "杜": "du", "来": "lai", "杨": "yang",
+    "杭": "hang", "杰": "jie", "松": "song", "林": "lin", "柏": "bai", "查": "cha", "柯": "ke", "柳": "liu",
+    "柴": "chai", "树": "shu", "栗": "li", "栾": "luan", "桂": "gui", "桃": "tao", "桐": "tong",
+    "桑": "sang", "桓": "huan", "梁": "liang", "梅": "mei", "梓": "zi", "梦": "meng", "森": "sen",
+    "植": "zhi", "楚": "chu", "樊": "fan", "欢": "huan", "欣": "xin", "欧": "ou", "正": "zheng", "步": "bu",
+    "武": "wu", "殳": "shu", "段": "duan", "殷": "yin", "毋": "wu", "毕": "bi", "民": "min", "水": "shui",
+    "永": "yong", "池": "chi", "汤": "tang", "汪": "wang", "汲": "ji", "沃": "wo", "沈": "shen", "沐": "mu",
+    "沙": "sha", "河": "he", "沿": "yan", "波": "bo", "泽": "ze", "洋": "yang", "洪": "hong", "浦": "pu",
+    "浩": "hao", "海": "hai", "涂": "tu", "涛": "tao", "涵": "han", "淑": "shu", "清": "qing", "温": "wen",
+    "游": "you", "湛": "zhan", "溪": "xi", "滑": "hua", "滕": "teng", "满": "man", "潘": "pan", "濮": "pu",
+    "焦": "jiao", "然": "ran", "熙": "xi", "燕": "yan", "爱": "ai", "牛": "niu", "牟": "mou", "牧": "mu",
+    "玉": "yu", "王": "wang", "玲": "ling", "珍": "zhen", "珠": "zhu", "班": "ban", "琛": "chen",
+    "琪": "qi", "琳": "lin", "琴": "qin", "琼": "qiong", "瑜": "yu", "瑞": "rui", "瑶": "yao", "瑾": "jin",
+    "璐": "lu", "璩": "qu", "甄": "zhen", "甘": "gan", "生": "sheng", "田": "tian", "申": "shen",
+    "畅": "chang", "百": "bai", "皓": "hao", "皮": "pi", "益": "yi", "盖": "gai", "盛": "sheng",
+    "相": "xiang", "督": "du", "睿": "rui", "瞿": "qu", "石": "shi", "磊": "lei", "礼": "li", "祁": "qi",
+    "祝": "zhu", "祥": "xiang", "禄": "lu", "福": "fu", "禹": "yu", "秀": "xiu", "秋": "qiu", "秦": "qin",
+    "程": "cheng", "稽": "ji", "穆": "mu", "空": "kong", "窦": "dou", "立": "li", "章": "zhang",
+    "童": "tong", "竹": "zhu", "竺": "zhu", "符": "fu", "简": "jian", "管": "guan", "籍": "ji", "米": "mi",
+    "糜": "mi", "索": "suo", "红": "hong", "纪": "ji", "练": "lian", "终": "zhong", "经": "jing",
+    "缪": "mou", "罗": "luo", "羊": "yang", "美": "mei", "羿": "yi", "翁": "weng", "翟": "di", "耀": "yao",
+    "耿": "geng", "聂": "nie", "胡": "hu", "胥": "xu", "能": "neng", "臧": "zang", "舒": "shu",
+    "航": "hang", "艳": "yan", "艾": "ai", "芝": "zhi", "芦": "lu", "芬": "fen", "芮": "rui", "花": "hua",
+    "芳": "fang", "苍": "cang", "苏": "su", "苑": "yuan", "苗": "miao", "苟": "gou", "若": "ruo",
+    "英": "ying", "范": "fan", "茅": "mao", "茹": "ru", "荀": "xun", "荆": "jing", "荣": "rong", "莉": "li",
+    "莘": "shen", "莫": "mo", "莹": "ying", "菊": "ju", "菲": "fei", "萍": "ping", "萧": "xiao",
+    "萱": "xuan", "葛": "ge", "董": "dong", "蒋": "jiang", "蒙": "meng", "蒯": "kuai", "蒲": "pu",
+    "蓉": "rong", "蓝": "lan", "蓬": "peng", "蔚": "wei", "蔡": "cai", "蔺": "lin", "蕾": "lei",
+    "薄": "bao", "薇": "wei", "薛": "xue", "虎": "hu", "虞": "yu", "融": "rong", "衡": "heng", "衣": "yi",
+    "袁": "yuan", "裘": "qiu", "裴": "pei", "褚": "chu", "西": "xi", "覃": "tan", "解": "jie", "訾": "zi",
+    "詹": "zhan", "諸": "zhu", "计": "ji", "许": "xu", "诗": "shi", "诚": "cheng", "语": "yu", "诺": "nuo",
+    "谈": "tan", "谌": "chen", "谢": "xie", "谭": "tan", "谷": "gu", "豪": "hao", "贝": "bei", "贡": "gong",
+    "贲": "ben", "贵": "gui", "费": "fei", "贺": "he", "贾": "jia", "赖": "lai", "赵": "zhao", "超": "chao",
+    "越": "yue", "路": "lu", "车": "che", "轩": "xuan", "辉": "hui", "辛": "xin", "辜": "gu", "辰": "chen",
+    "边": "bian", "远": "yuan", "连": "lian", "迟": "chi", "逄": "pang", "通": "tong", "逯": "lu",
+    "邓": "deng", "邢": "xing", "那": "na", "邬": "wu", "邴": "bing", "邵": "shao", "邸": "di", "邹": "zou",
+    "郁": "yu", "郎": "lang", "郏": "jia", "郑": "zheng", "郗": "xi", "郜": "gao", "郦": "li", "郭": "guo",
+    "都": "dou", "鄂": "e", "鄢": "yan", "酆": "feng", "金": "jin", "鑫": "xin", "钟": "zhong", "钮": "niu",
+    "钱": "qian", "银": "yin", "锋": "feng", "长": "zhang", "闵": "min", "闻": "wen", "阎": "yan",
+    "阙": "que", "阚": "han", "阮": "ruan", "阳": "yang", "阴": "yin", "陈": "chen", "陶": "tao",
+    "隆": "long", "隋": "sui", "隗": "kui", "雄": "xiong", "雅": "ya", "雍": "yong", "雨": "yu",
+    "雪": "xue", "雯": "wen", "雷": "lei", "霍": "huo", "霖": "lin", "霜": "shuang", "霞": "xia",
+    "露": "lu", "静": "jing", "靳": "jin", "鞠": "ju", "韦": "wei", "韩": "han", "项": "xiang",
+    "顺": "shun", "须": "xu", "颖": "ying", "颜": "yan", "飞": "fei", "饶": "rao", "马": "ma", "骆": "luo",
+    "高": "gao", "鬱": "yu", "魏": "wei", "鱼": "yu", "鲁": "lu", "鲍": "bao", "鹏": "peng", "麻": "ma",
+    "黄": "huang", "黎": "li", "齐": "qi", "龙": "long", "龚": "gong",
+}
+
+# 多音字作姓氏时的读音，仅对姓名首字生效
+_SURNAME_PINYIN = {
+    "单": "shan", "曾": "zeng", "解": "xie", "仇": "qiu", "查": "zha", "乐": "yue", "区": "ou",
+    "朴": "piao", "盖": "ge", "覃": "qin", "尉": "yu", "缪": "miao", "翟": "zhai", "种": "chong",
+    "繁": "po", "召": "shao", "长": "chang",
+}
+
+
+def _syllable(char: str) -> str:
+    """单个字符的拼音（无声调），无法转换时返回小写的原字符"""
+    if "\u4e00" <= char <= "\u9fff":
+        if lazy_pinyin is not None:
+            return lazy_pinyin(char)[0]
+        return _PINYIN.get(char, char)
+    return char.lower()
+
+
+def to_pinyin(name: str) -> tuple:
+    """
+    姓名转拼音
+    :param name: 姓名，如 "张三"
+    :return: (全拼, 首字母)，如 ("zhangsan", "zs")
+    """
+    syllables = [_syllable(char) for char in name]
+    if name and name[0] in _SURNAME_PINYIN:
+        syllables[0] = _SURNAME_PINYIN[name[0]]
+    return "".join(syllables), "".join(s[0] for s in syllables if s)
+
+
+def normalize_query(query: str) -> str:
+    """拼音检索词规范化：转小写，去掉空格与隔音符号，查询中的汉字转为全拼"""
+    return "".join(_syllable(char) for char in query if char not in " '")
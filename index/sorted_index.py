@@ -0,0 +1,126 @@
+import threading
+from bisect import bisect_left, insort
+
+# 待合并记录不超过该数时逐条二分插入（每条一次内存移动），超过时整体排序合并
+_INSORT_LIMIT = 256
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """返回大于所有以 prefix 开头字符串的最小字符串（前缀区间的右边界）"""
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None  # 前缀全为最大码点：区间一直延伸到末尾
+
+
+class SortedPrefixIndex:
+    """
+    基于有序数组的前缀索引，与 HashPrefixIndex 接口一致
+    每个关键词只存一条 (关键词, 插入序号, 联系人) 记录，前缀检索为二分定位的区间扫描；
+    插入先进入待合并缓冲区，下一次检索/删除时合并：少量记录逐条 insort，大批量时一次性排序合并
+    结果按 (关键词, contact.seq) 稳定排序
+    """
+    def __init__(self):
+        # 有序记录：(关键词, 插入序号, 联系人)，插入序号保证同名记录按插入顺序排列
+        self.entries = []
+        # 尚未合并进 entries 的新记录
+        self._pending = []
+        # 检索可能由多个读者并发触发合并，合并过程串行化
+        self._merge_lock = threading.Lock()
+
+    def insert(self, keyword: str, contact: object):
+        """插入关键词（姓名/电话）关联的联系人"""
+        if not keyword:
+            return
+        self._pending.append((keyword, contact.seq, contact))
+
+    def bulk_insert(self, items):
+        """批量插入 (关键词, 联系人)：一次性追加后排序合并（sort-then-build）"""
+        self._pending.extend((keyword, contact.seq, contact) for keyword, contact in items if keyword)
+        self._merge_pending()
+
+    def delete(self, keyword: str, contact: object):
+        """删除关键词关联的联系人"""
+        if not keyword:
+            return
+        self._merge_pending()
+        i = bisect_left(self.entries, (keyword, contact.seq))
+        if i < len(self.entries) and self.entries[i][2] is contact:
+            del self.entries[i]
+
+    def search(self, prefix: str, limit: int = None, offset: int = 0, after: tuple = None) -> list:
+        """
+        前缀检索，返回匹配的联系人列表（按关键词排序）
+        :param limit: 最多返回条数，None 表示全部
+        :param offset: 跳过的条数
+        :param after: 键集分页游标 (关键词, 序号)，只返回排在该联系人之后的结果
+        """
+        if not prefix:
+            return []
+        entries, lo, hi = self._range(prefix)
+        if after is not None:
+            lo = max(lo, bisect_left(entries, (after[0], after[1] + 1), lo, hi))
+        lo += offset
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [entry[2] for entry in entries[lo:hi]]
+
+    def count(self, prefix: str) -> int:
+        """前缀匹配总数，两次二分 O(log N)"""
+        if not prefix:
+            return 0
+        _, lo, hi = self._range(prefix)
+        return hi - lo
+
+    def search_many(self, prefixes: list, limit: int = None) -> list:
+        """批量前缀检索，返回与 prefixes 一一对应的联系人列表"""
+        return [self.search(prefix, limit) for prefix in prefixes]
+
+    def iter_prefix(self, prefix: str):
+        """惰性遍历前缀匹配结果"""
+        if not prefix:
+            return iter(())
+        entries, lo, hi = self._range(prefix)
+        return (entries[i][2] for i in range(lo, hi))
+
+    def _range(self, prefix: str) -> tuple:
+        """二分定位前缀区间，返回 (本次使用的有序数组, lo, hi)"""
+        self._merge_pending()
+        entries = self.entries
+        lo = bisect_left(entries, (prefix,))
+        upper = _prefix_upper_bound(prefix)
+        hi = bisect_left(entries, (upper,), lo) if upper is not None else len(entries)
+        return entries, lo, hi
+
+    def _merge_pending(self):
+        """
+        把缓冲区并入有序数组
+        - 不超过 _INSORT_LIMIT 条：逐条 insort 原地插入，O(k·N) 的内存移动远快于整体排序的 N 次元组比较
+        - 更多时：拼接后排序（Timsort 对"有序段+新段"近似线性），结果整体替换 entries
+        原地插入不会被并发读者看到中间状态：insert/delete 在通讯录写锁内调用，读者共存期间缓冲区只会被清空；
+        看到缓冲区为空的读者使用的是合并完成的数组，其余读者在 _merge_lock 上等待
+        """
+        if not self._pending:
+            return
+        with self._merge_lock:
+            pending = self._pending
+            if not pending:
+                return
+            if len(pending) <= _INSORT_LIMIT:
+                entries = self.entries
+                for entry in pending:
+                    insort(entries, entry)
+            else:
+                merged = self.entries + pending
+                merged.sort()
+                self.entries = merged
+            self._pending = []
+
+    def stats(self) -> dict:
+        """索引规模：有序记录数与待合并记录数"""
+        return {"engine": "sorted", "entries": len(self.entries), "pending": len(self._pending)}
+
+    def __len__(self) -> int:
+        return len(self.entries) + len(self._pending)
@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
+import contextlib
+import sys
+import time
+
 from address_book import AddressBook
-from utils.helpers import validate_phone, sanitize_input
+from commands import DEFAULT_HOST, DEFAULT_PORT, run_batch
+from index import INDEX_ENGINES, PHONE_INDEX_ENGINES
+from sharding import PARTITIONS, ShardedAddressBook
+from storage import (
+    PersistenceManager, JournaledPersistenceManager, BinaryPersistenceManager, CoalescingPersistenceManager,
+    ChangeFeed, OP_ADD
+)
+from utils.validation import validate_phone, sanitize_input
 
 # 全局变量：通讯录核心实例，供分页函数和输入函数调用
 address_book = None
@@ -21,15 +33,37 @@ def print_help() -> None:
    示例：DEL 13800138000
 3. FIND_NAME <前缀>         - 按姓名前缀检索联系人
    示例：FIND_NAME 李
-4. FIND_PHONE <前缀>        - 按手机号前缀检索联系人
+4. FIND_EXACT <姓名>        - 按完整姓名精确检索（不含以该姓名开头的其他姓名）
+   示例：FIND_EXACT 李四
+5. FIND_PHONE <前缀>        - 按手机号前缀检索联系人
    示例：FIND_PHONE 138
-5. LIST                     - 列出所有联系人（按添加顺序）
-6. SAVE                     - 手动触发数据持久化
-7. HELP                     - 查看本帮助信息
-8. EXIT                     - 退出系统（自动持久化）
+6. FIND_PINYIN <拼音>      - 按姓名全拼或首字母检索联系人
+   示例：FIND_PINYIN zs（可找到张三、赵少等）
+7. FIND_FUZZY <姓名> [距离] - 姓名模糊检索，容忍错字/漏字/多字（默认距离1）
+   示例：FIND_FUZZY 张山
+8. FIND_PHONE_SUB <片段>   - 按手机号任意位置的片段检索（如后四位）
+   示例：FIND_PHONE_SUB 8888
+9. FIND_REMARK <关键词>     - 按备注关键词检索联系人
+   示例：FIND_REMARK 工程师
+10. LIST                    - 列出所有联系人（按添加顺序）
+11. SAVE                    - 手动触发数据持久化
+12. IMPORT <文件路径>       - 从 .dat/.csv/.jsonl/.vcf 文件批量导入（可带 .gz 后缀）
+   示例：IMPORT contacts.csv
+13. EXPORT <文件路径>       - 导出全部联系人，格式按扩展名识别（.dat/.csv/.jsonl/.vcf，.gz 结尾时压缩）
+   示例：EXPORT backup.jsonl.gz
+14. SNAPSHOT [名称]         - 为当前状态打快照（需以 --versioned 启动，下同）
+15. VERSIONS                - 列出保留的历史版本
+16. UNDO                    - 撤销上一次修改（或回到最近的快照）
+17. ROLLBACK <版本号>       - 回滚到指定历史版本（回滚本身也可 UNDO）
+   示例：ROLLBACK 3
+18. CHANGES [起始序号]      - 查看序号大于起始序号的变更（需以 --feed 启动），省略时显示最近10条
+   示例：CHANGES 100
+19. STATS                   - 查看运行统计（操作计数/耗时直方图需以 --stats 启动）
+20. HELP                    - 查看本帮助信息
+21. EXIT                    - 退出系统（自动持久化）
 =====================================================
 📌 提示：检索结果最多展示10条，支持NEXT/PREV翻页，BACK返回主菜单
-📌 所有操作自动持久化，临时文件保留在当前目录（address_book.dat.tmp）
+📌 所有操作自动持久化：先写临时文件（address_book.dat.tmp）落盘后原子替换，崩溃不会损坏数据文件
 📌 手机号必须为11位国内合法格式（以13/14/15/17/18/19开头）
 =====================================================
     """
@@ -59,41 +93,53 @@ def get_valid_phone(prompt_tip: str) -> str:
             print("  2. 符合国内手机号格式（以13/14/15/17/18/19开头）")
             print("🔔 请重新输入正确的11位手机号\n")
 
-def pagination_interaction(contacts: list, search_type: str, elapsed_time: float) -> None:
+def show_page(fetch_page, search_type: str, page: int, page_size: int) -> tuple:
     """
-    分页交互逻辑：展示检索结果，支持NEXT/PREV翻页、BACK返回主菜单
-    :param contacts: 匹配的联系人完整列表
-    :param search_type: 检索类型（姓名/电话/全部）
-    :param elapsed_time: 检索耗时（秒），用于展示性能
+    拉取并打印一页检索结果（只物化当前页，越界页码自动修正）
+    :param fetch_page: 可调用对象 fetch_page(offset, limit)，返回 SearchPage
+    :return: (SearchPage, 修正后的页码)
     """
-    # 无匹配结果的处理
-    if not contacts:
+    page = max(page, 1)
+    start = time.perf_counter()
+    result = fetch_page((page - 1) * page_size, page_size)
+    if result.total and page > result.total_pages:
+        page = result.total_pages
+        result = fetch_page((page - 1) * page_size, page_size)
+    elapsed_time = time.perf_counter() - start
+
+    if not result.total:
         print(f"\n🔍 {search_type}前缀检索结果 | 耗时：{elapsed_time:.6f} 秒")
         print("📭 未找到匹配的联系人")
-        return
-
-    # 初始化分页参数
-    page = 1
-    page_size = 10  # 每页默认展示10条数据
+        return result, page
 
-    # 首次获取分页数据（自动修正越界页码）
-    paginated_data, total_pages, total, page = address_book.get_paginated_contacts(
-        contacts, page, page_size
-    )
-
-    # 打印首次分页结果（含核心信息）
-    print(f"\n🔍 {search_type}前缀检索结果 - 第 {page}/{total_pages} 页 | 共 {total} 条 | 耗时：{elapsed_time:.6f} 秒")
+    print(f"\n🔍 {search_type}前缀检索结果 - 第 {page}/{result.total_pages} 页 | 共 {result.total} 条 | 耗时：{elapsed_time:.6f} 秒")
     print("-" * 60)
-    for i, contact in enumerate(paginated_data, 1):
+    for i, contact in enumerate(result.items, 1):
         # 计算全局连续序号（符合用户认知，不每页重新从1开始）
-        global_idx = (page - 1) * page_size + i
+        global_idx = result.offset + i
         print(f"  {global_idx}. {contact}")
     print("-" * 60)
+    return result, page
+
+def pagination_interaction(fetch_page, search_type: str) -> None:
+    """
+    分页交互逻辑：按页拉取检索结果，支持NEXT/PREV翻页、BACK返回主菜单
+    :param fetch_page: 可调用对象 fetch_page(offset, limit)，返回 SearchPage
+    :param search_type: 检索类型（姓名/电话/全部）
+    """
+    # 初始化分页参数
+    page = 1
+    page_size = 10  # 每页默认展示10条数据
+
+    result, page = show_page(fetch_page, search_type, page, page_size)
+    # 无匹配结果直接返回
+    if not result.total:
+        return
 
     # 多页场景下的翻页交互循环
     while True:
         # 根据总页数展示不同的操作提示
-        if total_pages > 1:
+        if result.total_pages > 1:
             prompt = "操作提示：输入 NEXT 下一页 | PREV 上一页 | BACK 返回主菜单\n请输入操作指令 > "
         else:
             prompt = "操作提示：输入 BACK 返回主菜单\n请输入操作指令 > "
@@ -103,31 +149,11 @@ def pagination_interaction(contacts: list, search_type: str, elapsed_time: float
 
         if cmd == "NEXT":
             # 下一页：页码+1，自动修正越界
-            page += 1
-            paginated_data, total_pages, total, page = address_book.get_paginated_contacts(
-                contacts, page, page_size
-            )
-            # 重新打印当前页数据
-            print(f"\n🔍 {search_type}前缀检索结果 - 第 {page}/{total_pages} 页 | 共 {total} 条")
-            print("-" * 60)
-            for i, contact in enumerate(paginated_data, 1):
-                global_idx = (page - 1) * page_size + i
-                print(f"  {global_idx}. {contact}")
-            print("-" * 60)
+            result, page = show_page(fetch_page, search_type, page + 1, page_size)
 
         elif cmd == "PREV":
             # 上一页：页码-1，自动修正越界
-            page -= 1
-            paginated_data, total_pages, total, page = address_book.get_paginated_contacts(
-                contacts, page, page_size
-            )
-            # 重新打印当前页数据
-            print(f"\n🔍 {search_type}前缀检索结果 - 第 {page}/{total_pages} 页 | 共 {total} 条")
-            print("-" * 60)
-            for i, contact in enumerate(paginated_data, 1):
-                global_idx = (page - 1) * page_size + i
-                print(f"  {global_idx}. {contact}")
-            print("-" * 60)
+            result, page = show_page(fetch_page, search_type, page - 1, page_size)
 
         elif cmd == "BACK":
             # 返回主菜单，退出分页交互循环
@@ -138,20 +164,187 @@ def pagination_interaction(contacts: list, search_type: str, elapsed_time: float
             # 无效指令提示，保持循环不退出
             print("❌ 无效指令！仅支持输入 NEXT/PREV/BACK（大小写均可）")
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    解析启动参数
+    :param argv: 参数列表，默认读取命令行
+    """
+    parser = argparse.ArgumentParser(description="通讯录管理系统")
+    storage_group = parser.add_mutually_exclusive_group()
+    storage_group.add_argument("--journal", action="store_true",
+                               help="日志式持久化：修改仅追加日志，SAVE/EXIT 或日志过长时压缩为快照")
+    storage_group.add_argument("--binary", action="store_true",
+                               help="二进制快照持久化（address_book.bin，mmap 加载）")
+    storage_group.add_argument("--group-commit", action="store_true",
+                               help="合并写入：后台线程按时间间隔/修改条数合并保存，SAVE/EXIT 时立即落盘")
+    parser.add_argument("--flush-interval", type=float, default=1.0,
+                        help="合并写入模式下两次保存的最小间隔（秒），默认 1.0")
+    parser.add_argument("--flush-every", type=int, default=1000,
+                        help="合并写入模式下累计多少次修改立即保存，默认 1000")
+    parser.add_argument("--quiet", action="store_true", help="安静模式：不输出每次保存成功的提示")
+    parser.add_argument("--serve", action="store_true",
+                        help="以网络服务模式运行（JSON Lines 协议），不进入交互命令行")
+    parser.add_argument("--stats", action="store_true",
+                        help="开启操作计数与耗时直方图统计，通过 STATS 命令查看")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="前缀检索结果 LRU 缓存条目数，增删时按前缀精确失效，默认 0（不缓存）")
+    parser.add_argument("--substring-index", action="store_true",
+                        help="为手机号/备注建立 n-gram 倒排索引，加速 FIND_PHONE_SUB / FIND_REMARK（占用更多内存）")
+    parser.add_argument("--versioned", action="store_true",
+                        help="版本化模式：每次修改保留修改前的版本（结构共享，O(1) 快照），支持 UNDO / ROLLBACK")
+    parser.add_argument("--max-versions", type=int, default=100,
+                        help="版本化模式下最多保留的历史版本数，默认 100")
+    parser.add_argument("--lazy", action="store_true",
+                        help="惰性启动：后台线程加载数据文件、立即进入命令行，各索引在首次检索时才建立")
+    parser.add_argument("--warm-indexes", action="store_true",
+                        help="配合 --lazy：加载完成后由后台线程预建索引，首次检索不必等待")
+    parser.add_argument("--feed", action="store_true",
+                        help="开启变更流：每次新增/删除按序号记入 address_book.feed，下游可用 CHANGES 增量同步")
+    parser.add_argument("--feed-capacity", type=int, default=100000,
+                        help="变更流在内存中保留的最近条数，更早的变更从 address_book.feed 补读，默认 100000")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="批处理模式：逐行执行文件中的命令（- 表示标准输入），结束后统一保存一次，"
+                             "结果以 JSON Lines 输出到标准输出")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"服务监听地址，默认 {DEFAULT_HOST}")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"服务监听端口，默认 {DEFAULT_PORT}")
+    parser.add_argument("--index", choices=sorted(INDEX_ENGINES), default="hash",
+                        help="前缀索引引擎：hash（全前缀散列表）或 sorted（有序数组，省内存）")
+    parser.add_argument("--phone-index", choices=sorted(PHONE_INDEX_ENGINES), default=None,
+                        help="手机号索引引擎，默认同 --index；numpy 为 int64 列存储（需要 numpy）")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="多进程分片模式：按手机号把联系人分到 N 个工作进程（address_book.shard<i>.dat）")
+    parser.add_argument("--partition", choices=PARTITIONS, default="hash",
+                        help="分片方式：hash（负载均衡）或 range（按号段，手机号前缀检索只访问相关分片）")
+    args = parser.parse_args(argv)
+    if args.shards and (args.binary or args.group_commit):
+        parser.error("--shards 仅支持默认全量保存或 --journal 持久化")
+    if args.shards and args.versioned:
+        parser.error("--versioned 暂不支持与 --shards 同时使用")
+    if args.shards and args.feed:
+        parser.error("--feed 暂不支持与 --shards 同时使用")
+    if args.shards and args.lazy:
+        parser.error("--lazy 暂不支持与 --shards 同时使用")
+    if args.warm_indexes and not args.lazy:
+        parser.error("--warm-indexes 需要与 --lazy 同时使用")
+    return args
+
+def print_progress(count: int) -> None:
+    """导入/导出的进度回调：打印已处理行数"""
+    print(f"📌 已处理 {count} 行...")
+
+def print_stats(stats: dict) -> None:
+    """
+    格式化打印 AddressBook.stats() 快照
+    :param stats: 统计快照字典
+    """
+    print("\n📊 运行统计")
+    print("-" * 60)
+    print(f"  联系人总数：{stats['contacts']}")
+    if "shards" in stats:
+        counts = ", ".join(str(shard["contacts"]) for shard in stats["shards"])
+        print(f"  分片（{stats['partition']}）：{len(stats['shards'])} 个，各分片联系人数 {counts}")
+    for label, key in (("姓名索引", "name_index"), ("手机号索引", "phone_index"), ("拼音/模糊索引", "name_search"),
+                       ("手机号片段索引", "phone_grams"), ("备注关键词索引", "remark_grams"),
+                       ("变更流", "feed"), ("版本历史", "versions")):
+        if not stats.get(key):
+            continue
+        info = ", ".join(f"{k}={v}" for k, v in stats[key].items() if not isinstance(v, dict))
+        print(f"  {label}：{info}")
+        histogram = stats[key].get("bucket_size_histogram")
+        if histogram:
+            print(f"    前缀桶大小分布：{histogram}")
+    if stats.get("deferred_indexes"):
+        print(f"  尚未建立的索引（首次检索时建立）：{', '.join(stats['deferred_indexes'])}")
+    cache = stats.get("cache")
+    if cache:
+        print(f"  检索缓存：{cache['entries']}/{cache['capacity']} 条，命中 {cache['hits']}，"
+              f"未命中 {cache['misses']}，命中率 {cache['hit_ratio']:.2%}，失效 {cache['invalidations']}")
+    if not stats["metrics_enabled"]:
+        print("  操作耗时统计未开启（以 --stats 启动后可查看）")
+    else:
+        print(f"  {'操作':<18}{'次数':>8}{'平均us':>12}{'p50us':>10}{'p99us':>10}{'最大us':>12}")
+        for op, item in stats["operations"].items():
+            print(f"  {op:<18}{item['count']:>8}{item['mean_us']:>12.1f}{item['p50_us']:>10.0f}"
+                  f"{item['p99_us']:>10.0f}{item['max_us']:>12.1f}")
+    print("-" * 60)
+
+def build_address_book(args: argparse.Namespace) -> AddressBook:
+    """按启动参数创建持久化管理器与通讯录实例"""
+    if args.shards:
+        return ShardedAddressBook(args.shards, partition=args.partition, journal=args.journal,
+                                  index_engine=args.index, phone_index_engine=args.phone_index,
+                                  metrics=args.stats, cache_size=args.cache_size,
+                                  substring_index=args.substring_index)
+    if args.journal:
+        persistence = JournaledPersistenceManager(quiet=args.quiet)
+    elif args.binary:
+        persistence = BinaryPersistenceManager(quiet=args.quiet)
+    elif args.group_commit:
+        persistence = CoalescingPersistenceManager(flush_interval=args.flush_interval,
+                                                   flush_every=args.flush_every, quiet=args.quiet)
+    else:
+        persistence = PersistenceManager(quiet=args.quiet)
+    feed = ChangeFeed(args.feed_capacity, "address_book.feed", quiet=args.quiet) if args.feed else None
+    return AddressBook(persistence, index_engine=args.index, phone_index_engine=args.phone_index,
+                       metrics=args.stats, cache_size=args.cache_size,
+                       substring_index=args.substring_index, versioned=args.versioned,
+                       max_versions=args.max_versions, lazy_indexes=args.lazy,
+                       background_load=args.lazy, warm_indexes=args.warm_indexes, feed=feed)
+
+def run_batch_mode(args: argparse.Namespace) -> int:
+    """
+    批处理模式：标准输出只写每条命令的 JSON 结果，加载/保存提示与统计信息写到标准错误
+    :return: 进程退出码，有失败命令时为 1
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        book = build_address_book(args)
+    source = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    try:
+        stats = run_batch(book, source, sys.stdout)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    sys.stdout.flush()
+    # 修改统一在结束时保存一次
+    with contextlib.redirect_stdout(sys.stderr):
+        if stats["writes"]:
+            book.save()
+        book.close()
+    print(f"✅ 批处理完成：{stats['total']} 条命令（成功 {stats['ok']}，失败 {stats['failed']}），"
+          f"耗时 {stats['elapsed']:.3f} 秒，{stats['ops_per_sec']:.0f} 条/秒", file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
 def main() -> None:
     """
     程序主入口：初始化系统，处理命令行交互循环
     核心修改：ADD/DEL命令集成手机号合法输入逻辑，强制重新输入非法手机号
     """
     global address_book
+    args = parse_args()
+
+    # 批处理模式：不进入交互循环
+    if args.batch:
+        sys.exit(run_batch_mode(args))
 
     # 1. 初始化通讯录系统
+    started = time.perf_counter()
     print("🔧 初始化通讯录管理系统（散列表索引+手机号严格校验版）...")
-    address_book = AddressBook()
+    address_book = build_address_book(args)
+
+    # 服务模式：不进入交互循环，退出时持久化
+    if args.serve:
+        # asyncio 导入较慢，只在服务模式下才导入
+        from server import serve
+        serve(address_book, args.host, args.port)
+        address_book.save()
+        address_book.close()
+        return
 
     # 2. 打印欢迎信息和帮助文档
     print("\n🎉 欢迎使用通讯录管理系统！输入 HELP 查看命令说明")
     print_help()
+    print(f"📌 启动用时 {(time.perf_counter() - started) * 1000:.0f} ms"
+          f"{'（数据在后台加载，加载完成前的命令会等待）' if args.lazy else ''}")
 
     # 3. 命令行交互主循环
     while True:
@@ -201,43 +394,164 @@ def main() -> None:
                     print("❌ 参数错误：FIND_NAME 命令格式为 FIND_NAME <前缀>")
                     continue
                 prefix = cmd_parts[1]
-                # 调用后端检索函数（返回结果+耗时）
-                contacts, elapsed_time = address_book.find_by_name_prefix(prefix)
-                # 进入分页交互展示结果
-                pagination_interaction(contacts, "姓名", elapsed_time)
+                # 进入分页交互，按页调用后端检索函数
+                pagination_interaction(
+                    lambda offset, limit: address_book.find_by_name_prefix(prefix, limit, offset), "姓名"
+                )
 
-            # ========== 4. FIND_PHONE 命令：按手机号前缀检索 ==========
+            # ========== 4. FIND_EXACT 命令：按完整姓名精确检索 ==========
+            elif main_cmd == "FIND_EXACT":
+                if len(cmd_parts) < 2:
+                    print("❌ 参数错误：FIND_EXACT 命令格式为 FIND_EXACT <姓名>")
+                    continue
+                name = cmd_parts[1]
+                pagination_interaction(
+                    lambda offset, limit: address_book.find_by_name(name, limit, offset), "精确姓名"
+                )
+
+            # ========== 5. FIND_PHONE 命令：按手机号前缀检索 ==========
             elif main_cmd == "FIND_PHONE":
                 if len(cmd_parts) < 2:
                     print("❌ 参数错误：FIND_PHONE 命令格式为 FIND_PHONE <前缀>")
                     continue
                 prefix = cmd_parts[1]
-                # 调用后端检索函数（返回结果+耗时）
-                contacts, elapsed_time = address_book.find_by_phone_prefix(prefix)
-                # 进入分页交互展示结果
-                pagination_interaction(contacts, "电话", elapsed_time)
+                # 进入分页交互，按页调用后端检索函数
+                pagination_interaction(
+                    lambda offset, limit: address_book.find_by_phone_prefix(prefix, limit, offset), "电话"
+                )
 
-            # ========== 5. LIST 命令：全量列出所有联系人 ==========
+            # ========== 6. FIND_PINYIN 命令：按姓名拼音/首字母检索 ==========
+            elif main_cmd == "FIND_PINYIN":
+                if len(cmd_parts) < 2:
+                    print("❌ 参数错误：FIND_PINYIN 命令格式为 FIND_PINYIN <拼音>")
+                    continue
+                query = cmd_parts[1]
+                pagination_interaction(
+                    lambda offset, limit: address_book.find_by_pinyin(query, limit, offset), "拼音"
+                )
+
+            # ========== 7. FIND_FUZZY 命令：姓名模糊检索 ==========
+            elif main_cmd == "FIND_FUZZY":
+                if len(cmd_parts) < 2:
+                    print("❌ 参数错误：FIND_FUZZY 命令格式为 FIND_FUZZY <姓名> [最大编辑距离]")
+                    continue
+                query = cmd_parts[1]
+                max_distance = int(cmd_parts[2]) if len(cmd_parts) > 2 else 1
+                pagination_interaction(
+                    lambda offset, limit: address_book.find_by_name_fuzzy(query, max_distance, limit, offset),
+                    "模糊姓名"
+                )
+
+            # ========== 8. FIND_PHONE_SUB 命令：按手机号片段检索 ==========
+            elif main_cmd == "FIND_PHONE_SUB":
+                if len(cmd_parts) < 2:
+                    print("❌ 参数错误：FIND_PHONE_SUB 命令格式为 FIND_PHONE_SUB <片段>")
+                    continue
+                fragment = cmd_parts[1]
+                pagination_interaction(
+                    lambda offset, limit: address_book.find_by_phone_substring(fragment, limit, offset), "手机号片段"
+                )
+
+            # ========== 9. FIND_REMARK 命令：按备注关键词检索 ==========
+            elif main_cmd == "FIND_REMARK":
+                if len(cmd_parts) < 2:
+                    print("❌ 参数错误：FIND_REMARK 命令格式为 FIND_REMARK <关键词>")
+                    continue
+                keyword = cmd_parts[1]
+                pagination_interaction(
+                    lambda offset, limit: address_book.find_by_remark(keyword, limit, offset), "备注"
+                )
+
+            # ========== 10. LIST 命令：全量列出所有联系人 ==========
             elif main_cmd == "LIST":
-                contacts, elapsed_time = address_book.get_all_contacts()
-                # 进入分页交互展示结果
-                pagination_interaction(contacts, "全部", elapsed_time)
+                # 进入分页交互，按页遍历链表
+                pagination_interaction(
+                    lambda offset, limit: address_book.get_all_contacts(limit, offset), "全部"
+                )
 
-            # ========== 6. SAVE 命令：手动触发数据持久化 ==========
+            # ========== 11. SAVE 命令：手动触发数据持久化 ==========
             elif main_cmd == "SAVE":
-                success = address_book.persistence.save(address_book.get_all_contacts())
+                success = address_book.save()
                 if not success:
                     print("❌ 手动持久化失败，请检查文件写入权限")
 
-            # ========== 7. HELP 命令：打印帮助信息 ==========
+            # ========== 12. IMPORT 命令：批量导入外部文件 ==========
+            elif main_cmd == "IMPORT":
+                if len(cmd_parts) < 2:
+                    print("❌ 参数错误：IMPORT 命令格式为 IMPORT <文件路径>")
+                    continue
+                # 路径中可能含空格，取命令之后的完整内容
+                path = cmd_input.split(maxsplit=1)[1]
+                print(address_book.import_file(path, progress=print_progress))
+
+            # ========== 13. EXPORT 命令：流式导出到外部文件 ==========
+            elif main_cmd == "EXPORT":
+                if len(cmd_parts) < 2:
+                    print("❌ 参数错误：EXPORT 命令格式为 EXPORT <文件路径>")
+                    continue
+                path = cmd_input.split(maxsplit=1)[1]
+                start = time.perf_counter()
+                count = address_book.export_file(path, progress=print_progress)
+                print(f"✅ 导出成功：{count} 条联系人写入 {path}，耗时 {time.perf_counter() - start:.2f} 秒")
+
+            # ========== 14. SNAPSHOT 命令：为当前状态打快照 ==========
+            elif main_cmd == "SNAPSHOT":
+                label = cmd_input.split(maxsplit=1)[1] if len(cmd_parts) > 1 else ""
+                print(f"✅ 快照成功：版本 {address_book.snapshot(label)}")
+
+            # ========== 15. VERSIONS 命令：列出历史版本 ==========
+            elif main_cmd == "VERSIONS":
+                versions = address_book.list_versions()
+                if not versions:
+                    print("📌 暂无历史版本")
+                else:
+                    print("📌 每个版本保存的是对应操作执行前的状态（快照为打快照时的状态）")
+                for item in versions:
+                    created = time.strftime("%H:%M:%S", time.localtime(item["created"]))
+                    print(f"  版本 {item['version']:>4} | {created} | {item['contacts']:>8} 条联系人 | {item['label']}")
+
+            # ========== 16. UNDO 命令：撤销上一次修改 ==========
+            elif main_cmd == "UNDO":
+                print(address_book.undo())
+
+            # ========== 17. ROLLBACK 命令：回滚到指定版本 ==========
+            elif main_cmd == "ROLLBACK":
+                if len(cmd_parts) < 2 or not cmd_parts[1].isdigit():
+                    print("❌ 参数错误：ROLLBACK 命令格式为 ROLLBACK <版本号>")
+                    continue
+                print(address_book.rollback(int(cmd_parts[1])))
+
+            # ========== 18. CHANGES 命令：查看变更流 ==========
+            elif main_cmd == "CHANGES":
+                if len(cmd_parts) > 1 and not cmd_parts[1].isdigit():
+                    print("❌ 参数错误：CHANGES 命令格式为 CHANGES [起始序号]")
+                    continue
+                last_seq = address_book.feed.last_seq if address_book.feed is not None else 0
+                since = int(cmd_parts[1]) if len(cmd_parts) > 1 else max(last_seq - 10, 0)
+                events = address_book.changes_since(since, 10)
+                if not events:
+                    print(f"📌 序号 {since} 之后暂无变更（最新序号 {last_seq}）")
+                for event in events:
+                    created = time.strftime("%H:%M:%S", time.localtime(event.time))
+                    action = "添加" if event.op == OP_ADD else "删除"
+                    print(f"  {event.seq:>8} | {created} | {action} | {event.name} | {event.phone} | 备注：{event.remark}")
+                if events and events[-1].seq < last_seq:
+                    print(f"📌 仅显示 10 条，继续查看：CHANGES {events[-1].seq}（最新序号 {last_seq}）")
+
+            # ========== 19. STATS 命令：查看运行统计 ==========
+            elif main_cmd == "STATS":
+                print_stats(address_book.stats())
+
+            # ========== 20. HELP 命令：打印帮助信息 ==========
             elif main_cmd == "HELP":
                 print_help()
 
-            # ========== 8. EXIT 命令：退出系统（自动持久化） ==========
+            # ========== 21. EXIT 命令：退出系统（自动持久化） ==========
             elif main_cmd == "EXIT":
                 print("👋 正在退出系统，自动持久化数据...")
                 # 退出前触发最后一次持久化，保证数据不丢失
-                address_book.persistence.save(address_book.get_all_contacts())
+                address_book.save()
+                address_book.close()
                 print("✅ 数据已成功持久化，系统安全退出！")
                 break
 
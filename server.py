@@ -0,0 +1,84 @@
+"""
+server.py - 通讯录 asyncio 网络服务
+协议：TCP 上的 JSON Lines，每行一个请求、每行一个响应，按请求顺序返回；
+      客户端可连续发送多条请求而不必等待响应（流水线）。
+      请求可带 id 字段，响应原样带回，便于客户端对账
+示例：{"id": 1, "cmd": "FIND_PHONE", "prefix": "138", "limit": 10}
+      {"id": 2, "cmd": "BATCH_FIND_PHONE", "prefixes": ["138", "139"], "limit": 5}
+"""
+import asyncio
+import json
+
+from commands import DEFAULT_HOST, DEFAULT_PORT, execute
+
+
+class AddressBookServer:
+    """把一个 AddressBook 实例以 JSON Lines 协议暴露在本地套接字上"""
+    def __init__(self, address_book, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.address_book = address_book
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # 端口为 0 时由系统分配，回填实际端口
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """逐行读取请求并按顺序响应（流水线请求依次处理，写缓冲未满时 drain 立即返回）"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._dispatch(loop, line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, loop, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("请求必须是 JSON 对象")
+        except ValueError as e:
+            return {"ok": False, "error": f"请求格式错误：{e}"}
+
+        # 所有命令都放到线程池：读操作也可能等待读写锁（保存期间写锁持有较久）或扫描大量数据，
+        # 在事件循环上执行会阻塞全部连接
+        response = await loop.run_in_executor(None, execute, self.address_book, request)
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+
+def serve(address_book, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    """阻塞运行服务，Ctrl+C 退出"""
+    server = AddressBookServer(address_book, host, port)
+
+    async def run():
+        await server.start()
+        print(f"🌐 通讯录服务已启动：{server.host}:{server.port}（JSON Lines 协议，Ctrl+C 退出）")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n👋 服务已停止")
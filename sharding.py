@@ -0,0 +1,357 @@
+"""
+sharding.py - 多进程分片通讯录
+功能：按手机号把联系人分到多个工作进程，每个进程持有独立的 AddressBook 与持久化文件
+      （address_book.shard<i>.dat），协调者负责路由单点修改、并行分发检索并归并结果
+分片方式：hash（crc32 取模，负载均衡）或 range（按号段，手机号前缀检索只访问相关分片）
+注意：分片数与分片方式决定了联系人所在的文件，修改后需重新导入数据
+"""
+import contextlib
+import io
+import os
+import threading
+import zlib
+from heapq import merge
+from itertools import islice
+
+from address_book import AddressBook, SearchPage
+from contact import Contact
+from index import edit_distance
+from storage import PersistenceManager, JournaledPersistenceManager, read_records, with_progress, write_records
+from utils import merge_snapshots, sanitize_many
+from utils.validation import summarize_rejections
+
+PARTITIONS = ("hash", "range")
+
+# range 分片按手机号前三位（130~199）均分
+_RANGE_LOW, _RANGE_HIGH = 130, 200
+
+# ---------------- 工作进程侧 ----------------
+# 每个分片是只有一个进程的 ProcessPoolExecutor，进程内的 AddressBook 常驻
+_book = None
+
+
+def _init_worker(filepath: str, journal: bool, options: dict):
+    """工作进程初始化：加载本分片的持久化文件"""
+    global _book
+    manager_cls = JournaledPersistenceManager if journal else PersistenceManager
+    with contextlib.redirect_stdout(io.StringIO()):
+        _book = AddressBook(manager_cls(filepath, filepath + ".tmp", quiet=True), **options)
+
+
+def _rows(contacts) -> list:
+    """联系人对象带有链表指针，不能直接跨进程传递，转换为 (seq, 姓名, 电话, 备注) 元组"""
+    return [(c.seq, c.name, c.phone, c.remark) for c in contacts]
+
+
+def _state() -> tuple:
+    return len(_book.phone_map), _book._next_seq
+
+
+def _write(method: str, args: tuple, seq: int):
+    """
+    执行修改：先把分片的序号推进到协调者分配的全局序号，
+    使各分片的 seq 全局可比，检索结果可按添加顺序跨分片归并
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        _book._next_seq = max(_book._next_seq, seq)
+        result = getattr(_book, method)(*args)
+    return result, _book._next_seq
+
+
+def _read(method: str, args: tuple):
+    """执行检索，返回 (行列表, 匹配总数)"""
+    result = getattr(_book, method)(*args)
+    if isinstance(result, SearchPage):
+        return _rows(result.items), result.total
+    return _rows(result), len(result)
+
+
+def _read_many(prefixes: list, limit: int) -> list:
+    return [_rows(contacts) for contacts in _book.find_by_phone_prefixes(prefixes, limit)]
+
+
+def _get_many(phones: list) -> list:
+    return [(c.seq, c.name, c.phone, c.remark) if c is not None else None for c in _book.get_many(phones)]
+
+
+def _call(method: str, args: tuple = ()):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return getattr(_book, method)(*args)
+
+
+# ---------------- 协调者侧 ----------------
+def _by_seq(row: tuple):
+    return row[0]
+
+
+def _by_name(row: tuple):
+    return row[1], row[0]
+
+
+def _by_phone(row: tuple):
+    return row[2], row[0]
+
+
+def _merge_cache_stats(caches: list):
+    """各分片检索缓存统计相加，命中率按总数重新计算；未开启缓存时为 None"""
+    if not caches:
+        return None
+    merged = {key: sum(c[key] for c in caches)
+              for key in ("capacity", "entries", "hits", "misses", "invalidations")}
+    lookups = merged["hits"] + merged["misses"]
+    merged["hit_ratio"] = round(merged["hits"] / lookups, 4) if lookups else 0.0
+    return merged
+
+
+def _contact(row: tuple) -> Contact:
+    seq, name, phone, remark = row
+    contact = Contact(name, phone, remark)
+    contact.seq = seq
+    return contact
+
+
+class ShardedAddressBook:
+    """分片通讯录协调者：接口与 AddressBook 的常用方法一致，检索结果按添加顺序归并"""
+    def __init__(self, shards: int = 4, data_dir: str = ".", partition: str = "hash",
+                 journal: bool = False, **options):
+        """
+        :param shards: 分片（工作进程）数
+        :param data_dir: 分片持久化文件所在目录
+        :param partition: 分片方式，"hash" 或 "range"
+        :param journal: 分片是否使用日志式持久化（JournaledPersistenceManager）
+        :param options: 透传给每个分片 AddressBook 的参数（index_engine、substring_index 等）
+        """
+        if partition not in PARTITIONS:
+            raise ValueError(f"未知的分片方式：{partition}，可选 {', '.join(PARTITIONS)}")
+        if shards < 1:
+            raise ValueError("分片数至少为 1")
+        self.partition = partition
+        self._metrics = bool(options.get("metrics"))
+        # sorted / numpy 引擎的前缀检索按 (关键词, seq) 排序，hash 引擎按 seq 排序
+        index_engine = options.get("index_engine", "hash")
+        self._name_order = index_engine == "sorted"
+        self._phone_order = (options.get("phone_index_engine") or index_engine) in ("sorted", "numpy")
+        # multiprocessing 导入较慢，只在真正创建分片时导入，main.py 非分片模式启动不受影响
+        from concurrent.futures import ProcessPoolExecutor
+        self.executors = [
+            ProcessPoolExecutor(
+                max_workers=1, initializer=_init_worker,
+                initargs=(os.path.join(data_dir, f"address_book.shard{i}.dat"), journal, options),
+            )
+            for i in range(shards)
+        ]
+        # 全局序号：分配给每次修改，保证跨分片结果顺序与添加顺序一致
+        self._seq_lock = threading.Lock()
+        states = self._fan_out(_state)
+        self._next_seq = max(seq for _, seq in states)
+
+    # ---------- 路由 ----------
+    def shard_for(self, phone: str) -> int:
+        """手机号所在分片"""
+        shards = len(self.executors)
+        if self.partition == "range" and phone[:3].isdigit():
+            position = min(max(int(phone[:3]), _RANGE_LOW), _RANGE_HIGH - 1) - _RANGE_LOW
+            return position * shards // (_RANGE_HIGH - _RANGE_LOW)
+        return zlib.crc32(phone.encode("utf-8")) % shards
+
+    def _shards_for_phone_prefix(self, prefix: str) -> list:
+        """手机号前缀可能落在的分片：range 分片下只有相关号段，hash 分片下为全部"""
+        if self.partition != "range" or not prefix.isdigit():
+            return list(range(len(self.executors)))
+        if len(prefix) >= 3:
+            return [self.shard_for(prefix)]
+        width = 3 - len(prefix)
+        return sorted({self.shard_for(f"{prefix}{suffix:0{width}d}") for suffix in range(10 ** width)})
+
+    def _fan_out(self, fn, *args, shards=None) -> list:
+        """在指定分片（默认全部）上并行执行 fn，按分片顺序返回结果"""
+        shards = range(len(self.executors)) if shards is None else shards
+        futures = [self.executors[i].submit(fn, *args) for i in shards]
+        return [future.result() for future in futures]
+
+    def _allocate_seq(self, count: int = 1) -> int:
+        """预留 count 个全局序号，返回预留前的序号"""
+        with self._seq_lock:
+            base = self._next_seq
+            self._next_seq += count
+            return base
+
+    # ---------- 修改 ----------
+    def add_contact(self, name: str, phone: str, remark: str = "", persist: bool = True) -> str:
+        """添加联系人：路由到手机号所在分片"""
+        seq = self._allocate_seq()
+        message, _ = self.executors[self.shard_for(phone)].submit(
+            _write, "add_contact", (name, phone, remark, persist), seq).result()
+        return message
+
+    def delete_contact(self, phone: str, persist: bool = True) -> str:
+        """根据手机号删除联系人"""
+        return self.executors[self.shard_for(phone)].submit(_call, "delete_contact", (phone, persist)).result()
+
+    def bulk_load(self, records, persist: bool = False) -> int:
+        """
+        批量添加：按分片拆分后各分片并行建索引
+        同一批次内跨分片的先后顺序按分片交错，不再严格等于记录顺序
+        """
+        parts = [[] for _ in self.executors]
+        for data in records:
+            parts[self.shard_for(data["phone"])].append(
+                {"name": data["name"], "phone": data["phone"], "remark": data.get("remark", "")})
+        base = self._allocate_seq(max(len(part) for part in parts))
+        futures = [executor.submit(_write, "bulk_load", (part, persist), base)
+                   for executor, part in zip(self.executors, parts) if part]
+        results = [future.result() for future in futures]
+        return sum(count for count, _ in results)
+
+    def import_file(self, path: str, progress=None) -> str:
+        """从外部文件批量导入联系人并持久化"""
+        rejections = []
+        count = self.bulk_load(sanitize_many(with_progress(read_records(path), progress), rejections), persist=True)
+        message = f"✅ 导入成功：从 {path} 写入 {count} 条联系人（{len(self.executors)} 个分片）"
+        if rejections:
+            message += f"\n📌 {summarize_rejections(rejections)}"
+        return message
+
+    def export_file(self, path: str, fmt: str = None, name_prefix: str = None,
+                    phone_prefix: str = None, progress=None) -> int:
+        """
+        流式导出：各分片并行导出到临时的 .jsonl 分片文件，再依次流式拼接为目标文件
+        结果按分片顺序排列（分片内为添加顺序），协调者内存占用与联系人数无关
+        """
+        parts = [f"{path}.part{i}.jsonl" for i in range(len(self.executors))]
+        try:
+            futures = [executor.submit(_call, "export_file", (part, "jsonl", name_prefix, phone_prefix))
+                       for executor, part in zip(self.executors, parts)]
+            for future in futures:
+                future.result()
+            rows = ((d["name"], d["phone"], d["remark"]) for part in parts for d in read_records(part))
+            return write_records(path, with_progress(rows, progress), fmt)
+        finally:
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
+
+    def save(self) -> bool:
+        """所有分片各自全量保存"""
+        return all(self._fan_out(_call, "save"))
+
+    def close(self) -> None:
+        """关闭各分片的持久化管理器并结束工作进程"""
+        self._fan_out(_call, "close")
+        for executor in self.executors:
+            executor.shutdown()
+
+    # ---------- 检索 ----------
+    def _gather(self, method: str, args: tuple, limit: int, offset: int, shards=None, key=None):
+        """
+        分发检索并归并：每个分片最多取 offset + limit 条，按全局顺序归并后再切片
+        :param key: 归并排序键，需与分片内的结果顺序一致，默认按 seq（添加顺序）
+        """
+        offset = max(offset, 0)
+        fetch = offset + limit if limit is not None else None
+        results = self._fan_out(_read, method, args + (fetch, 0), shards=shards)
+        merged = merge(*(rows for rows, _ in results), key=key or _by_seq)
+        items = [_contact(row) for row in islice(merged, offset, fetch)]
+        if limit is None:
+            return items
+        return SearchPage(items, sum(total for _, total in results), offset, limit)
+
+    def find_by_name_prefix(self, prefix: str, limit: int = None, offset: int = 0):
+        """按姓名前缀检索：姓名与分片无关，需要访问全部分片"""
+        return self._gather("find_by_name_prefix", (prefix,), limit, offset,
+                            key=_by_name if self._name_order else None)
+
+    def find_by_name(self, name: str, limit: int = None, offset: int = 0):
+        """精确姓名检索：同名联系人可能在任意分片，按添加顺序归并"""
+        return self._gather("find_by_name", (name,), limit, offset)
+
+    def get_many(self, phones) -> list:
+        """批量按完整手机号查找：按分片分组，每个分片一次调用"""
+        phones = list(phones)
+        groups = {}
+        for i, phone in enumerate(phones):
+            groups.setdefault(self.shard_for(phone), []).append(i)
+        futures = {shard: self.executors[shard].submit(_get_many, [phones[i] for i in positions])
+                   for shard, positions in groups.items()}
+        results = [None] * len(phones)
+        for shard, positions in groups.items():
+            for i, row in zip(positions, futures[shard].result()):
+                results[i] = _contact(row) if row is not None else None
+        return results
+
+    def find_by_phone_prefix(self, prefix: str, limit: int = None, offset: int = 0):
+        """按电话前缀检索：range 分片下只访问相关号段的分片"""
+        return self._gather("find_by_phone_prefix", (prefix,), limit, offset,
+                            shards=self._shards_for_phone_prefix(prefix),
+                            key=_by_phone if self._phone_order else None)
+
+    def find_by_phone_prefixes(self, prefixes: list, limit: int = None) -> list:
+        """批量按电话前缀检索：每个分片一次调用，再逐个前缀归并"""
+        results = self._fan_out(_read_many, prefixes, limit)
+        key = _by_phone if self._phone_order else _by_seq
+        return [
+            [_contact(row) for row in islice(merge(*(shard[i] for shard in results), key=key), limit)]
+            for i in range(len(prefixes))
+        ]
+
+    def find_by_pinyin(self, query: str, limit: int = None, offset: int = 0):
+        """按姓名全拼或首字母前缀检索"""
+        return self._gather("find_by_pinyin", (query,), limit, offset)
+
+    def find_by_name_fuzzy(self, name: str, max_distance: int = 1, limit: int = None, offset: int = 0):
+        """姓名模糊检索：分片内按 (编辑距离, seq) 有序，归并时重新计算距离"""
+        return self._gather("find_by_name_fuzzy", (name, max_distance), limit, offset,
+                            key=lambda row: (edit_distance(name, row[1], max_distance), row[0]))
+
+    def find_by_phone_substring(self, fragment: str, limit: int = None, offset: int = 0):
+        """按手机号任意位置的片段检索"""
+        return self._gather("find_by_phone_substring", (fragment,), limit, offset)
+
+    def find_by_remark(self, keyword: str, limit: int = None, offset: int = 0):
+        """按备注关键词检索"""
+        return self._gather("find_by_remark", (keyword,), limit, offset)
+
+    def get_all_contacts(self, limit: int = None, offset: int = 0):
+        """遍历所有联系人（按添加顺序归并）"""
+        return self._gather("get_all_contacts", (), limit, offset)
+
+    def stats(self) -> dict:
+        """汇总统计：总联系人数、合并后的操作耗时与检索缓存，以及各分片的 AddressBook.stats()"""
+        shard_stats = self._fan_out(_call, "stats")
+        return {
+            "contacts": sum(s["contacts"] for s in shard_stats),
+            "metrics_enabled": self._metrics,
+            # 分片进程内执行的耗时，不含进程间通信与归并
+            "operations": merge_snapshots(s["operations"] for s in shard_stats),
+            "cache": _merge_cache_stats([s["cache"] for s in shard_stats if s["cache"] is not None]),
+            "partition": self.partition,
+            "shards": shard_stats,
+        }
+
+    # ---------- 变更流（分片模式不支持） ----------
+    # 与 AddressBook 一致的属性：分片模式没有变更流
+    feed = None
+
+    def changes_since(self, seq: int, limit: int = None) -> list:
+        # 各分片的修改没有统一的变更序号
+        raise ValueError("分片模式不支持变更流（CHANGES）")
+
+    # ---------- 版本化（分片模式不支持） ----------
+    def _require_versioned(self):
+        # 历史版本保存在各分片进程内，跨分片无法得到一致的快照
+        raise ValueError("分片模式不支持版本化命令（SNAPSHOT / VERSIONS / UNDO / ROLLBACK）")
+
+    def snapshot(self, label: str = "") -> int:
+        self._require_versioned()
+
+    def list_versions(self) -> list:
+        self._require_versioned()
+
+    def undo(self, persist: bool = True) -> str:
+        self._require_versioned()
+
+    def rollback(self, version: int, persist: bool = True) -> str:
+        self._require_versioned()
+
+    def __len__(self) -> int:
+        return sum(count for count, _ in self._fan_out(_state))
@@ -1,4 +1,13 @@
-"""持久化模块：暴露持久化管理类"""
-from .persistence import PersistenceManager
+"""持久化模块：暴露持久化管理类、变更流与外部文件流式读写函数"""
+from .persistence import PersistenceManager, JournaledPersistenceManager
+from .binary import BinaryPersistenceManager, BinarySnapshot
+from .group_commit import CoalescingPersistenceManager
+from .changefeed import ChangeEvent, ChangeFeed, OP_ADD, OP_DELETE
+from .formats import FORMATS, iter_dat, iter_csv, iter_jsonl, iter_vcard, read_records, write_records, with_progress
 
-__all__ = ["PersistenceManager"]
\ No newline at end of file
+__all__ = [
+    "PersistenceManager", "JournaledPersistenceManager", "BinaryPersistenceManager", "BinarySnapshot",
+    "CoalescingPersistenceManager", "ChangeEvent", "ChangeFeed", "OP_ADD", "OP_DELETE",
+    "FORMATS", "iter_dat", "iter_csv", "iter_jsonl", "iter_vcard", "read_records", "write_records",
+    "with_progress",
+]
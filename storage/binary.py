@@ -0,0 +1,216 @@
+"""
+storage/binary.py - 二进制快照格式
+功能：定长手机号列 + 长度前缀的 UTF-8 字符串池 + 可选的手机号有序索引区，
+      以 mmap 方式打开并按需解码，避免文本逐行解析与中间字典列表
+
+文件布局（小端）：
+    头部    magic(4s) version(H) flags(H) count(I) pool_size(Q)
+    记录区  count × [phone(11s) name_off(I) name_len(H) remark_off(I) remark_len(H)]
+    字符串池 pool_size 字节 UTF-8
+    索引区  (flags & FLAG_PHONE_INDEX) count × I，按手机号升序排列的记录下标
+"""
+import mmap
+import os
+import struct
+
+from .formats import iter_dat
+from .persistence import PersistenceManager, fsync_dir, fsync_file
+
+MAGIC = b"ABK1"
+VERSION = 1
+FLAG_PHONE_INDEX = 0x1
+
+_HEADER = struct.Struct("<4sHHIQ")
+_RECORD = struct.Struct("<11sIHIH")
+_INDEX_ITEM = struct.Struct("<I")
+PHONE_WIDTH = 11
+
+
+def write_snapshot(path: str, records, with_index: bool = True) -> int:
+    """
+    把联系人写成二进制快照
+    :param records: 可迭代对象，元素为 (姓名, 电话, 备注)
+    :param with_index: 是否附带手机号有序索引区
+    :return: 写入的记录数
+    """
+    rows = []
+    pool = bytearray()
+    # 字符串池去重：姓名、备注重复率很高，相同字符串只存一份
+    offsets = {}
+
+    def intern(text: str) -> tuple:
+        found = offsets.get(text)
+        if found is None:
+            data = text.encode("utf-8")
+            found = offsets[text] = (len(pool), len(data))
+            pool.extend(data)
+        return found
+
+    for name, phone, remark in records:
+        phone_bytes = phone.encode("ascii")
+        if len(phone_bytes) > PHONE_WIDTH:
+            raise ValueError(f"手机号超出定长列宽 {PHONE_WIDTH}：{phone}")
+        rows.append((phone_bytes, *intern(name), *intern(remark)))
+
+    flags = FLAG_PHONE_INDEX if with_index else 0
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, flags, len(rows), len(pool)))
+        f.write(b"".join(_RECORD.pack(*row) for row in rows))
+        f.write(pool)
+        if with_index:
+            order = sorted(range(len(rows)), key=lambda i: rows[i][0])
+            f.write(struct.pack(f"<{len(order)}I", *order))
+    return len(rows)
+
+
+class BinarySnapshot:
+    """
+    mmap 打开的二进制快照：只读、按需解码
+    支持 len()、下标访问与迭代（元素格式同 PersistenceManager.load），以及按手机号二分查找
+    """
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._file.close()
+            raise ValueError(f"不是有效的二进制快照：{path}")
+        magic, version, self.flags, self.count, pool_size = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"不是有效的二进制快照：{path}")
+        self._records_off = _HEADER.size
+        self._pool_off = self._records_off + self.count * _RECORD.size
+        self._index_off = self._pool_off + pool_size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _decode(self, i: int) -> tuple:
+        phone, name_off, name_len, remark_off, remark_len = _RECORD.unpack_from(
+            self._mm, self._records_off + i * _RECORD.size
+        )
+        base = self._pool_off
+        name = self._mm[base + name_off:base + name_off + name_len].decode("utf-8")
+        remark = self._mm[base + remark_off:base + remark_off + remark_len].decode("utf-8")
+        return name, phone.rstrip(b"\x00").decode("ascii"), remark
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        name, phone, remark = self._decode(i)
+        return {"name": name, "phone": phone, "remark": remark}
+
+    def __iter__(self):
+        for name, phone, remark in self.iter_tuples():
+            yield {"name": name, "phone": phone, "remark": remark}
+
+    def iter_tuples(self):
+        """
+        按记录顺序逐条解码为 (姓名, 电话, 备注)
+        记录区用 struct.iter_unpack 顺序解包；池中字符串按偏移缓存，重复的姓名/备注只解码一次
+        """
+        pool = self._mm[self._pool_off:self._index_off]
+        cache = {}
+        with memoryview(self._mm) as view:
+            records = view[self._records_off:self._pool_off]
+            try:
+                for phone, name_off, name_len, remark_off, remark_len in _RECORD.iter_unpack(records):
+                    name = cache.get(name_off)
+                    if name is None:
+                        name = cache[name_off] = pool[name_off:name_off + name_len].decode("utf-8")
+                    remark = cache.get(remark_off)
+                    if remark is None:
+                        remark = cache[remark_off] = pool[remark_off:remark_off + remark_len].decode("utf-8")
+                    yield name, phone.rstrip(b"\x00").decode("ascii"), remark
+            finally:
+                records.release()
+
+    def _phone_at(self, i: int) -> bytes:
+        return self._mm[self._records_off + i * _RECORD.size:self._records_off + i * _RECORD.size + PHONE_WIDTH]
+
+    def find_phone(self, phone: str):
+        """利用索引区按手机号二分查找，未找到或无索引区时返回 None"""
+        if not self.flags & FLAG_PHONE_INDEX:
+            return None
+        target = phone.encode("ascii").ljust(PHONE_WIDTH, b"\x00")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (rec,) = _INDEX_ITEM.unpack_from(self._mm, self._index_off + mid * _INDEX_ITEM.size)
+            if self._phone_at(rec) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            (rec,) = _INDEX_ITEM.unpack_from(self._mm, self._index_off + lo * _INDEX_ITEM.size)
+            if self._phone_at(rec) == target:
+                return self[rec]
+        return None
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryPersistenceManager(PersistenceManager):
+    """
+    二进制快照持久化管理器
+    load() 返回 mmap 打开的 BinarySnapshot（惰性解码）；save() 写临时文件后 os.replace 替换，
+    不覆盖原文件内容，已映射的旧快照仍然可读
+    """
+    def __init__(self, filepath="address_book.bin", tmp_filepath="address_book.bin.tmp", with_index=True,
+                 quiet=False):
+        super().__init__(filepath, tmp_filepath, quiet)
+        self.with_index = with_index
+
+    def load(self):
+        if not os.path.exists(self.filepath):
+            return []
+        try:
+            snapshot = BinarySnapshot(self.filepath)
+            print(f"✅ 从 {self.filepath} 映射 {len(snapshot)} 条联系人数据（二进制快照）")
+            return snapshot
+        except Exception as e:
+            print(f"❌ 加载数据失败：{e}")
+            return []
+
+    def _write_snapshot(self, contacts: list) -> None:
+        write_snapshot(self.tmp_filepath, ((c.name, c.phone, c.remark) for c in contacts), self.with_index)
+        fsync_file(self.tmp_filepath)
+        os.replace(self.tmp_filepath, self.filepath)
+        fsync_dir(self.filepath)
+
+    def save(self, contacts: list) -> bool:
+        try:
+            self._write_snapshot(contacts)
+            self._info(f"✅ 持久化成功：写入 {len(contacts)} 条记录到 {os.path.abspath(self.filepath)}（二进制快照）")
+            return True
+        except Exception as e:
+            print(f"❌ 持久化失败：{e}")
+            return False
+
+
+def dat_to_binary(src: str, dst: str, with_index: bool = True) -> int:
+    """把 姓名|电话|备注 文本文件转换为二进制快照"""
+    return write_snapshot(dst, ((d["name"], d["phone"], d["remark"]) for d in iter_dat(src)), with_index)
+
+
+def binary_to_dat(src: str, dst: str) -> int:
+    """把二进制快照转换回 姓名|电话|备注 文本文件"""
+    with BinarySnapshot(src) as snapshot, open(dst, "w", encoding="utf-8") as f:
+        for name, phone, remark in snapshot.iter_tuples():
+            f.write(f"{name}|{phone}|{remark}\n")
+        return len(snapshot)
+
@@ -0,0 +1,259 @@
+"""
+storage/changefeed.py - 变更流（change feed）
+功能：按全局递增序号记录每一次新增/删除（覆盖添加先记删除再记新增），供下游增量同步，不必整文件重读
+      - 内存中保留最近 capacity 条（环形缓冲），since(序号) 直接按下标切取
+      - subscribe 注册回调，每条变更在修改线程内同步推送
+      - 可选追加到变更日志文件：重启后恢复序号与缓冲，消费者记下已处理的最大序号即可续读；
+        早于内存缓冲的变更从日志文件补读，日志按条数轮换为 *.1，超出保留范围时需全量同步
+日志格式（每行一条）：序号|A 或 D|时间戳|姓名|电话|备注
+"""
+import os
+import threading
+import time
+
+OP_ADD = "add"
+OP_DELETE = "delete"
+
+_CODES = {OP_ADD: "A", OP_DELETE: "D"}
+_OPS = {"A": OP_ADD, "D": OP_DELETE}
+
+
+class ChangeEvent:
+    """一条变更；删除事件携带被删除联系人的数据"""
+    __slots__ = ("seq", "op", "name", "phone", "remark", "time")
+
+    def __init__(self, seq: int, op: str, name: str, phone: str, remark: str, created: float):
+        self.seq = seq
+        self.op = op
+        self.name = name
+        self.phone = phone
+        self.remark = remark
+        self.time = created
+
+    def to_dict(self) -> dict:
+        return {"seq": self.seq, "op": self.op, "name": self.name, "phone": self.phone,
+                "remark": self.remark, "time": self.time}
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.seq}, {self.op}, {self.name} | {self.phone} | {self.remark})"
+
+
+def _parse(line: str) -> ChangeEvent:
+    seq, code, created, name, phone, remark = line.rstrip("\n").split("|", 5)
+    return ChangeEvent(int(seq), _OPS[code], name, phone, remark, float(created))
+
+
+class ChangeFeed:
+    """
+    有界变更流：序号从 1 开始连续递增，emit 由 AddressBook 在持有写锁时调用
+    since / subscribe 可在任意线程调用
+    """
+    def __init__(self, capacity: int = 100000, filepath: str = None, sync_every: int = 64,
+                 rotate_every: int = 1000000, quiet: bool = False):
+        """
+        :param capacity: 内存中保留的最近变更条数
+        :param filepath: 变更日志文件，None 表示只保存在内存（重启后序号从 1 重新开始）
+        :param sync_every: 每累计多少条变更 flush + fsync 一次日志（崩溃时最多丢失末尾不足该数的变更）；
+                           AddressBook 持久化每次修改前会先 flush()，批量等不立即持久化的修改才按此批量落盘
+        :param rotate_every: 当前日志达到多少条时归档为 *.1（覆盖上一份归档），磁盘上最多保留约两倍该数
+        :param quiet: 安静模式：不输出恢复提示
+        """
+        if capacity < 1:
+            raise ValueError("变更流容量至少为 1")
+        self.capacity = capacity
+        # 序号 s 的变更存放在 _ring[s % capacity]，缓冲中为 [_first_seq, _last_seq] 连续区间
+        self._ring = [None] * capacity
+        self._first_seq = 1
+        self._last_seq = 0
+        self._lock = threading.Lock()
+        # 订阅者列表整体替换（写时复制），推送时无需加锁
+        self._subscribers = ()
+        self.callback_errors = 0
+
+        self.filepath = filepath
+        self.archived_filepath = f"{filepath}.1" if filepath else None
+        self.sync_every = sync_every
+        self.rotate_every = rotate_every
+        self.quiet = quiet
+        self._file = None
+        self._unsynced = 0
+        self._file_events = 0
+        if filepath is not None:
+            self._recover()
+
+    # ---------- 恢复 ----------
+    def _recover(self) -> None:
+        """从归档与当前日志恢复序号与内存缓冲；丢弃崩溃留下的不完整尾行"""
+        if os.path.exists(self.filepath):
+            with open(self.filepath, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        recovered = 0
+        for path in (self.archived_filepath, self.filepath):
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    event = _parse(line)
+                    self._ring[event.seq % self.capacity] = event
+                    self._last_seq = event.seq
+                    recovered += 1
+                    if path == self.filepath:
+                        self._file_events += 1
+        if recovered:
+            self._first_seq = max(self._last_seq - min(recovered, self.capacity) + 1, 1)
+            if not self.quiet:
+                print(f"✅ 变更流：从 {self.filepath} 恢复到序号 {self._last_seq}")
+        else:
+            self._first_seq = 1
+
+    # ---------- 写入 ----------
+    def emit(self, op: str, contact) -> ChangeEvent:
+        """
+        记录一条变更并推送给订阅者
+        :param op: OP_ADD 或 OP_DELETE
+        :param contact: 变更涉及的联系人
+        """
+        with self._lock:
+            seq = self._last_seq + 1
+            event = ChangeEvent(seq, op, contact.name, contact.phone, contact.remark, time.time())
+            self._ring[seq % self.capacity] = event
+            self._last_seq = seq
+            if seq - self._first_seq >= self.capacity:
+                self._first_seq = seq - self.capacity + 1
+            if self.filepath is not None:
+                self._append(event)
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                # 订阅者的异常不影响修改本身
+                self.callback_errors += 1
+                print(f"❌ 变更订阅回调失败：{e}")
+        return event
+
+    def _append(self, event: ChangeEvent) -> None:
+        """追加一行日志（调用方需持有 self._lock）；写入失败只提示，内存中的变更流不受影响"""
+        try:
+            if self._file is None:
+                self._file = open(self.filepath, "a", encoding="utf-8")
+            self._file.write(f"{event.seq}|{_CODES[event.op]}|{event.time:.6f}|"
+                             f"{event.name}|{event.phone}|{event.remark}\n")
+            self._unsynced += 1
+            self._file_events += 1
+            if self._unsynced >= self.sync_every:
+                self._sync_locked()
+            if self._file_events >= self.rotate_every:
+                self._rotate_locked()
+        except Exception as e:
+            print(f"❌ 变更日志写入失败：{e}")
+
+    def _sync_locked(self) -> None:
+        """flush + fsync 当前日志（调用方需持有 self._lock）"""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def _rotate_locked(self) -> None:
+        """当前日志归档为 *.1，后续变更写入新日志（调用方需持有 self._lock）"""
+        self._sync_locked()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(self.filepath, self.archived_filepath)
+        self._file_events = 0
+
+    def flush(self) -> None:
+        """立即把未落盘的变更 fsync 到磁盘"""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        """落盘并关闭日志文件"""
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ---------- 读取 ----------
+    @property
+    def last_seq(self) -> int:
+        """最近一条变更的序号，尚无变更时为 0"""
+        return self._last_seq
+
+    @property
+    def oldest_seq(self) -> int:
+        """内存缓冲中最早一条变更的序号（更早的变更只能从日志文件补读）"""
+        return self._first_seq
+
+    def since(self, seq: int, limit: int = None) -> list:
+        """
+        取序号大于 seq 的变更（按序号递增）
+        :param seq: 消费者已处理的最大序号，从头读取传 0
+        :param limit: 最多返回条数，None 表示全部
+        :return: ChangeEvent 列表
+        :raises ValueError: 所需变更已超出保留范围（内存与日志都没有）或 seq 超过当前序号（日志被删除后重新计数），
+                            消费者需全量同步后从 last_seq 继续
+        """
+        with self._lock:
+            last = self._last_seq
+            if seq > last:
+                raise ValueError(f"序号 {seq} 超过当前最新序号 {last}，变更流已重置，请全量同步")
+            stop = last if limit is None else min(last, seq + max(limit, 0))
+            if seq + 1 >= self._first_seq:
+                ring, capacity = self._ring, self.capacity
+                return [ring[s % capacity] for s in range(seq + 1, stop + 1)]
+            if self.filepath is None:
+                raise ValueError(f"序号 {seq} 之后的部分变更已超出内存保留范围（最早 {self._first_seq}），请全量同步")
+            # 持锁只做 flush 并打开两份日志；逐行扫描在锁外进行，不阻塞 emit。
+            # 之后的轮换用 os.replace 换掉路径，已打开的文件仍指向此刻的内容，(seq, stop] 都在其中
+            if self._file is not None:
+                self._file.flush()
+            files = [open(path, "r", encoding="utf-8")
+                     for path in (self.archived_filepath, self.filepath) if os.path.exists(path)]
+        return self._read_log(files, seq, stop)
+
+    def _read_log(self, files: list, seq: int, stop: int) -> list:
+        """从已打开的归档与当前日志补读 (seq, stop] 区间的变更，读完关闭文件（无需持有 self._lock）"""
+        events = []
+        for f in files:
+            with f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        # 锁外读取时 emit 仍在追加，缓冲可能只落盘了半行（必然在 stop 之后）
+                        break
+                    current = int(line[:line.index("|")])
+                    if current <= seq:
+                        continue
+                    if current > stop:
+                        break
+                    events.append(_parse(line))
+        if not events or events[0].seq != seq + 1:
+            raise ValueError(f"序号 {seq} 之后的部分变更已超出日志保留范围，请全量同步")
+        return events
+
+    def subscribe(self, callback) -> None:
+        """
+        订阅后续变更：callback(event) 在修改线程内同步调用（此时持有通讯录写锁），应尽快返回
+        需要补齐历史时先 subscribe 再 since(已处理序号)，按 seq 去重
+        """
+        with self._lock:
+            self._subscribers = self._subscribers + (callback,)
+
+    def unsubscribe(self, callback) -> None:
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not callback)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "last_seq": self._last_seq,
+                "buffered": self._last_seq - self._first_seq + 1,
+                "capacity": self.capacity,
+                "subscribers": len(self._subscribers),
+                "callback_errors": self.callback_errors,
+                "file": self.filepath,
+            }
@@ -0,0 +1,22 @@
+"""
+storage/convert.py - .dat 文本文件与二进制快照互转
+用法：python -m storage.convert to-bin address_book.dat address_book.bin
+      python -m storage.convert to-dat address_book.bin address_book.dat
+"""
+import sys
+
+from .binary import dat_to_binary, binary_to_dat
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] not in ("to-bin", "to-dat"):
+        print("用法：python -m storage.convert to-bin|to-dat <源文件> <目标文件>")
+        return 1
+    convert = dat_to_binary if argv[0] == "to-bin" else binary_to_dat
+    print(f"✅ 转换完成：{convert(argv[1], argv[2])} 条记录 → {argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
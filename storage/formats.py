@@ -0,0 +1,318 @@
+"""
+storage/formats.py - 数据文件读写
+功能：以生成器方式流式读写 .dat（姓名|电话|备注）、CSV、JSON Lines 与 vCard 文件，内存占用与行数无关；
+      文件名以 .gz 结尾时透明地 gzip 压缩/解压；
+      写出带分块校验的 .dat 快照，加载时可检测并跳过损坏的数据块与被截断的尾部
+.dat 快照格式（旧版无首行标识的纯文本文件仍可读取）：
+    #ADDRBOOK 2              首行标识
+    姓名|电话|备注            每块至多 block_size 行
+    #B <行数> <crc32>        块尾校验行（不含 |，不会与联系人行混淆）
+    ...
+    #END <总行数>            文件完整结束标记
+"""
+import csv
+import gzip
+import json
+import os
+import re
+import zlib
+from json.encoder import encode_basestring
+
+# CSV 表头的可能写法，命中则跳过首行
+_CSV_HEADERS = {"name", "姓名"}
+
+DAT_MAGIC = b"#ADDRBOOK 2"
+DEFAULT_BLOCK_SIZE = 1024
+_BLOCK_TRAILER = re.compile(rb"#B (\d+) ([0-9a-f]{8})")
+_TRAILER_AT_END = re.compile(rb"#B \d+ [0-9a-f]{8}\n\Z")
+_FOOTER = re.compile(rb"#END \d+\n")
+
+# 扩展名（去掉 .gz 后）→ 格式名，未列出的扩展名按 .dat 处理
+_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".vcf": "vcf", ".vcard": "vcf"}
+FORMATS = ("dat", "csv", "jsonl", "vcf")
+
+# gzip 压缩级别：与 gzip 命令行默认一致，比 gzip.open 默认的 9 快数倍而体积相近
+GZIP_LEVEL = 6
+
+# 导入/导出进度回调的默认间隔（行）
+PROGRESS_EVERY = 100000
+
+
+def detect_format(path: str) -> str:
+    """按扩展名识别文件格式（忽略末尾的 .gz）"""
+    base = path[:-3] if path.lower().endswith(".gz") else path
+    return _EXTENSIONS.get(os.path.splitext(base)[1].lower(), "dat")
+
+
+def _open(path: str, mode: str, **kwargs):
+    """打开文件，.gz 结尾时使用 gzip 流"""
+    if path.lower().endswith(".gz"):
+        if "b" not in mode:
+            mode += "t"
+        return gzip.open(path, mode, compresslevel=GZIP_LEVEL, **kwargs)
+    return open(path, mode, **kwargs)
+
+
+def _parse_dat_line(line: str) -> dict:
+    parts = line.split("|")
+    return {
+        "name": parts[0],
+        "phone": parts[1] if len(parts) >= 2 else "",
+        "remark": parts[2] if len(parts) >= 3 else ""
+    }
+
+
+def iter_dat(path: str, report: dict = None):
+    """
+    逐行读取 姓名|电话|备注 格式文件（带分块校验的快照或旧版纯文本）
+    :param report: 可选字典，读取结束后填入 {"checksummed", "blocks", "bad_blocks", "skipped", "complete"}
+    :return: 生成器，元素为 {"name": "", "phone": "", "remark": ""}
+    """
+    report = report if report is not None else {}
+    report.update(checksummed=False, blocks=0, bad_blocks=0, skipped=0, complete=True)
+    with _open(path, "rb") as f:
+        first = f.readline()
+        # 联系人行总含 | 分隔符，不含 | 的 # 开头首行即快照标识（容忍其中的位损坏）
+        if first.startswith(b"#") and b"|" not in first:
+            report["checksummed"] = True
+            yield from _iter_blocks(f, report)
+            return
+        f.seek(0)
+        for raw in f:
+            line = raw.decode("utf-8").strip()
+            if line:
+                yield _parse_dat_line(line)
+
+
+def _iter_blocks(f, report: dict):
+    """
+    逐块校验：校验失败的块整体跳过，缺少块尾校验行的尾部视为写入中断
+    联系人行总含 | 分隔符（sanitize_input 保证字段内没有 |），据此区分控制行，
+    单个换行符损坏导致相邻两行粘连时也只影响一个块
+    """
+    lines = []
+    crc = 0
+    report["complete"] = False
+
+    def finish(trailer):
+        """按块尾校验行核对当前块，通过时返回该块的记录"""
+        if trailer is not None and int(trailer[1]) == len(lines) and int(trailer[2], 16) == crc:
+            report["blocks"] += 1
+            text = b"".join(lines).decode("utf-8")
+            return [_parse_dat_line(line.strip()) for line in text.split("\n") if line.strip()]
+        if lines:
+            report["bad_blocks"] += 1
+            report["skipped"] += len(lines)
+        return []
+
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            break  # 半行：写入中断
+        if b"|" not in raw:
+            # 控制行：结束标记或块尾校验行（可能已损坏）
+            if _FOOTER.fullmatch(raw):
+                report["complete"] = True
+                break
+            yield from finish(_BLOCK_TRAILER.fullmatch(raw, 0, len(raw) - 1))
+            lines, crc = [], 0
+            continue
+        trailer = _BLOCK_TRAILER.match(raw)
+        if trailer:
+            # 块尾校验行的换行符损坏，与下一块的首行粘连：拆开后两块都可保留
+            yield from finish(trailer)
+            lines, crc = [], 0
+            raw = raw[trailer.end() + 1:]
+        elif b"#B " in raw and _TRAILER_AT_END.search(raw):
+            # 本块末行的换行符损坏，与块尾校验行粘连：本块作废
+            yield from finish(None)
+            lines, crc = [], 0
+            continue
+        lines.append(raw)
+        crc = zlib.crc32(raw, crc)
+    # 没有校验行的尾部无法确认完整，整体丢弃
+    report["skipped"] += len(lines)
+
+
+def write_dat(f, rows, block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    写出带分块校验的 .dat 快照
+    :param f: 以二进制模式打开的文件对象
+    :param rows: 可迭代的 (姓名, 电话, 备注)
+    :return: 写入的记录数
+    """
+    f.write(DAT_MAGIC + b"\n")
+    total = 0
+    block = []
+    for name, phone, remark in rows:
+        block.append(f"{name}|{phone}|{remark}\n")
+        if len(block) >= block_size:
+            total += _write_block(f, block)
+            block = []
+    if block:
+        total += _write_block(f, block)
+    f.write(b"#END %d\n" % total)
+    return total
+
+
+def _write_block(f, block: list) -> int:
+    data = "".join(block).encode("utf-8")
+    f.write(data)
+    f.write(b"#B %d %08x\n" % (len(block), zlib.crc32(data)))
+    return len(block)
+
+
+def iter_csv(path: str):
+    """
+    逐行读取 CSV 文件（列顺序：姓名,电话,备注；可带表头）
+    :return: 生成器，元素为 {"name": "", "phone": "", "remark": ""}
+    """
+    with _open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for i, row in enumerate(csv.reader(f)):
+            if not row or (i == 0 and row[0].strip().lower() in _CSV_HEADERS):
+                continue
+            yield {
+                "name": row[0].strip(),
+                "phone": row[1].strip() if len(row) >= 2 else "",
+                "remark": row[2].strip() if len(row) >= 3 else ""
+            }
+
+
+def iter_jsonl(path: str):
+    """
+    逐行读取 JSON Lines 文件（每行一个 {"name", "phone", "remark"} 对象，与 Contact.to_dict 一致）
+    :return: 生成器，元素为 {"name": "", "phone": "", "remark": ""}
+    """
+    with _open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            yield {
+                "name": str(data.get("name", "")),
+                "phone": str(data.get("phone", "")),
+                "remark": str(data.get("remark", ""))
+            }
+
+
+def _vcard_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;").replace("\n", "\\n")
+
+
+def _vcard_unescape(value: str) -> str:
+    return re.sub(r"\\(.)", lambda m: "\n" if m[1] in "nN" else m[1], value)
+
+
+def iter_vcard(path: str):
+    """
+    逐张读取 vCard（.vcf）文件：FN 为姓名（缺省时取 N），第一个 TEL 为电话，NOTE 为备注
+    :return: 生成器，元素为 {"name": "", "phone": "", "remark": ""}
+    """
+    with _open(path, "r", encoding="utf-8-sig") as f:
+        card = None
+        previous = None
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line[:1] in (" ", "\t") and card is not None and previous:
+                # 折行：续行拼接到上一属性
+                card[previous] += line[1:]
+                continue
+            key, _, value = line.partition(":")
+            prop = key.split(";")[0].upper()
+            if prop == "BEGIN":
+                card, previous = {}, None
+            elif prop == "END" and card is not None:
+                name = card.get("FN") or card.get("N", "").replace(";", "")
+                yield {
+                    "name": _vcard_unescape(name).strip(),
+                    "phone": _vcard_unescape(card.get("TEL", "")).strip(),
+                    "remark": _vcard_unescape(card.get("NOTE", "")).strip()
+                }
+                card, previous = None, None
+            elif card is not None and prop in ("FN", "N", "TEL", "NOTE"):
+                if prop not in card:
+                    card[prop] = value
+                    previous = prop
+                else:
+                    previous = None
+
+
+_READERS = {"dat": iter_dat, "csv": iter_csv, "jsonl": iter_jsonl, "vcf": iter_vcard}
+
+
+def read_records(path: str, fmt: str = None):
+    """
+    流式读取外部文件
+    :param fmt: 格式名（dat/csv/jsonl/vcf），默认按扩展名识别，支持 .gz 压缩
+    :return: 生成器，元素为 {"name": "", "phone": "", "remark": ""}
+    """
+    return _READERS[fmt or detect_format(path)](path)
+
+
+def with_progress(items, progress, every: int = PROGRESS_EVERY):
+    """
+    包装可迭代对象，每 every 个元素以及结束时调用一次 progress(已处理数)
+    :param progress: 回调函数，为 None 时原样返回
+    """
+    if progress is None:
+        return items
+    return _counted(items, progress, every)
+
+
+def _counted(items, progress, every: int):
+    count = 0
+    for item in items:
+        yield item
+        count += 1
+        if count % every == 0:
+            progress(count)
+    if count % every:
+        progress(count)
+
+
+def _write_csv(f, rows) -> int:
+    writer = csv.writer(f)
+    writer.writerow(("name", "phone", "remark"))
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _write_jsonl(f, rows) -> int:
+    count = 0
+    # 三个字段都是字符串，直接拼接比逐行 json.dumps 字典快数倍，输出与 dumps(ensure_ascii=False) 一致
+    quote = encode_basestring
+    for name, phone, remark in rows:
+        f.write(f'{{"name": {quote(name)}, "phone": {quote(phone)}, "remark": {quote(remark)}}}\n')
+        count += 1
+    return count
+
+
+def _write_vcard(f, rows) -> int:
+    count = 0
+    for name, phone, remark in rows:
+        note = f"NOTE:{_vcard_escape(remark)}\r\n" if remark else ""
+        f.write(f"BEGIN:VCARD\r\nVERSION:3.0\r\nFN:{_vcard_escape(name)}\r\n"
+                f"N:{_vcard_escape(name)};;;;\r\nTEL;TYPE=CELL:{phone}\r\n{note}END:VCARD\r\n")
+        count += 1
+    return count
+
+
+def write_records(path: str, rows, fmt: str = None) -> int:
+    """
+    流式写出联系人，逐行写入，不在内存中组装整个文件
+    :param rows: 可迭代的 (姓名, 电话, 备注)
+    :param fmt: 格式名（dat/csv/jsonl/vcf），默认按扩展名识别；文件名以 .gz 结尾时 gzip 压缩
+    :return: 写出的记录数
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"未知的文件格式：{fmt}，可选 {', '.join(FORMATS)}")
+    if fmt == "dat":
+        with _open(path, "wb") as f:
+            return write_dat(f, rows)
+    with _open(path, "w", encoding="utf-8", newline="") as f:
+        writer = {"csv": _write_csv, "jsonl": _write_jsonl, "vcf": _write_vcard}[fmt]
+        return writer(f, rows)
@@ -0,0 +1,132 @@
+"""
+storage/group_commit.py - 合并写入（group commit）持久化
+功能：修改只标记"脏"，由后台线程按时间间隔或累计修改数合并为一次全量保存；
+      SAVE/EXIT、close() 以及解释器退出时保证落盘
+"""
+import atexit
+import threading
+import time
+
+from .persistence import PersistenceManager
+
+
+class CoalescingPersistenceManager(PersistenceManager):
+    """
+    合并写入持久化管理器（文件格式与 PersistenceManager 相同）
+    - 距上次保存超过 flush_interval 秒，或累计 flush_every 次修改时，后台线程保存一次
+    - 后台保存始终不输出提示（避免打断交互输入），quiet 只控制手动保存（SAVE/EXIT）的提示
+    """
+    def __init__(self, filepath="address_book.dat", tmp_filepath="address_book.dat.tmp",
+                 flush_interval=1.0, flush_every=1000, quiet=True):
+        super().__init__(filepath, tmp_filepath, quiet)
+        self.flush_interval = flush_interval
+        self.flush_every = max(1, flush_every)
+
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()   # 串行化后台保存与手动保存的文件写入
+        self._dirty = 0                    # 上次保存后的修改次数
+        self._snapshot = None              # 取得当前全部联系人的可调用对象
+        # 每次清除脏标记分配一个代号；快照都在清除之后才取，代号较新的快照包含较早代号的全部修改，
+        # 写入时跳过比已写入代号更旧的快照，避免后台保存与手动保存交错时旧数据覆盖新数据
+        self._generation = 0
+        self._written = 0
+        self._last_flush = time.monotonic()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="address-book-flusher", daemon=True)
+        self._thread.start()
+        # 解释器正常退出时兜底落盘
+        atexit.register(self.close)
+
+    def record_add(self, contact, snapshot) -> bool:
+        self._mark_dirty(snapshot)
+        return True
+
+    def record_delete(self, phone: str, snapshot) -> bool:
+        self._mark_dirty(snapshot)
+        return True
+
+    def _mark_dirty(self, snapshot) -> None:
+        with self._cond:
+            self._dirty += 1
+            self._snapshot = snapshot
+            if self._dirty == 1 or self._dirty >= self.flush_every:
+                # 第一次变脏时唤醒后台线程开始计时；达到条数阈值时立即保存
+                self._cond.notify()
+
+    def _run(self) -> None:
+        """后台保存循环"""
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._dirty:
+                        self._cond.wait()
+                        continue
+                    remaining = self._last_flush + self.flush_interval - time.monotonic()
+                    if self._dirty >= self.flush_every or remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                snapshot, generation = self._take_dirty()
+            self._flush_snapshot(snapshot, generation, report=False)
+
+    def _take_dirty(self) -> tuple:
+        """清除脏标记，返回 (快照函数, 代号)（调用方需持有 self._cond）"""
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+        self._generation += 1
+        return self._snapshot, self._generation
+
+    def _flush_snapshot(self, snapshot, generation: int, report: bool) -> bool:
+        """清除脏标记之后才取快照：此前的修改必然在快照中，此后的修改会重新标脏"""
+        contacts = snapshot()
+        with self._io_lock:
+            if generation < self._written:
+                return True  # 更新的快照已经写入
+            self._written = generation
+            return self._write(contacts, report)
+
+    def _write(self, contacts: list, report: bool) -> bool:
+        """写入快照（调用方需持有 self._io_lock）；report 为 False 时成功不输出提示"""
+        if report:
+            return super().save(contacts)
+        try:
+            self._write_snapshot(contacts)
+            return True
+        except Exception as e:
+            print(f"❌ 后台合并保存失败：{e}")
+            return False
+
+    def save_snapshot(self, snapshot) -> bool:
+        """手动保存（SAVE/EXIT）：先清除脏标记再取快照并立即写入"""
+        with self._cond:
+            _, generation = self._take_dirty()
+        return self._flush_snapshot(snapshot, generation, report=True)
+
+    def save(self, contacts: list) -> bool:
+        """
+        直接保存给定的联系人列表：列表可能早于并发的修改，因此不清除脏标记，
+        遗漏的修改仍由后台线程随后保存
+        """
+        with self._io_lock:
+            return self._write(contacts, report=True)
+
+    def flush(self) -> None:
+        """若有未保存的修改，立即同步保存"""
+        with self._cond:
+            if not self._dirty:
+                return
+            snapshot, generation = self._take_dirty()
+        self._flush_snapshot(snapshot, generation, report=False)
+
+    def close(self) -> None:
+        """落盘剩余修改并停止后台线程（可重复调用）"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
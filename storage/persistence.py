@@ -1,17 +1,48 @@
 """
 storage/persistence.py - 通讯录数据持久化模块
-功能：实现原子化数据写入/读取，保留临时文件用于调试/备份
+功能：实现崩溃安全的数据写入/读取：写临时文件并 fsync 后 os.replace 原子替换，
+      快照分块校验，加载时跳过损坏的数据块与被截断的尾部
 """
 import os
 import shutil
+import threading
+
+from .formats import DEFAULT_BLOCK_SIZE, iter_dat, write_dat
+
+
+def fsync_file(path: str) -> None:
+    """把文件内容刷到磁盘（fsync 作用于文件本身，与打开它的描述符无关）"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(path: str) -> None:
+    """fsync 文件所在目录，使 rename/replace 本身持久化（Windows 不支持目录 fsync，跳过）"""
+    if os.name != "posix":
+        return
+    fsync_file(os.path.dirname(os.path.abspath(path)))
+
 
 class PersistenceManager:
-    """持久化管理器：封装文件读写逻辑（保留临时文件版本）"""
-    def __init__(self, filepath="address_book.dat", tmp_filepath="address_book.dat.tmp"):
+    """持久化管理器：封装文件读写逻辑（临时文件 + fsync + 原子替换）"""
+    def __init__(self, filepath="address_book.dat", tmp_filepath="address_book.dat.tmp", quiet=False,
+                 block_size=DEFAULT_BLOCK_SIZE):
         # 正式数据文件路径
         self.filepath = filepath
-        # 临时文件路径（保留不删除）
+        # 临时文件路径：保存时先写入它，落盘后原子替换为正式文件
         self.tmp_filepath = tmp_filepath
+        # 安静模式：不输出每次保存成功的提示（错误信息仍然输出）
+        self.quiet = quiet
+        # 快照每多少条记录一个校验块
+        self.block_size = block_size
+
+    def _info(self, message: str) -> None:
+        """输出保存成功类提示，安静模式下忽略"""
+        if not self.quiet:
+            print(message)
 
     def load(self) -> list:
         """
@@ -19,59 +50,266 @@ class PersistenceManager:
         :return: 联系人数据列表，每个元素为字典 {"name": "", "phone": "", "remark": ""}
         """
         contacts_data = []
-        # 优先读取正式文件，若不存在则尝试临时文件（异常恢复）
+        # 优先读取正式文件；正式文件只会被原子替换，不存在时才尝试临时文件（首次保存中途崩溃）
         load_path = self.filepath if os.path.exists(self.filepath) else self.tmp_filepath
         
         if not os.path.exists(load_path):
             return contacts_data  # 无文件则返回空列表
+        if load_path == self.tmp_filepath:
+            print(f"📌 正式文件不存在，尝试从临时文件 {load_path} 恢复")
         
+        report = {}
         try:
-            with open(load_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue  # 跳过空行
-                    # 按分隔符拆分（格式：姓名|电话|备注）
-                    parts = line.split("|")
-                    name = parts[0] if len(parts) >= 1 else ""
-                    phone = parts[1] if len(parts) >= 2 else ""
-                    remark = parts[2] if len(parts) >= 3 else ""
-                    contacts_data.append({
-                        "name": name,
-                        "phone": phone,
-                        "remark": remark
-                    })
+            # 格式：姓名|电话|备注；校验失败的数据块与截断的尾部被跳过
+            contacts_data = list(iter_dat(load_path, report))
             print(f"✅ 从 {load_path} 加载 {len(contacts_data)} 条联系人数据")
+            if report["bad_blocks"] or not report["complete"]:
+                print(f"📌 文件不完整：跳过 {report['bad_blocks']} 个校验失败的数据块，"
+                      f"{'尾部写入中断，' if not report['complete'] else ''}共丢弃 {report['skipped']} 条记录")
         except Exception as e:
             print(f"❌ 加载数据失败：{e}")
             contacts_data = []
         return contacts_data
 
+    def record_add(self, contact, snapshot) -> bool:
+        """
+        记录一次新增（覆盖）操作，默认实现为全量保存
+        :param contact: 新增的联系人对象
+        :param snapshot: 无参可调用对象，返回当前全部联系人列表（仅在需要全量写入时调用）
+        """
+        return self.save(snapshot())
+
+    def record_delete(self, phone: str, snapshot) -> bool:
+        """
+        记录一次删除操作，默认实现为全量保存
+        :param phone: 被删除联系人的手机号
+        :param snapshot: 无参可调用对象，返回当前全部联系人列表
+        """
+        return self.save(snapshot())
+
+    def save_snapshot(self, snapshot) -> bool:
+        """
+        全量保存（SAVE/EXIT 入口）：由管理器决定何时取快照，合并写入模式借此保证取快照与清除脏标记的先后
+        :param snapshot: 无参可调用对象，返回当前全部联系人列表
+        """
+        return self.save(snapshot())
+
+    def flush(self) -> None:
+        """把缓冲中的修改落盘（全量保存模式下无缓冲，空操作）"""
+
+    def close(self) -> None:
+        """释放持久化资源（全量保存模式下无资源，空操作）"""
+
+    def _write_snapshot(self, contacts: list) -> None:
+        """写入临时文件并落盘后原子替换正式文件（不输出日志，异常由调用方处理）"""
+        # 步骤1：写入临时文件（分块校验），fsync 保证替换前内容已在磁盘上
+        with open(self.tmp_filepath, "wb") as f:
+            write_dat(f, ((c.name, c.phone, c.remark) for c in contacts), self.block_size)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # 步骤2：原子替换正式文件，任意时刻崩溃都只会看到完整的旧文件或新文件；
+        # 再 fsync 目录使替换本身持久化
+        os.replace(self.tmp_filepath, self.filepath)
+        fsync_dir(self.filepath)
+
     def save(self, contacts: list) -> bool:
         """
-        原子化保存联系人数据到文件（保留临时文件）
+        原子化保存联系人数据到文件
         :param contacts: 联系人对象列表
         :return: 保存成功返回True，失败返回False
         """
         try:
-            # 步骤1：先写入临时文件（覆盖旧的临时文件，避免冗余）
-            with open(self.tmp_filepath, "w", encoding="utf-8") as f:
-                for contact in contacts:
-                    # 按格式拼接：姓名|电话|备注
-                    line = f"{contact.name}|{contact.phone}|{contact.remark}\n"
-                    f.write(line)
-            print(f"📝 临时文件已保存至：{os.path.abspath(self.tmp_filepath)}")
-            
-            # 步骤2：原子重命名生成正式文件（保留临时文件，复制而非移动）
-            # 替换原shutil.move → 改为复制，避免临时文件被删除
-            shutil.copy2(self.tmp_filepath, self.filepath)  # copy2保留文件元数据
+            # 步骤1+2：写入临时文件、落盘并原子替换为正式文件
+            self._write_snapshot(contacts)
             
             # 步骤3：输出持久化摘要（满足开题报告要求）
-            print(f"✅ 持久化成功：写入 {len(contacts)} 条记录到 {os.path.abspath(self.filepath)}")
-            print(f"📌 临时文件已保留：{os.path.abspath(self.tmp_filepath)}")
+            self._info(f"✅ 持久化成功：写入 {len(contacts)} 条记录到 {os.path.abspath(self.filepath)}")
             return True
         except Exception as e:
             print(f"❌ 持久化失败：{e}")
-            # 移除「删除临时文件」的逻辑，保留失败时的临时文件用于排查
+            # 失败时保留临时文件用于排查，正式文件保持上一次保存的内容
             print(f"📌 临时文件保留（用于排查问题）：{os.path.abspath(self.tmp_filepath)}")
-            return False
\ No newline at end of file
+            return False
+
+class JournaledPersistenceManager(PersistenceManager):
+    """
+    日志式持久化管理器：快照文件 + 追加写日志（write-ahead log）
+    - 每次新增/删除只向日志追加一条 A|姓名|电话|备注 或 D|电话 记录，单次写入与通讯录规模无关
+    - 每 sync_every 条记录批量 flush + fsync 一次
+    - 日志记录数达到 compact_threshold 时触发压缩：把当前全量数据写成新快照并清空日志
+    - load() 依次回放 快照 → 归档日志 → 当前日志
+    """
+    def __init__(self, filepath="address_book.dat", tmp_filepath="address_book.dat.tmp",
+                 journal_filepath=None, sync_every=64, compact_threshold=100000,
+                 background_compact=True, quiet=False):
+        super().__init__(filepath, tmp_filepath, quiet)
+        # 当前日志文件；压缩期间的旧日志归档为 *.1，快照写完后删除
+        self.journal_filepath = journal_filepath or f"{filepath}.log"
+        self.archived_journal_filepath = f"{self.journal_filepath}.1"
+        self.sync_every = max(1, sync_every)
+        self.compact_threshold = compact_threshold
+        self.background_compact = background_compact
+
+        self._journal = None          # 追加写文件句柄（延迟打开）
+        self._unsynced = 0            # 尚未 fsync 的记录数
+        self._journal_records = 0     # 当前日志中的记录数（用于触发压缩）
+        self._lock = threading.Lock()
+        self._compact_thread = None
+
+    # ---------- 读取 ----------
+    def load(self) -> list:
+        """加载快照并按顺序回放日志，返回与 PersistenceManager.load 相同格式的列表"""
+        contacts = {}
+        for data in super().load():
+            contacts.pop(data["phone"], None)
+            contacts[data["phone"]] = data
+
+        replayed = 0
+        for path in (self.archived_journal_filepath, self.journal_filepath):
+            replayed += self._replay(path, contacts)
+        if replayed:
+            print(f"✅ 回放日志 {replayed} 条记录，当前共 {len(contacts)} 条联系人数据")
+        # 当前日志已有的记录也计入压缩阈值
+        self._journal_records = self._count_records(self.journal_filepath)
+        return list(contacts.values())
+
+    @staticmethod
+    def _replay(path: str, contacts: dict) -> int:
+        """回放单个日志文件；末尾被截断的半条记录直接忽略"""
+        if not os.path.exists(path):
+            return 0
+        replayed = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # 崩溃导致的不完整尾记录
+                parts = line.rstrip("\n").split("|")
+                if parts[0] == "A" and len(parts) >= 3:
+                    phone = parts[2]
+                    contacts.pop(phone, None)  # 覆盖语义：旧记录移除后追加到末尾
+                    contacts[phone] = {
+                        "name": parts[1],
+                        "phone": phone,
+                        "remark": parts[3] if len(parts) >= 4 else ""
+                    }
+                elif parts[0] == "D" and len(parts) >= 2:
+                    contacts.pop(parts[1], None)
+                else:
+                    continue
+                replayed += 1
+        return replayed
+
+    @staticmethod
+    def _count_records(path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    # ---------- 追加写 ----------
+    def record_add(self, contact, snapshot) -> bool:
+        return self._append(f"A|{contact.name}|{contact.phone}|{contact.remark}\n", snapshot)
+
+    def record_delete(self, phone: str, snapshot) -> bool:
+        return self._append(f"D|{phone}\n", snapshot)
+
+    def _append(self, record: str, snapshot) -> bool:
+        try:
+            with self._lock:
+                if self._journal is None:
+                    self._journal = open(self.journal_filepath, "a", encoding="utf-8")
+                self._journal.write(record)
+                self._journal_records += 1
+                self._unsynced += 1
+                if self._unsynced >= self.sync_every:
+                    self._sync_locked()
+                need_compact = self._journal_records >= self.compact_threshold
+            if need_compact:
+                self.compact(snapshot(), wait=not self.background_compact)
+            return True
+        except Exception as e:
+            print(f"❌ 日志写入失败：{e}")
+            return False
+
+    def _sync_locked(self) -> None:
+        """flush + fsync 当前日志（调用方需持有 self._lock）"""
+        if self._journal is not None and self._unsynced:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+
+    def flush(self) -> None:
+        """立即把未落盘的日志记录 fsync 到磁盘"""
+        with self._lock:
+            self._sync_locked()
+
+    # ---------- 压缩 ----------
+    def compact(self, contacts: list, wait: bool = True) -> bool:
+        """
+        把日志折叠进新快照
+        :param contacts: 当前全部联系人列表（调用线程中取得，保证一致）
+        :param wait: True 同步执行；False 在后台线程写快照
+        """
+        # 上一次后台压缩尚未结束时，先等待它完成，保证归档日志只有一份
+        if self._compact_thread is not None:
+            self._compact_thread.join()
+            self._compact_thread = None
+
+        with self._lock:
+            # 轮换日志：当前日志归档，后续记录写入新日志
+            self._sync_locked()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_filepath):
+                if os.path.exists(self.archived_journal_filepath):
+                    # 上次压缩未完成（崩溃遗留）：归档日志不能被覆盖，只能续写
+                    with open(self.journal_filepath, "r", encoding="utf-8") as src, \
+                            open(self.archived_journal_filepath, "a", encoding="utf-8") as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.remove(self.journal_filepath)
+                else:
+                    os.replace(self.journal_filepath, self.archived_journal_filepath)
+            self._journal_records = 0
+
+        if wait:
+            return self._finish_compact(contacts)
+        self._compact_thread = threading.Thread(
+            target=self._finish_compact, args=(contacts,), daemon=True
+        )
+        self._compact_thread.start()
+        return True
+
+    def _finish_compact(self, contacts: list) -> bool:
+        try:
+            self._write_snapshot(contacts)
+            # 快照落盘后归档日志才可删除；若中途崩溃，load 会再次回放归档日志（幂等）
+            if os.path.exists(self.archived_journal_filepath):
+                os.remove(self.archived_journal_filepath)
+            return True
+        except Exception as e:
+            print(f"❌ 日志压缩失败：{e}")
+            return False
+
+    def save(self, contacts: list) -> bool:
+        """手动保存（SAVE/EXIT）：同步压缩日志并写入完整快照"""
+        try:
+            if not self.compact(contacts, wait=True):
+                return False
+            self._info(f"✅ 持久化成功：写入 {len(contacts)} 条记录到 {os.path.abspath(self.filepath)}（日志已压缩）")
+            return True
+        except Exception as e:
+            print(f"❌ 持久化失败：{e}")
+            return False
+
+    def close(self) -> None:
+        """等待后台压缩结束并关闭日志文件"""
+        if self._compact_thread is not None:
+            self._compact_thread.join()
+            self._compact_thread = None
+        with self._lock:
+            self._sync_locked()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
@@ -0,0 +1,140 @@
+"""
+tests/test_persistence.py - 持久化崩溃安全测试
+覆盖 benchmarks/fault_injection.py 中的故障场景：
+1. 尾部截断：正式文件缺失、只剩写到一半的临时文件，加载结果必须是原数据按块对齐的前缀
+2. 数据块损坏：随机位翻转只丢失被破坏的那一块，其余记录原样保留
+3. 写完临时文件、替换前崩溃：正式文件保持上一版完整内容；首次保存时可从完整的临时文件恢复
+4. 进程被强杀：重新加载必须恰好是某个完整版本
+用法：python -m pytest tests
+"""
+import multiprocessing
+import os
+import random
+import time
+
+import pytest
+
+from contact import Contact
+from storage import PersistenceManager
+
+# 小块便于在少量数据上覆盖多个块与每一个截断位置
+BLOCK_SIZE = 4
+ROWS = [(f"联系人{i}", f"138{i:08d}", f"备注{i}") for i in range(30)]
+
+
+def _contacts(rows: list) -> list:
+    return [Contact(name, phone, remark) for name, phone, remark in rows]
+
+
+def _manager(path: str) -> PersistenceManager:
+    return PersistenceManager(path, path + ".tmp", quiet=True, block_size=BLOCK_SIZE)
+
+
+def _load(path: str) -> list:
+    return [(d["name"], d["phone"], d["remark"]) for d in _manager(path).load()]
+
+
+def _crash(src: str, dst: str) -> None:
+    """替代 os.replace：模拟临时文件写完、替换之前进程崩溃"""
+    raise OSError("模拟崩溃")
+
+
+def _saved_bytes(path: str, rows: list) -> bytes:
+    assert _manager(path).save(_contacts(rows))
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "contacts.dat")
+    _manager(path).save(_contacts(ROWS))
+    assert _load(path) == ROWS
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_torn_tail_loads_block_aligned_prefix(tmp_path):
+    """每一个截断位置：加载结果都是原数据的前缀，且只包含完整校验通过的块"""
+    path = str(tmp_path / "torn.dat")
+    data = _saved_bytes(path, ROWS)
+    os.remove(path)
+    for cut in range(len(data)):
+        with open(path + ".tmp", "wb") as f:
+            f.write(data[:cut])
+        loaded = _load(path)
+        assert loaded == ROWS[:len(loaded)], f"截断于第 {cut} 字节"
+        # 末块不足 BLOCK_SIZE 条，只缺结束标记时全部保留
+        assert len(loaded) % BLOCK_SIZE == 0 or loaded == ROWS, f"截断于第 {cut} 字节"
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    assert _load(path) == ROWS
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bad_block_loses_at_most_that_block(tmp_path, seed):
+    """随机翻转比特：加载不报错，结果是原数据的子序列，最多丢失一块"""
+    rng = random.Random(seed)
+    path = str(tmp_path / "flip.dat")
+    data = _saved_bytes(path, ROWS)
+    for _ in range(50):
+        corrupted = bytearray(data)
+        pos = rng.randrange(len(corrupted))
+        corrupted[pos] ^= 1 << rng.randrange(8)
+        with open(path, "wb") as f:
+            f.write(corrupted)
+        loaded = _load(path)
+        remaining = iter(ROWS)
+        assert all(row in remaining for row in loaded), f"翻转第 {pos} 字节后不是原数据的子序列"
+        assert len(ROWS) - len(loaded) <= BLOCK_SIZE, f"翻转第 {pos} 字节后丢失超过一块"
+
+
+def test_crash_before_replace_keeps_previous_version(tmp_path, monkeypatch):
+    """临时文件已写完、os.replace 之前崩溃：正式文件仍是上一版完整内容"""
+    path = str(tmp_path / "contacts.dat")
+    old_rows, new_rows = ROWS[:10], ROWS
+    _manager(path).save(_contacts(old_rows))
+    monkeypatch.setattr(os, "replace", _crash)
+    assert not _manager(path).save(_contacts(new_rows))
+    monkeypatch.undo()
+
+    assert os.path.exists(path + ".tmp")
+    assert _load(path) == old_rows
+    # 下一次保存覆盖遗留的临时文件并正常替换
+    assert _manager(path).save(_contacts(new_rows))
+    assert _load(path) == new_rows
+
+
+def test_first_save_crash_recovers_from_tmp(tmp_path, monkeypatch):
+    """首次保存在替换前崩溃：正式文件不存在，从完整的临时文件恢复"""
+    path = str(tmp_path / "contacts.dat")
+    monkeypatch.setattr(os, "replace", _crash)
+    assert not _manager(path).save(_contacts(ROWS))
+    monkeypatch.undo()
+    assert not os.path.exists(path)
+    assert _load(path) == ROWS
+
+
+def _saver(path: str, generations: list) -> None:
+    """子进程：依次循环保存各个版本，直到被杀死"""
+    manager = _manager(path)
+    snapshots = [_contacts(rows) for rows in generations]
+    while True:
+        for contacts in snapshots:
+            manager.save(contacts)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="需要 fork 启动子进程")
+def test_killed_during_save_loads_a_complete_version(tmp_path):
+    """保存过程中随机时刻 SIGKILL：重新加载恰好是某个完整版本（各版本长度不同）"""
+    path = str(tmp_path / "kill.dat")
+    rows = [(f"联系人{i}", f"139{i:08d}", "") for i in range(4000)]
+    generations = [rows[:1000], rows[:2000], rows[:3000], rows]
+    rng = random.Random(0)
+    ctx = multiprocessing.get_context("fork")
+    for _ in range(5):
+        process = ctx.Process(target=_saver, args=(path, generations))
+        process.start()
+        time.sleep(rng.uniform(0.05, 0.2))
+        process.kill()
+        process.join()
+        loaded = _load(path)
+        assert not loaded or loaded in generations
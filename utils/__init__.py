@@ -1,4 +1,12 @@
-"""工具模块：暴露辅助函数"""
+"""工具模块：暴露辅助函数、输入校验、读写锁、LRU 缓存、持久化映射与耗时统计"""
 from .helpers import generate_all_prefixes
+from .lru import LRUCache
+from .metrics import Metrics, merge_snapshots
+from .pmap import PersistentMap
+from .rwlock import ReadWriteLock
+from .validation import sanitize_input, sanitize_many, validate_phone, validate_phones
 
-__all__ = ["generate_all_prefixes"]
\ No newline at end of file
+__all__ = [
+    "generate_all_prefixes", "LRUCache", "Metrics", "merge_snapshots", "PersistentMap", "ReadWriteLock",
+    "sanitize_input", "sanitize_many", "validate_phone", "validate_phones",
+]
@@ -0,0 +1,93 @@
+import threading
+
+# 直方图桶数：第 i 个桶统计 [2^(i-1), 2^i) 微秒的样本，覆盖到约 36 分钟
+HISTOGRAM_BUCKETS = 32
+
+
+class OperationStats:
+    """单个操作的计数、累计耗时与对数直方图"""
+    __slots__ = ("count", "total", "max", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+
+    def percentile_us(self, pct: float) -> float:
+        """按直方图估算分位数（取所在桶的上界，不超过最大值，单位微秒）"""
+        target = self.count * pct
+        seen = 0
+        for bucket, n in enumerate(self.histogram):
+            seen += n
+            if seen >= target and n:
+                return min(float(1 << bucket), self.max * 1e6)
+        return 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "p50_us": self.percentile_us(0.50),
+            "p99_us": self.percentile_us(0.99),
+            "max_us": self.max * 1e6,
+            "histogram_us": {f"<{1 << i}": n for i, n in enumerate(self.histogram) if n},
+        }
+
+
+class Metrics:
+    """
+    按操作名汇总的耗时统计
+    关闭时（enabled=False）调用方只需判断一次布尔属性，不产生计时开销
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._ops = {}
+        self._lock = threading.Lock()
+
+    def record(self, op: str, seconds: float):
+        """记录一次操作耗时（秒）"""
+        with self._lock:
+            stats = self._ops.get(op)
+            if stats is None:
+                stats = self._ops[op] = OperationStats()
+            stats.add(seconds)
+
+    def snapshot(self) -> dict:
+        """返回 {操作名: 统计字典} 的快照"""
+        with self._lock:
+            return {op: stats.to_dict() for op, stats in sorted(self._ops.items())}
+
+    def reset(self):
+        with self._lock:
+            self._ops.clear()
+
+
+def merge_snapshots(snapshots) -> dict:
+    """
+    合并多个 Metrics.snapshot()（如各分片进程的统计）：计数、耗时与直方图逐桶相加后重新估算分位数
+    :param snapshots: 快照字典的可迭代对象
+    :return: 与 Metrics.snapshot() 相同格式的字典
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for op, item in snapshot.items():
+            stats = merged.get(op)
+            if stats is None:
+                stats = merged[op] = OperationStats()
+            stats.count += item["count"]
+            stats.total += item["total_ms"] / 1000
+            stats.max = max(stats.max, item["max_us"] / 1e6)
+            for label, n in item["histogram_us"].items():
+                # 键为 "<2^i"，对应第 i 个桶
+                stats.histogram[int(label[1:]).bit_length() - 1] += n
+    return {op: stats.to_dict() for op, stats in sorted(merged.items())}
@@ -0,0 +1,267 @@
+import sys
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+# 每层 5 位，只取 64 位散列值；耗尽后仍相同的键放入冲突节点
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+# 槽位中的叶子是 (键, 值) 元组；子节点为 _Node 或 _Collision
+_MISSING = object()
+
+
+if sys.version_info >= (3, 10):
+    _popcount = int.bit_count
+else:
+    def _popcount(bitmap: int) -> int:
+        """位图中 1 的个数（int.bit_count 需要 Python 3.10）"""
+        return bin(bitmap).count("1")
+
+
+def _hash(key) -> int:
+    return hash(key) & _HASH_MASK
+
+
+class _Node:
+    """位图节点：bitmap 第 i 位为 1 表示槽 i 非空，entries 按槽号顺序紧凑存放"""
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class _Collision:
+    """散列值完全相同的多个键"""
+    __slots__ = ("hash", "items")
+
+    def __init__(self, key_hash: int, items: tuple):
+        self.hash = key_hash
+        self.items = items
+
+
+def _entry_hash(entry) -> int:
+    return entry.hash if type(entry) is _Collision else _hash(entry[0])
+
+
+def _pair(shift: int, h1: int, e1, h2: int, e2):
+    """把两个槽位冲突的条目（叶子或冲突节点）放进新建的子树"""
+    if h1 == h2:
+        items = e1.items if type(e1) is _Collision else (e1,)
+        return _Collision(h1, items + (e2,))
+    i1 = (h1 >> shift) & _MASK
+    i2 = (h2 >> shift) & _MASK
+    if i1 == i2:
+        return _Node(1 << i1, (_pair(shift + _BITS, h1, e1, h2, e2),))
+    entries = (e1, e2) if i1 < i2 else (e2, e1)
+    return _Node((1 << i1) | (1 << i2), entries)
+
+
+def _get(node, h: int, key, default):
+    shift = 0
+    while True:
+        if type(node) is _Collision:
+            for k, v in node.items:
+                if k == key:
+                    return v
+            return default
+        bit = 1 << ((h >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return default
+        entry = node.entries[_popcount(node.bitmap & (bit - 1))]
+        if type(entry) is tuple:
+            return entry[1] if entry[0] == key else default
+        node = entry
+        shift += _BITS
+
+
+def _set(node, h: int, key, value, shift: int) -> tuple:
+    """返回 (新节点, 是否新增键)；值未变化时返回原节点"""
+    if type(node) is _Collision:
+        if h != node.hash:
+            return _pair(shift, node.hash, node, h, (key, value)), True
+        for i, (k, v) in enumerate(node.items):
+            if k == key:
+                if v is value:
+                    return node, False
+                return _Collision(h, node.items[:i] + ((key, value),) + node.items[i + 1:]), False
+        return _Collision(h, node.items + ((key, value),)), True
+    bit = 1 << ((h >> shift) & _MASK)
+    pos = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, entries[:pos] + ((key, value),) + entries[pos:]), True
+    entry = entries[pos]
+    if type(entry) is tuple:
+        if entry[0] == key:
+            if entry[1] is value:
+                return node, False
+            new_entry, added = (key, value), False
+        else:
+            new_entry, added = _pair(shift + _BITS, _hash(entry[0]), entry, h, (key, value)), True
+    else:
+        new_entry, added = _set(entry, h, key, value, shift + _BITS)
+        if new_entry is entry:
+            return node, False
+    return _Node(node.bitmap, entries[:pos] + (new_entry,) + entries[pos + 1:]), added
+
+
+def _delete(node, h: int, key, shift: int):
+    """
+    返回删除后的子树：键不存在时为原节点；子树为空时为 None；
+    只剩一个叶子时返回该叶子，由上层就地折叠，保持树的紧凑
+    """
+    if type(node) is _Collision:
+        items = tuple(item for item in node.items if item[0] != key)
+        if len(items) == len(node.items):
+            return node
+        return items[0] if len(items) == 1 else _Collision(node.hash, items)
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    pos = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    entry = entries[pos]
+    if type(entry) is tuple:
+        if entry[0] != key:
+            return node
+        new_entry = None
+    else:
+        new_entry = _delete(entry, h, key, shift + _BITS)
+        if new_entry is entry:
+            return node
+    if new_entry is None:
+        if len(entries) == 1:
+            return None
+        remaining = entries[:pos] + entries[pos + 1:]
+        if len(remaining) == 1 and type(remaining[0]) is tuple and shift:
+            return remaining[0]
+        return _Node(node.bitmap & ~bit, remaining)
+    if len(entries) == 1 and type(new_entry) is tuple and shift:
+        return new_entry
+    return _Node(node.bitmap, entries[:pos] + (new_entry,) + entries[pos + 1:])
+
+
+def _iter_items(entry):
+    if entry is None:
+        return
+    if type(entry) is tuple:
+        yield entry
+    elif type(entry) is _Collision:
+        yield from entry.items
+    else:
+        for child in entry.entries:
+            yield from _iter_items(child)
+
+
+def _diff(a, b):
+    """逐层比较两棵子树，共享的子树（同一对象）直接跳过"""
+    if a is b:
+        return
+    if type(a) is _Node and type(b) is _Node:
+        a_entries, b_entries = a.entries, b.entries
+        a_bitmap, b_bitmap = a.bitmap, b.bitmap
+        union = a_bitmap | b_bitmap
+        while union:
+            bit = union & -union
+            union ^= bit
+            ea = a_entries[_popcount(a_bitmap & (bit - 1))] if a_bitmap & bit else None
+            eb = b_entries[_popcount(b_bitmap & (bit - 1))] if b_bitmap & bit else None
+            yield from _diff(ea, eb)
+        return
+    # 叶子、冲突节点或结构不同：展开比较（只发生在有差异的小范围内）
+    old = dict(_iter_items(a))
+    new = dict(_iter_items(b))
+    for key, value in old.items():
+        other = new.get(key, _MISSING)
+        if other is _MISSING:
+            yield key, value, None
+        elif other is not value:
+            yield key, value, other
+    for key, value in new.items():
+        if key not in old:
+            yield key, None, value
+
+
+def _build(pairs: list, shift: int):
+    """批量构建：按当前层的槽号分桶后递归，避免逐条插入的路径复制"""
+    if len(pairs) == 1:
+        return pairs[0][1]
+    if shift >= _HASH_BITS:
+        return _Collision(pairs[0][0], tuple(entry for _, entry in pairs))
+    buckets = {}
+    for pair in pairs:
+        slot = (pair[0] >> shift) & _MASK
+        bucket = buckets.get(slot)
+        if bucket is None:
+            buckets[slot] = [pair]
+        else:
+            bucket.append(pair)
+    bitmap = 0
+    entries = []
+    for slot in sorted(buckets):
+        bitmap |= 1 << slot
+        entries.append(_build(buckets[slot], shift + _BITS))
+    return _Node(bitmap, tuple(entries))
+
+
+class PersistentMap:
+    """
+    不可变散列映射（HAMT，Hash Array Mapped Trie）：set/delete 返回新映射，原映射保持不变
+    每层取键散列值的 5 位作为槽号，修改时只复制从根到叶子的路径（约 log32(n) 个节点），其余子树与旧版本共享：
+    - 保留一个版本只需持有其根节点，O(1)；每个版本额外占用的内存与其修改量成正比
+    - 两个版本求差异时，同一对象的子树直接跳过，耗时与差异量成正比
+    值按对象身份比较（diff 中 is 判断），适合存放不可变值或实体对象
+    """
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, root: _Node = None, size: int = 0):
+        self._root = root if root is not None else _Node(0, ())
+        self._size = size
+
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> "PersistentMap":
+        """由字典一次性构建（比逐条 set 快数倍）"""
+        if not mapping:
+            return cls()
+        root = _build([(_hash(key), (key, value)) for key, value in mapping.items()], 0)
+        if type(root) is not _Node:
+            h = _entry_hash(root)
+            root = _Node(1 << (h & _MASK), (root,))
+        return cls(root, len(mapping))
+
+    def get(self, key, default=None):
+        return _get(self._root, _hash(key), key, default)
+
+    def set(self, key, value) -> "PersistentMap":
+        """返回键映射到 value 的新映射"""
+        root, added = _set(self._root, _hash(key), key, value, 0)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._size + added)
+
+    def delete(self, key) -> "PersistentMap":
+        """返回删除 key 后的新映射，键不存在时返回自身"""
+        root = _delete(self._root, _hash(key), key, 0)
+        if root is self._root:
+            return self
+        if root is None:
+            return PersistentMap()
+        return PersistentMap(root, self._size - 1)
+
+    def diff(self, other: "PersistentMap"):
+        """
+        与另一版本的差异
+        :return: 生成器，元素为 (键, 本映射中的值, other 中的值)，缺失的一侧为 None
+        """
+        return _diff(self._root, other._root)
+
+    def items(self):
+        return _iter_items(self._root)
+
+    def __contains__(self, key) -> bool:
+        return _get(self._root, _hash(key), key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,84 @@
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    读写锁（写者优先）：多个读者可并行，写者独占
+    - 写锁可重入；持有写锁的线程可直接获取读锁
+    - 读锁在同一线程内可重入（嵌套读不会被等待中的写者阻塞）
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0            # 持有读锁的线程数
+        self._writer = None          # 持有写锁的线程 id
+        self._write_depth = 0        # 写锁重入深度
+        self._waiting_writers = 0    # 等待中的写者数（写者优先）
+        self._local = threading.local()
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, "depth", 0)
+        if depth or self._writer == me:
+            self._local.depth = depth + 1
+            return
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        self._local.depth = 1
+
+    def release_read(self):
+        depth = self._local.depth - 1
+        self._local.depth = depth
+        if depth or self._writer == threading.get_ident():
+            return
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    @property
+    def write_depth(self) -> int:
+        """当前写锁重入深度；在持有写锁的线程内为 1 表示处于最外层修改"""
+        return self._write_depth
+
+    @contextmanager
+    def read(self):
+        """读锁上下文：with lock.read(): ..."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """写锁上下文：with lock.write(): ..."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,80 @@
+import re
+
+# 国内手机号：1 开头，第二位 3-9，共 11 位 ASCII 数字（\d 会放过全角数字，这里显式写 [0-9]）
+PHONE_PATTERN = re.compile(r"1[3-9][0-9]{9}")
+
+
+# 拒绝原因
+REASON_EMPTY_NAME = "姓名为空"
+REASON_BAD_PHONE = "手机号格式不合法"
+REASON_MALFORMED = "记录缺少字段"
+
+
+def validate_phone(phone: str) -> bool:
+    """
+    校验手机号合法性（核心：11位数字 + 国内手机号格式）
+    :param phone: 待校验的手机号字符串（允许首尾空白）
+    :return: 合法返回True，否则False
+    """
+    if not isinstance(phone, str):
+        return False
+    return PHONE_PATTERN.fullmatch(phone.strip()) is not None
+
+
+def sanitize_input(text: str) -> str:
+    """
+    清洗用户输入，去除首尾空白与 | 换行回车（| 是 .dat 的分隔符，换行会破坏按行存储）
+    """
+    if not isinstance(text, str):
+        return ""
+    # 没有可替换的字符时 str.replace 直接返回原对象，比 translate 逐字符映射快数倍
+    return text.strip().replace("|", "").replace("\n", "").replace("\r", "")
+
+
+def validate_phones(phones) -> list:
+    """
+    批量校验手机号
+    :param phones: 手机号可迭代对象
+    :return: 与输入一一对应的布尔值列表
+    """
+    match = PHONE_PATTERN.fullmatch
+    return [isinstance(phone, str) and match(phone.strip()) is not None for phone in phones]
+
+
+def sanitize_many(records, rejections: list = None):
+    """
+    批量清洗并校验联系人记录，供导入与加载使用（生成器，不额外占用内存）
+    :param records: 可迭代对象，元素为 {"name", "phone", "remark"} 字典
+    :param rejections: 不为 None 时，被拒绝的记录以 (序号, 原因, 原记录) 追加到该列表，序号从 1 开始
+    :return: 生成器，元素为清洗后的合法记录 {"name": "", "phone": "", "remark": ""}
+    """
+    match = PHONE_PATTERN.fullmatch
+    for position, data in enumerate(records, 1):
+        try:
+            name = data["name"].strip().replace("|", "").replace("\n", "").replace("\r", "")
+            phone = data["phone"].strip()
+            remark = data.get("remark") or ""
+            if remark:
+                remark = remark.strip().replace("|", "").replace("\n", "").replace("\r", "")
+        except (KeyError, AttributeError, TypeError):
+            reason = REASON_MALFORMED
+        else:
+            if not name:
+                reason = REASON_EMPTY_NAME
+            elif match(phone) is None:
+                reason = REASON_BAD_PHONE
+            else:
+                yield {"name": name, "phone": phone, "remark": remark}
+                continue
+        if rejections is not None:
+            rejections.append((position, reason, data))
+
+
+def summarize_rejections(rejections: list, samples: int = 3) -> str:
+    """把拒绝列表汇总为一行提示：总数、各原因计数与前几条示例"""
+    counts = {}
+    for _, reason, _ in rejections:
+        counts[reason] = counts.get(reason, 0) + 1
+    detail = "，".join(f"{reason} {count} 条" for reason, count in counts.items())
+    examples = "；".join(f"第 {position} 条 {data!r}" for position, _, data in rejections[:samples])
+    return f"跳过 {len(rejections)} 条非法记录（{detail}），例如：{examples}"